@@ -0,0 +1,146 @@
+"""
+Benchmark of the label placement of `ScreenshotHighlighter` on dense pages.
+
+Compares the numpy region analysis / spatial grid implementation against the previous one
+(region cropping for color analysis, linear scan of the placed labels for overlaps).
+
+Usage: `uv run python benchmarks/label_placement.py --nb-elements 300 --repeat 5`
+"""
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+
+from notte_core.browser.highlighter import (
+    LabelConfig,
+    LabelPlacementOptimizer,
+    Rectangle,
+    RectangleGrid,
+)
+from PIL import Image, ImageDraw
+from typing_extensions import override
+
+
+def legacy_is_area_uniform_color(image: Image.Image, rect: Rectangle, config: LabelConfig) -> bool:
+    x1 = max(0, min(int(rect.x1), image.width - 1))
+    y1 = max(0, min(int(rect.y1), image.height - 1))
+    x2 = max(0, min(int(rect.x2), image.width))
+    y2 = max(0, min(int(rect.y2), image.height))
+    if x2 <= x1 or y2 <= y1:
+        return False
+    pixels: list[tuple[int, int, int]] = list(image.crop((x1, y1, x2, y2)).convert("RGB").getdata())  # pyright: ignore
+    n = len(pixels)
+    avg_r, avg_g, avg_b = (sum(p[c] for p in pixels) / n for c in range(3))
+    similar = sum(
+        1
+        for r, g, b in pixels
+        if ((r - avg_r) ** 2 + (g - avg_g) ** 2 + (b - avg_b) ** 2) ** 0.5 <= config.color_tolerance
+    )
+    return similar / n >= config.color_uniformity_threshold
+
+
+class LegacyRectangleList(RectangleGrid):
+    """Previous overlap check: linear scan of all the placed labels"""
+
+    @override
+    def add(self, rect: Rectangle) -> None:
+        self._rects.append(rect)
+
+    @override
+    def overlaps(self, rect: Rectangle) -> bool:
+        return any(rect.overlaps(existing) for existing in self._rects)
+
+
+class LegacyLabelPlacementOptimizer(LabelPlacementOptimizer):
+    """Previous color analysis: crop the image region and compare every pixel to the average color"""
+
+    @override
+    def _calculate_position_score(self, label_rect: Rectangle, element_rect: Rectangle, image: Image.Image) -> int:
+        score = 0
+        if not self.config.skip_color_analysis and legacy_is_area_uniform_color(image, label_rect, self.config):
+            score += 10
+        if not label_rect.overlaps(element_rect):
+            score += 5
+        if (
+            label_rect.x1 < element_rect.x1
+            or label_rect.x2 > element_rect.x2
+            or label_rect.y1 < element_rect.y1
+            or label_rect.y2 > element_rect.y2
+        ):
+            score += 3
+        if self.config.fast_mode and (
+            label_rect.x1 >= element_rect.x1
+            and label_rect.x2 <= element_rect.x2
+            and label_rect.y1 >= element_rect.y1
+            and label_rect.y2 <= element_rect.y2
+        ):
+            score += 8
+        return score
+
+
+def dense_page(width: int, height: int, nb_elements: int, seed: int) -> tuple[Image.Image, list[Rectangle]]:
+    rng = random.Random(seed)
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    elements: list[Rectangle] = []
+    for _ in range(nb_elements):
+        w, h = rng.randint(40, 300), rng.randint(16, 60)
+        x, y = rng.randint(0, width - w), rng.randint(0, height - h)
+        elements.append(Rectangle(x, y, x + w, y + h))
+        # some text-like content in the element
+        for _ in range(rng.randint(0, 5)):
+            tx, ty = rng.randint(x, x + w - 5), rng.randint(y, y + h - 5)
+            draw.rectangle([tx, ty, tx + 5, ty + 5], fill=tuple(rng.randint(0, 255) for _ in range(3)))
+    return image, elements
+
+
+def place_labels(
+    optimizer: LabelPlacementOptimizer, placed_labels: RectangleGrid, image: Image.Image, elements: list[Rectangle]
+) -> None:
+    label_rect = Rectangle(0, 0, 30, 22)
+    for element in elements:
+        rect, _ = optimizer.find_best_position(element, label_rect, placed_labels, image)
+        placed_labels.add(rect)
+
+
+def timeit(fn: Callable[[], None], repeat: int) -> float:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--width", type=int, default=1280)
+    _ = parser.add_argument("--height", type=int, default=3000)
+    _ = parser.add_argument("--nb-elements", type=int, default=300)
+    _ = parser.add_argument("--repeat", type=int, default=5)
+    _ = parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    image, elements = dense_page(args.width, args.height, args.nb_elements, args.seed)
+    print(f"{args.nb_elements} elements on a {args.width}x{args.height} screenshot (best of {args.repeat} runs)")
+    for color_analysis in (False, True):
+        config = LabelConfig(skip_color_analysis=not color_analysis)
+
+        def legacy(config: LabelConfig = config) -> None:
+            optimizer = LegacyLabelPlacementOptimizer(image.width, image.height, config)
+            place_labels(optimizer, LegacyRectangleList(), image, elements)
+
+        def vectorized(config: LabelConfig = config) -> None:
+            optimizer = LabelPlacementOptimizer(image.width, image.height, config, image=image)
+            place_labels(optimizer, RectangleGrid(), image, elements)
+
+        legacy_time, vectorized_time = timeit(legacy, args.repeat), timeit(vectorized, args.repeat)
+        print(
+            f"color_analysis={color_analysis!s:<5} legacy={legacy_time * 1000:9.1f}ms "
+            + f"vectorized={vectorized_time * 1000:9.1f}ms speedup=x{legacy_time / vectorized_time:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
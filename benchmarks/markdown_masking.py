@@ -0,0 +1,109 @@
+"""
+Benchmark of the link / image masking of `MarkdownPruningPipe` on large listing pages.
+
+Compares the reverse index / single-pass unmasking implementation against the previous one
+(linear scan of the placeholders for every link, one regex pass per placeholder kind to unmask).
+
+Usage: `uv run python benchmarks/markdown_masking.py --nb-links 5000 --repeat 5`
+"""
+
+import argparse
+import random
+import re
+import time
+from collections.abc import Callable
+
+from notte_browser.scraping.pruning import MarkdownPruningPipe, MaskedDocument
+
+
+def legacy_mask(markdown_content: str) -> MaskedDocument:
+    links: dict[str, str] = {}
+    images: dict[str, str] = {}
+
+    def image_mask(match: re.Match[str]) -> str:
+        alt_text, url = match.groups()
+        if not url.strip():
+            return f"![{alt_text}]()"
+        if url in images.values():
+            placeholder = next(k for k, v in images.items() if v == url)
+        else:
+            placeholder = f"img{len(images) + 1}.png"
+            images[placeholder] = url
+        return f"![{alt_text}]({placeholder})"
+
+    def link_mask(match: re.Match[str]) -> str:
+        text, url = match.groups()
+        if url.startswith("img"):
+            return match.group(0)
+        if url in links.values():
+            placeholder = next(k for k, v in links.items() if v == url)
+        else:
+            placeholder = f"link{len(links) + 1}"
+            links[placeholder] = url
+        return f"[{text}]({placeholder})"
+
+    content = re.sub(MarkdownPruningPipe.image_pattern, image_mask, markdown_content)
+    content = re.sub(MarkdownPruningPipe.link_pattern, link_mask, content)
+    return MaskedDocument(content=content, links=links, images=images)
+
+
+def legacy_unmask(document: MaskedDocument) -> str:
+    def unmask_images(match: re.Match[str]) -> str:
+        alt_text, placeholder = match.groups()
+        return f"![{alt_text}]({document.images.get(placeholder, placeholder)})"
+
+    def unmask_links(match: re.Match[str]) -> str:
+        text, placeholder = match.groups()
+        return f"[{text}]({document.links.get(placeholder, placeholder)})"
+
+    content = re.sub(MarkdownPruningPipe.image_pattern, unmask_images, document.content)
+    return re.sub(MarkdownPruningPipe.link_pattern, unmask_links, content)
+
+
+def listing_page(nb_links: int, seed: int = 0) -> str:
+    """Synthetic listing page: product cards with a link, a thumbnail and some repeated navigation links"""
+    rng = random.Random(seed)
+    lines = ["# Products", ""]
+    for i in range(nb_links):
+        if i % 10 == 0:
+            lines.append(
+                f"[Home](https://shop.example.com/) | [Page {rng.randint(1, 50)}](https://shop.example.com/p/)"
+            )
+        lines.append(
+            f"- [![Product {i}](https://cdn.example.com/img/{i}.jpg) Product {i}](https://shop.example.com/item/{i})"
+            + f" — {rng.randint(5, 500)}$ [reviews](https://shop.example.com/item/{i}/reviews)"
+        )
+    return "\n".join(lines)
+
+
+def timeit(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _ = fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    _ = parser.add_argument("--nb-links", type=int, default=5000)
+    _ = parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    content = listing_page(args.nb_links)
+    masked = MarkdownPruningPipe.mask(content)
+    assert masked == legacy_mask(content)
+    assert MarkdownPruningPipe.unmask(masked) == legacy_unmask(masked) == content
+    print(f"{len(content) / 1e6:.1f}MB document, {len(masked.links)} links, {len(masked.images)} images")
+
+    for name, legacy, current in [
+        ("mask", lambda: legacy_mask(content), lambda: MarkdownPruningPipe.mask(content)),
+        ("unmask", lambda: legacy_unmask(masked), lambda: MarkdownPruningPipe.unmask(masked)),
+    ]:
+        before, after = timeit(legacy, args.repeat), timeit(current, args.repeat)
+        print(f"{name:>8}: {before * 1000:8.1f}ms -> {after * 1000:6.1f}ms ({before / after:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
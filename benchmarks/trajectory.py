@@ -0,0 +1,69 @@
+"""
+Micro-benchmark of the `Trajectory` accessors used at every agent step.
+
+Builds a trajectory of `--nb-steps` steps (observation, agent completion, execution result) and times,
+after each step, the calls made by the agent loop (last observation / result, number of steps, last step bundle),
+then the full iterations (typed iteration, step bundles, replay screenshots).
+
+Usage: `uv run python benchmarks/trajectory.py --nb-steps 500`
+"""
+
+import argparse
+import asyncio
+import time
+
+from notte_core.actions import ClickAction
+from notte_core.agent_types import AgentCompletion
+from notte_core.browser.observation import ExecutionResult, Observation
+from notte_core.trajectory import Trajectory
+
+
+async def build(nb_steps: int) -> tuple[Trajectory, float]:
+    trajectory = Trajectory()
+    view = trajectory.view()
+    observation = Observation.empty()
+    per_step = 0.0
+    for i in range(nb_steps):
+        _ = await view.start_step()
+        await view.append(observation, force=True)
+        await view.append(AgentCompletion.initial(url=f"https://example.com/{i}"), force=True)
+        await view.append(ExecutionResult(action=ClickAction(id=f"B{i}"), success=True, message="ok"), force=True)
+        _ = await view.stop_step()
+
+        # accessors used by the agent / session at every step
+        start = time.perf_counter()
+        _ = view.last_observation
+        _ = view.last_result
+        _ = view.last_completion
+        _ = view.num_steps
+        _ = list(view.step_starts)
+        _ = view._get_by_step(i)  # pyright: ignore [reportPrivateUsage]
+        _ = len(view)
+        per_step += time.perf_counter() - start
+    return view, per_step
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--nb-steps", type=int, default=500)
+    args = parser.parse_args()
+
+    view, per_step = asyncio.run(build(args.nb_steps))
+    print(f"{args.nb_steps} steps, {len(view)} elements")
+    print(f"per-step accessors: {per_step * 1000:8.2f}ms total, {per_step / args.nb_steps * 1e6:8.1f}us per step")
+
+    iterations = {
+        "execution_results": lambda: list(view.execution_results()),
+        "agent_completions": lambda: list(view.agent_completions()),
+        "step_iterator": lambda: list(view.step_iterator()),
+        "all_screenshots": lambda: list(view.all_screenshots()),
+    }
+    for name, iteration in iterations.items():
+        start = time.perf_counter()
+        for _ in range(10):
+            _ = iteration()
+        print(f"{name + ':':<19} {(time.perf_counter() - start) * 100:8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,7 +23,7 @@ from notte_core.credentials.base import BaseVault, LocatorAttributes
 from notte_core.errors.base import ErrorConfig, NotteBaseError
 from notte_core.llms.engine import LLMEngine
 from notte_core.profiling import profiler
-from notte_core.trajectory import Trajectory
+from notte_core.trajectory import Trajectory, TrajectoryElement
 from notte_sdk.types import AgentRunRequest, AgentRunRequestDict
 from typing_extensions import override
 
@@ -67,6 +67,11 @@ class NotteAgent(BaseAgent):
         self.created_at: dt.datetime = dt.datetime.now()
         self.max_consecutive_failures: int = config.max_consecutive_failures
         self.consecutive_failures: int = 0
+        # setup messages + already formatted trajectory steps, extended incrementally by `get_messages`
+        self._conv: Conversation | None = None
+        self._conv_setup: tuple[str, str] | None = None
+        self._conv_nb_elements: int = 0
+        self._conv_last_element: TrajectoryElement | None = None
         # validator a LLM as a Judge that validates the agent's attempt at completing the task (i.e. `CompletionAction`)
         self.validator: CompletionValidator = CompletionValidator(
             llm=self.llm, perception=self.perception, use_vision=self.config.use_vision
@@ -234,8 +239,8 @@ class NotteAgent(BaseAgent):
         """
         Formats a trajectory into a list of messages for the LLM, including the current observation.
 
-        For every resonning model step, the conversation is reset.
-        The conversation follows the following format:
+        For every resonning model step, the conversation is rebuilt from the trajectory
+        (incrementally, see `trajectory_conversation`). The conversation follows the following format:
 
         ### Setup messages
         - [system]        : system prompt containing the initial instructions + action tool calls info
@@ -249,40 +254,13 @@ class NotteAgent(BaseAgent):
 
         /!\\ If `use_vision` is enabled, the DOM perception message will contain a screenshot of the page.
         """
-        conv: Conversation = Conversation(
-            convert_tools_to_assistant=True, autosize=True, model=self.config.reasoning_model
-        )
-        system_msg, task_msg = self.prompt.system(), self.prompt.task(task)
-        if self.vault is not None:
-            system_msg += "\n" + self.vault.instructions()
-        conv.add_system_message(content=system_msg)
-        conv.add_user_message(content=task_msg)
-
-        # otherwise, add all past trajectorysteps to the conversation
-        for step in self.trajectory:
-            match step:
-                case AgentCompletion():
-                    # TODO: choose if we want this to be an assistant message or a tool message
-                    # self.conv.add_tool_message(step.agent_response, tool_id="step")
-                    conv.add_assistant_message(
-                        step.model_dump_json(exclude_none=True, context=dict(hide_interactions=True))
-                    )
-                case ExecutionResult():
-                    # add step execution status to the conversation
-                    conv.add_user_message(
-                        content=self.perception.perceive_action_result(step, include_ids=False, include_data=True)
-                    )
-
-                # observation or screenshot
-                case _:
-                    # TODO: add partial info for previous?
-                    pass
+        conv = self.trajectory_conversation(task).fork()
 
         # Add current observation (only if it's not empty)
         last_obs = self.trajectory.last_observation
         if last_obs is not None and last_obs is not Observation.empty():
             perceived_content = self.perception.perceive(obs=last_obs, progress=self.progress)
-            image = last_obs.screenshot.bytes() if self.config.use_vision else None
+            image = (await last_obs.screenshot.abytes()) if self.config.use_vision else None
             conv.add_user_message(
                 content=perceived_content,
                 image=image,
@@ -296,6 +274,56 @@ class NotteAgent(BaseAgent):
 
         return conv.messages()
 
+    def trajectory_conversation(self, task: str) -> Conversation:
+        """
+        Setup + trajectory messages of `get_messages`.
+
+        The conversation is kept between calls: only trajectory elements appended since the previous call are
+        formatted (and token counted). It is rebuilt from scratch if the setup messages or the trajectory changed.
+        """
+        system_msg, task_msg = self.prompt.system(), self.prompt.task(task)
+        if self.vault is not None:
+            system_msg += "\n" + self.vault.instructions()
+
+        elements = self.trajectory.inner_elements
+        nb_done = self._conv_nb_elements
+        if (
+            self._conv is None
+            or self._conv_setup != (system_msg, task_msg)
+            or len(elements) < nb_done
+            or (nb_done > 0 and elements[nb_done - 1] is not self._conv_last_element)
+        ):
+            self._conv = Conversation(convert_tools_to_assistant=True, autosize=True, model=self.config.reasoning_model)
+            self._conv.add_system_message(content=system_msg)
+            self._conv.add_user_message(content=task_msg)
+            self._conv_setup = (system_msg, task_msg)
+            nb_done = 0
+
+        conv = self._conv
+        # add all new past trajectory steps to the conversation
+        for element in elements[nb_done:]:
+            if element.kind in ("observation", "screenshot"):
+                # TODO: add partial info for previous?
+                # (skipped before accessing `inner`: old observations can be spilled to disk)
+                continue
+            match element.inner:
+                case AgentCompletion() as step:
+                    # TODO: choose if we want this to be an assistant message or a tool message
+                    # self.conv.add_tool_message(step.agent_response, tool_id="step")
+                    conv.add_assistant_message(
+                        step.model_dump_json(exclude_none=True, context=dict(hide_interactions=True))
+                    )
+                case ExecutionResult() as step:
+                    # add step execution status to the conversation
+                    conv.add_user_message(
+                        content=self.perception.perceive_action_result(step, include_ids=False, include_data=True)
+                    )
+                case _:
+                    pass
+        self._conv_nb_elements = len(elements)
+        self._conv_last_element = elements[-1] if len(elements) > 0 else None
+        return conv
+
     @profiler.profiled()
     @track_usage("local.agent.run")
     @override
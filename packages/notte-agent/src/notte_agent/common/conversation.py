@@ -52,6 +52,12 @@ class Conversation(BaseModel):
     conservative_factor: float = 0.8
 
     _total_tokens: int = PrivateAttr(default=0)
+    # `history[:_nb_init_messages]` are the messages always kept by `trim_history_to_fit`
+    # (system messages + first user message), `history[:_nb_classified]` have already been classified
+    _nb_init_messages: int = PrivateAttr(default=0)
+    _nb_classified: int = PrivateAttr(default=0)
+    _init_tokens: int = PrivateAttr(default=0)
+    _is_init_phase: bool = PrivateAttr(default=True)
     convert_tools_to_assistant: bool = False
 
     @override
@@ -79,55 +85,65 @@ class Conversation(BaseModel):
         """Get total tokens in conversation history"""
         return self._total_tokens
 
-    def trim_history_to_fit(self, new_content: AllMessageValues) -> None:
+    def _classify_new_messages(self) -> None:
+        """Moves init messages added since the last call right after the previous init messages"""
+        for idx in range(self._nb_classified, len(self.history)):
+            msg = self.history[idx]
+            match self._is_init_phase, msg.message["role"]:
+                case True, "system" | "user":
+                    if msg.message["role"] == "user":
+                        # keep first user message as init message (need task description)
+                        self._is_init_phase = False
+                    if idx != self._nb_init_messages:
+                        del self.history[idx]
+                        self.history.insert(self._nb_init_messages, msg)
+                    self._nb_init_messages += 1
+                    self._init_tokens += msg.token_count
+                case _, _:
+                    pass
+        self._nb_classified = len(self.history)
+
+    def trim_history_to_fit(self, new_content: AllMessageValues, new_content_tokens: int | None = None) -> None:
         """Trim history to make room for new content while preserving system messages"""
         if not self.autosize:
             return
 
         # Always keep system messages
-        init_messages: list[CachedMessage] = []
-        other_messages: list[CachedMessage] = []
-        is_init_msg = True
-        for msg in self.history:
-            match is_init_msg, msg.message["role"]:
-                case True, "system":
-                    init_messages.append(msg)
-                case True, "user":
-                    # keep first user message as init message (need task description)
-                    is_init_msg = False
-                    init_messages.append(msg)
-                case _, _:
-                    other_messages.append(msg)
+        self._classify_new_messages()
 
-        new_content_tokens = self.count_tokens(new_content)
-        init_tokens = sum(msg.token_count for msg in init_messages)
-        available_tokens = self.conservative_max_tokens - init_tokens - new_content_tokens
+        if new_content_tokens is None:
+            new_content_tokens = self.count_tokens(new_content)
+        available_tokens = self.conservative_max_tokens - self._init_tokens - new_content_tokens
 
         # Remove oldest non-system messages until we have room
-        current_tokens = sum(msg.token_count for msg in other_messages)
+        current_tokens = self._total_tokens - self._init_tokens
         has_trimmed = 0
-        while other_messages and current_tokens > available_tokens:
-            removed = other_messages.pop(0)
-            current_tokens -= removed.token_count
+        nb_messages = len(self.history)
+        while self._nb_init_messages + has_trimmed < nb_messages and current_tokens > available_tokens:
+            current_tokens -= self.history[self._nb_init_messages + has_trimmed].token_count
             has_trimmed += 1
 
         if has_trimmed > 0:
             logger.info(
                 f"Trimmed {has_trimmed} message(s) to stay under max token limit (i.e {self.default_max_tokens // 1000}k)"
             )
-
-        self.history = init_messages + other_messages
-        self._total_tokens = sum(msg.token_count for msg in self.history)
+            del self.history[self._nb_init_messages : self._nb_init_messages + has_trimmed]
+            self._nb_classified -= has_trimmed
+            self._total_tokens = self._init_tokens + current_tokens
 
     def _add_message(self, msg: AllMessageValues) -> None:
         """Internal helper to add a message with token counting"""
         token_count = self.count_tokens(msg)
         if self.autosize:
-            self.trim_history_to_fit(msg)
+            self.trim_history_to_fit(msg, new_content_tokens=token_count)
         cached_msg = CachedMessage(message=msg, token_count=token_count)
         self.history.append(cached_msg)
         self._total_tokens += token_count
 
+    def fork(self) -> Conversation:
+        """Copy of the conversation that can be extended without modifying this one"""
+        return self.model_copy(update={"history": list(self.history)})
+
     def add_system_message(self, content: str) -> None:
         """Add a system message to the conversation"""
         self._add_message(ChatCompletionSystemMessage(role="system", content=content))
@@ -252,3 +268,7 @@ class Conversation(BaseModel):
         """Clear all messages from the conversation"""
         self.history.clear()
         self._total_tokens = 0
+        self._nb_init_messages = 0
+        self._nb_classified = 0
+        self._init_tokens = 0
+        self._is_init_phase = True
@@ -1,5 +1,6 @@
 import datetime as dt
 import json
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Annotated, Any, Literal
 
@@ -10,7 +11,7 @@ from notte_core.browser.observation import Screenshot
 from notte_core.common.config import ScreenshotType, config
 from notte_core.common.tracer import LlmUsageDictTracer
 from notte_core.trajectory import Trajectory
-from notte_core.utils.webp_replay import ScreenshotReplay, WebpReplay
+from notte_core.utils.webp_replay import WebpReplay, build_webp_replay, replay_size
 from pydantic import BaseModel, Field, computed_field
 from typing_extensions import override
 
@@ -50,23 +51,24 @@ class AgentResponse(BaseModel):
         return [obs.screenshot for obs in self.trajectory.observations()]
 
     def replay(self, step_texts: bool = True, screenshot_type: ScreenshotType = config.screenshot_type) -> WebpReplay:
-        screenshots: list[bytes] = []
-        texts: list[str] = []
+        def observed_steps() -> Iterator[tuple[Screenshot, str]]:
+            for bundle in self.trajectory.step_iterator():
+                if bundle.observation is not None and bundle.agent_completion is not None:
+                    yield bundle.observation.screenshot, bundle.agent_completion.state.next_goal
 
-        for bundle in self.trajectory.step_iterator():
-            if bundle.observation is None or bundle.agent_completion is None:
-                continue
+        # a first pass collects the (small) step texts and the frame size, the screenshots are then streamed
+        texts: list[str] = []
 
-            screenshots.append(bundle.observation.screenshot.bytes(screenshot_type))
-            texts.append(bundle.agent_completion.state.next_goal)
+        def raw_screenshots() -> Iterator[bytes]:
+            for screenshot, text in observed_steps():
+                texts.append(text)
+                yield screenshot.raw
 
-        if len(screenshots) == 0:
+        size = replay_size(raw_screenshots(), scale_factor=0.7)
+        if len(texts) == 0:
             raise ValueError("No screenshots found in agent trajectory")
-
-        if step_texts:
-            return ScreenshotReplay.from_bytes(screenshots).get(step_text=texts)  # pyright: ignore [reportArgumentType]
-        else:
-            return ScreenshotReplay.from_bytes(screenshots).get()
+        frames = (screenshot.bytes(screenshot_type) for screenshot, _ in observed_steps())
+        return WebpReplay(build_webp_replay(frames, step_text=texts if step_texts else None, size=size))
 
     def save_actions(self, file_path: str, id_type: Literal["selector", "id"] = "selector") -> None:
         if not file_path.endswith(".json"):
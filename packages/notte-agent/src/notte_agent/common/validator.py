@@ -124,7 +124,7 @@ Your turn:
 
         self.conv.add_user_message(
             content=validation_message,
-            image=(last_obs.screenshot.bytes() if self.use_vision else None),
+            image=((await last_obs.screenshot.abytes()) if self.use_vision else None),
         )
 
         answer: CompletionValidation = await self.llm.structured_completion(self.conv.messages(), CompletionValidation)
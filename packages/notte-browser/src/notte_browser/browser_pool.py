@@ -0,0 +1,342 @@
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import ClassVar, Self
+from urllib.parse import urlparse
+
+from loguru import logger
+from notte_core.common.config import config
+from notte_core.profiling import profiler
+from notte_sdk.types import SessionStartRequest
+from typing_extensions import override
+
+from notte_browser.playwright import BaseWindowManager, PlaywrightManager
+from notte_browser.playwright_async_api import Browser, BrowserContext, Page
+from notte_browser.window import BrowserResource, BrowserWindow, BrowserWindowOptions
+
+
+@dataclass
+class PooledContext:
+    context: BrowserContext
+    # options the context was created with (i.e. its viewport)
+    options: BrowserWindowOptions
+    # origins visited since the last reset, whose storage has to be cleared before the context is reused
+    origins: set[str] = field(default_factory=set)
+
+    def visit(self, url: str) -> None:
+        parsed = urlparse(url)
+        if parsed.scheme in ("http", "https") and parsed.netloc:
+            self.origins.add(f"{parsed.scheme}://{parsed.netloc}")
+
+
+@dataclass
+class PooledBrowser:
+    browser: Browser
+    key: str
+    # number of contexts checked out from this browser since it was launched / currently in use
+    uses: int = 0
+    active: int = 0
+    # retired browsers don't serve new contexts and are closed once their last context is released
+    retired: bool = False
+    idle_contexts: list[PooledContext] = field(default_factory=list)
+
+    @property
+    def available(self) -> bool:
+        return not self.retired and self.browser.is_connected()
+
+
+class BrowserPool(BaseWindowManager):
+    """
+    Warm pool of browsers shared by the sessions of the process.
+
+    Browsers are keyed by their compatible `BrowserWindowOptions` (browser type, headless, proxy, user agent,
+    viewport, chrome args) and keep pre-created contexts ready to be checked out. Released contexts are recycled
+    after their cookies and the storage of the visited origins have been cleared, and browsers are replaced after
+    `max_uses_per_browser` sessions or as soon as they get disconnected. At most `max_browsers` browsers are kept
+    across all keys: idle browsers of the least recently used keys are closed to make room for new ones.
+
+    Playwright objects are bound to the event loop they were created in: a pool can only be used from one loop.
+    """
+
+    _default: ClassVar["BrowserPool | None"] = None
+    _installed: ClassVar[bool] = False
+
+    def __init__(
+        self,
+        size: int = config.browser_pool_size,
+        max_uses_per_browser: int = config.browser_pool_max_uses,
+        max_contexts_per_browser: int = 8,
+        max_idle_contexts_per_browser: int = 2,
+        max_browsers: int = config.browser_pool_max_browsers,
+        manager: PlaywrightManager | None = None,
+    ) -> None:
+        if size < 1:
+            raise ValueError("Browser pool size should be at least 1")
+        if max_browsers < size:
+            raise ValueError(f"Browser pool max_browsers ({max_browsers}) should be at least its size ({size})")
+        self.size: int = size
+        self.max_uses_per_browser: int = max_uses_per_browser
+        self.max_contexts_per_browser: int = max_contexts_per_browser
+        self.max_idle_contexts_per_browser: int = max_idle_contexts_per_browser
+        self.max_browsers: int = max_browsers
+        self.manager: PlaywrightManager = manager or PlaywrightManager()
+        self._browsers: dict[str, list[PooledBrowser]] = defaultdict(list)
+        self._locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # monotonic time of the last acquire for each key, used to evict the least recently used idle browsers
+        self._last_used: dict[str, float] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @classmethod
+    def default(cls) -> "BrowserPool | None":
+        """Process-wide pool used by `NotteSession`, enabled by setting `browser_pool_size > 0` in the config"""
+        if cls._installed:
+            return cls._default
+        if config.browser_pool_size <= 0:
+            return None
+        loop = asyncio.get_running_loop()
+        if cls._default is None or cls._default._loop not in (None, loop):
+            if cls._default is not None:
+                logger.warning("🪟 [Browser Pool] Event loop changed, starting a new browser pool")
+            cls._default = BrowserPool()
+        return cls._default
+
+    def install(self) -> Self:
+        """Use this pool as the process-wide pool of `NotteSession`, whatever the config (until it is stopped)"""
+        BrowserPool._default = self
+        BrowserPool._installed = True
+        return self
+
+    @staticmethod
+    def key(options: BrowserWindowOptions) -> str:
+        exclude = {"solve_captchas", "cdp_url"}
+        if options.default_viewport:
+            # any randomized default viewport will do
+            exclude |= {"viewport_width", "viewport_height"}
+        return options.model_dump_json(exclude=exclude)
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is None:
+            self._loop = loop
+        elif self._loop is not loop:
+            raise RuntimeError("BrowserPool can only be used from the event loop it was started in")
+
+    @override
+    async def astart(self) -> None:
+        self._bind_loop()
+        await self.manager.astart()
+
+    @override
+    async def astop(self) -> None:
+        for task in list(self._tasks):
+            _ = task.cancel()
+        browsers = [browser for browsers in self._browsers.values() for browser in browsers]
+        self._browsers.clear()
+        self._last_used.clear()
+        for browser in browsers:
+            await self._close_browser(browser)
+        await self.manager.astop()
+        self._loop = None
+        if BrowserPool._installed and BrowserPool._default is self:
+            BrowserPool._default = None
+            BrowserPool._installed = False
+
+    def __len__(self) -> int:
+        return sum(len(browsers) for browsers in self._browsers.values())
+
+    async def warmup(self, options: BrowserWindowOptions | None = None) -> None:
+        """Launch `size` browsers, each with a pre-created context, for the given options"""
+        await self.astart()
+        options = options or BrowserWindowOptions.from_request(SessionStartRequest())
+        await self._replenish(self.key(options), options)
+
+    def _pick(self, key: str) -> PooledBrowser | None:
+        browsers = self._browsers[key]
+        # health check: evict the browsers that crashed or got disconnected
+        for browser in [browser for browser in browsers if not browser.browser.is_connected()]:
+            logger.warning("🪟 [Browser Pool] Evicting disconnected browser")
+            browsers.remove(browser)
+        candidates = [b for b in browsers if b.available and b.active < self.max_contexts_per_browser]
+        # prefer browsers with a warm context, then the least loaded ones
+        return min(candidates, key=lambda b: (len(b.idle_contexts) == 0, b.active), default=None)
+
+    async def _launch(self, key: str, options: BrowserWindowOptions) -> PooledBrowser:
+        browser = PooledBrowser(browser=await self.manager.create_playwright_browser(options), key=key)
+        self._browsers[key].append(browser)
+        return browser
+
+    def _evict_idle(self, key: str) -> PooledBrowser | None:
+        """Remove an idle browser of the least recently used other key from the pool (the caller closes it)"""
+        idle = [browser for other, browsers in self._browsers.items() if other != key for browser in browsers]
+        idle = [browser for browser in idle if browser.active == 0]
+        if len(idle) == 0:
+            return None
+        browser = min(idle, key=lambda b: self._last_used.get(b.key, 0.0))
+        browser.retired = True
+        browsers = self._browsers[browser.key]
+        browsers.remove(browser)
+        if len(browsers) == 0:
+            del self._browsers[browser.key]
+            _ = self._last_used.pop(browser.key, None)
+        return browser
+
+    async def _make_room(self, key: str) -> bool:
+        """Close idle browsers of other keys until a browser can be launched without exceeding `max_browsers`"""
+        while len(self) >= self.max_browsers:
+            browser = self._evict_idle(key)
+            if browser is None:
+                return False
+            logger.info("🪟 [Browser Pool] Closing idle browser of least recently used options")
+            await self._close_browser(browser)
+        return True
+
+    async def _new_context(self, browser: PooledBrowser, options: BrowserWindowOptions) -> PooledContext:
+        async with asyncio.timeout(self.manager.BROWSER_OPERATION_TIMEOUT_SECONDS):
+            context = PooledContext(
+                context=await self.manager.create_context(options, browser.browser), options=options
+            )
+
+        def track(page: Page) -> None:
+            page.on("framenavigated", lambda frame: context.visit(frame.url))
+
+        context.context.on("page", track)
+        for page in context.context.pages:
+            track(page)
+        return context
+
+    async def _replenish(self, key: str, options: BrowserWindowOptions) -> None:
+        """Keep `size` browsers for this key, each with at least one pre-created context"""
+        async with self._locks[key]:
+            browsers = [browser for browser in self._browsers[key] if browser.available]
+            for _ in range(self.size - len(browsers)):
+                if not await self._make_room(key):
+                    break
+                browsers.append(await self._launch(key, options))
+        for browser in browsers:
+            if browser.available and len(browser.idle_contexts) == 0:
+                browser.idle_contexts.append(await self._new_context(browser, options))
+
+    def _spawn_replenish(self, key: str, options: BrowserWindowOptions) -> None:
+        async def replenish() -> None:
+            try:
+                await self._replenish(key, options)
+            except Exception as e:
+                logger.warning(f"🪟 [Browser Pool] Failed to warm up browsers: {e}")
+
+        task = asyncio.create_task(replenish())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @profiler.profiled()
+    async def acquire(self, options: BrowserWindowOptions) -> tuple[PooledBrowser, PooledContext]:
+        await self.astart()
+        key = self.key(options)
+        async with self._locks[key]:
+            self._last_used[key] = time.monotonic()
+            browser = self._pick(key)
+            if browser is None:
+                if not await self._make_room(key):
+                    logger.warning(
+                        f"🪟 [Browser Pool] All {len(self)} pooled browsers are busy, exceeding max_browsers"
+                    )
+                browser = await self._launch(key, options)
+            browser.uses += 1
+            browser.active += 1
+            if browser.uses >= self.max_uses_per_browser:
+                browser.retired = True
+        try:
+            context = (
+                browser.idle_contexts.pop() if browser.idle_contexts else await self._new_context(browser, options)
+            )
+        except BaseException:
+            await self.release(browser, None)
+            raise
+        self._spawn_replenish(key, options)
+        return browser, context
+
+    async def release(self, browser: PooledBrowser, context: PooledContext | None) -> None:
+        browser.active -= 1
+        if browser.active == 0 and not browser.retired and len(self) > self.max_browsers:
+            # shrink back under the bound once the burst that exceeded it is over
+            browser.retired = True
+        if context is not None:
+            if (
+                browser.available
+                and len(browser.idle_contexts) < self.max_idle_contexts_per_browser
+                and await self._reset(context)
+                # the browser may have been retired or disconnected while resetting the context
+                and browser.available
+            ):
+                browser.idle_contexts.append(context)
+            else:
+                await self._close_context(context)
+        if browser.retired and browser.active == 0:
+            if browser in self._browsers[browser.key]:
+                self._browsers[browser.key].remove(browser)
+            await self._close_browser(browser)
+
+    async def _reset(self, context: PooledContext) -> bool:
+        """Close the pages, and clear the cookies and the storage (local storage, indexeddb, service workers, ...)"""
+        try:
+            async with asyncio.timeout(self.manager.BROWSER_OPERATION_TIMEOUT_SECONDS):
+                for page in context.context.pages:
+                    await page.close()
+                page = await context.context.new_page()
+                if len(context.origins) > 0:
+                    cdp = await context.context.new_cdp_session(page)
+                    for origin in context.origins:
+                        _ = await cdp.send(  # pyright: ignore[reportUnknownMemberType, reportUnknownVariableType]
+                            "Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"}
+                        )
+                    await cdp.detach()
+                    context.origins.clear()
+                await context.context.clear_cookies()
+            return True
+        except Exception as e:
+            logger.warning(f"🪟 [Browser Pool] Failed to reset browser context, closing it: {e}")
+            return False
+
+    async def _close_context(self, context: PooledContext) -> None:
+        try:
+            async with asyncio.timeout(self.manager.BROWSER_OPERATION_TIMEOUT_SECONDS):
+                await context.context.close()
+        except Exception as e:
+            logger.debug(f"🪟 [Browser Pool] Failed to close browser context: {e}")
+
+    async def _close_browser(self, browser: PooledBrowser) -> None:
+        browser.retired = True
+        try:
+            async with asyncio.timeout(self.manager.BROWSER_OPERATION_TIMEOUT_SECONDS):
+                await browser.browser.close()
+        except Exception as e:
+            logger.debug(f"🪟 [Browser Pool] Failed to close browser: {e}")
+
+    @override
+    async def new_window(self, options: BrowserWindowOptions | None = None) -> BrowserWindow:
+        options = options or BrowserWindowOptions.from_request(SessionStartRequest())
+        if options.cdp_url is not None:
+            raise ValueError("Browsers connected over CDP can't be pooled")
+        browser, context = await self.acquire(options)
+        try:
+            page = context.context.pages[-1] if len(context.context.pages) > 0 else await context.context.new_page()
+        except BaseException:
+            await self.release(browser, context)
+            raise
+        # the pooled context may have been created with another randomized default viewport
+        options = options.model_copy(
+            update={
+                "viewport_width": context.options.viewport_width,
+                "viewport_height": context.options.viewport_height,
+            }
+        )
+        released = False
+
+        async def on_close() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                await self.release(browser, context)
+
+        return BrowserWindow(resource=BrowserResource(page=page, options=options), on_close=on_close)
@@ -74,7 +74,7 @@ class BrowserController:
         tab_page = context.pages[tab_index]
         await tab_page.bring_to_front()
         window.page = tab_page
-        await window.long_wait()
+        await window.settle("switch_tab", "long")
         if self.verbose:
             logger.info(
                 f"🪦 Switched to tab {tab_index} with url: {tab_page.url} ({len(context.pages)} tabs in context)"
@@ -106,7 +106,7 @@ class BrowserController:
                 await window.goto_and_wait(operation="forward")
             case ReloadAction():
                 _ = await window.page.reload()
-                await window.long_wait()
+                await window.settle(action.type, "long")
             case PressKeyAction(key=key):
                 await window.page.keyboard.press(key)
             case ScrollUpAction(amount=amount) | ScrollDownAction(amount=amount):
@@ -116,22 +116,22 @@ class BrowserController:
                         document.activeElement.blur();
                     }
                 """)
-                await window.short_wait()
+                await window.settle(action.type)
                 # compute current scroll position for comparison after execution
-                scroll_position = await window.page.evaluate("window.scrollY")
+                viewport = await window.viewport()
+                scroll_position = viewport.scroll_y
                 if amount is not None:
                     await window.page.mouse.wheel(
                         delta_x=0, delta_y=(-amount if isinstance(action, ScrollUpAction) else amount)
                     )
                 else:
                     # Calculate 70% of viewport height for scroll amount
-                    viewport_height = await window.page.evaluate("window.innerHeight")
-                    scroll_amount = int(viewport_height * 0.7)
+                    scroll_amount = int(viewport.viewport_height * 0.7)
                     await window.page.mouse.wheel(
                         delta_x=0, delta_y=(-scroll_amount if isinstance(action, ScrollUpAction) else scroll_amount)
                     )
-                await window.short_wait()
-                new_scroll_position = await window.page.evaluate("window.scrollY")
+                await window.settle(action.type)
+                new_scroll_position = int(await window.page.evaluate("window.scrollY"))
                 if new_scroll_position == scroll_position:
                     logger.info(
                         f"🪦 Scroll action did not change scroll position (i.e before={scroll_position}, after={new_scroll_position}). Failing action..."
@@ -175,9 +175,9 @@ class BrowserController:
 
                     if action.clear_before_fill:
                         await window.page.keyboard.press(key=f"{platform_control_key()}+A")
-                        await window.short_wait()
+                        await window.settle(action.type)
                         await window.page.keyboard.press(key="Backspace")
-                        await window.short_wait()
+                        await window.settle(action.type)
 
                     # Use isolated clipboard variable instead of system clipboard
                     await window.page.evaluate(
@@ -196,10 +196,10 @@ class BrowserController:
                         value,
                     )
 
-                    await window.short_wait()
+                    await window.settle(action.type)
                 else:
                     await locator.fill(get_str_value(value), timeout=action_timeout, force=action.clear_before_fill)
-                    await window.short_wait()
+                    await window.settle(action.type)
             case MultiFactorFillAction(value=value):
                 # click the locator, then fill in one number at a time
                 await locator.click()
@@ -210,7 +210,7 @@ class BrowserController:
             case FallbackFillAction(value=value):
                 await locator.click()
                 await locator.press_sequentially(get_str_value(value), delay=100)
-                await window.short_wait()
+                await window.settle(action.type)
             case CheckAction(value=value):
                 if value:
                     await locator.check()
@@ -338,12 +338,12 @@ class BrowserController:
         if press_enter:
             if self.verbose:
                 logger.info(f"🪦 Pressing enter for action {action.id}")
-                await window.short_wait()
+                await window.settle(action.type)
             await window.page.keyboard.press("Enter")
         if original_url != window.page.url:
             if self.verbose:
                 logger.info(f"🪦 Page navigation detected for action {action.id} waiting for networkidle")
-            await window.long_wait()
+            await window.settle(action.type, "long")
 
         return True
 
@@ -377,8 +377,7 @@ class BrowserController:
                 raise ValueError(f"Unsupported action type: {type(action)}")
         # add short wait before we check for new tabs to make sure that
         # the page has time to be created
-        await window.short_wait()
-        await window.short_wait()
+        await window.settle(action.type, bound_ms=2 * config.wait_short_ms)
         if len(context.pages) != num_pages:
             if self.verbose:
                 id_str = f" id={action.id}" if isinstance(action, InteractionAction) else ""
@@ -1,6 +1,6 @@
 // file taken from: https://github.com/browser-use/browser-use/blob/main/browser_use/dom/buildDomTree.js
 (
-	{ highlight_elements, focus_element, viewport_expansion, enable_pointer_elements }
+	{ highlight_elements, focus_element, viewport_expansion, enable_pointer_elements, subtree_roots = null, highlight_index_offset = 0 }
 ) => {
 	const { doHighlightElements, focusHighlightIndex, viewportExpansion, debugMode } = {
 		doHighlightElements: highlight_elements,
@@ -8,7 +8,8 @@
 		viewportExpansion: viewport_expansion,
 		debugMode: false,
 	};
-	let highlightIndex = 0; // Reset highlight index
+	// Reset highlight index (offset when only re-parsing subtrees of a previous snapshot to keep indices unique)
+	let highlightIndex = highlight_index_offset;
 
 	// Add caching mechanisms at the top level
 	const DOM_CACHE = {
@@ -1173,6 +1174,24 @@
 		return id;
 	}
 
+	// Incremental mode: only re-parse the requested main document subtrees
+	if (subtree_roots) {
+		const roots = {};
+		const missing = [];
+		for (const { xpath, parent_highlighted } of subtree_roots) {
+			const element = document.evaluate(
+				xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+			).singleNodeValue;
+			if (!element) {
+				missing.push(xpath);
+				continue;
+			}
+			roots[xpath] = buildDomTree(element, null, parent_highlighted);
+		}
+		DOM_CACHE.clearCache();
+		return { rootId: null, roots, missing, map: DOM_HASH_MAP };
+	}
+
 	const rootId = buildDomTree(document.body);
 
 	// Clear the cache before starting
@@ -1,10 +1,45 @@
+import re
 from collections import defaultdict
+from collections.abc import Mapping, Sequence
 
 from loguru import logger
 from notte_core.browser.node_type import NodeRole
 from notte_core.profiling import profiler
 
-from notte_browser.dom.types import DOMBaseNode
+from notte_browser.dom.types import DOMBaseNode, DOMElementNode
+
+ID_PATTERN = re.compile(r"^([A-Za-z]+)(\d+)$")
+
+
+def node_id_prefix(node: DOMBaseNode) -> str | None:
+    """
+    Returns the short ID prefix of an interactive node (i.e. with a highlight index), None otherwise.
+    """
+    role = NodeRole.from_value(node.role)
+    if isinstance(role, str):
+        logger.debug(f"Unsupported role to convert to ID: {node}. Please add this role to the NodeRole e logic ASAP.")
+        return None
+    if node.highlight_index is None:
+        return None
+    id = role.short_id(force_id=True)
+    if id is None:
+        raise ValueError(
+            (
+                f"Role {role} was incorrectly converted from raw Dom Node."
+                " It is an interaction node. It should have a short ID but is currently None"
+            )
+        )
+    return id
+
+
+def _iter_nodes(root: DOMBaseNode) -> list[DOMBaseNode]:
+    stack = [root]
+    nodes: list[DOMBaseNode] = []
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(reversed(node.children))
+    return nodes
 
 
 @profiler.profiled()
@@ -13,29 +48,54 @@ def generate_sequential_ids(root: DOMBaseNode) -> DOMBaseNode:
     Generates sequential IDs for interactive elements in the accessibility tree
     using depth-first search.
     """
-    stack = [root]
     id_counter: defaultdict[str, int] = defaultdict(lambda: 1)
-    while stack:
-        node = stack.pop()
-        children = node.children
+    for node in _iter_nodes(root):
+        id = node_id_prefix(node)
+        if id is not None:
+            node.notte_id = f"{id}{id_counter[id]}"
+            id_counter[id] += 1
 
-        role = NodeRole.from_value(node.role)
-        if isinstance(role, str):
-            logger.debug(
-                f"Unsupported role to convert to ID: {node}. Please add this role to the NodeRole e logic ASAP."
-            )
-        elif node.highlight_index is not None:
-            id = role.short_id(force_id=True)
-            if id is not None:
-                node.notte_id = f"{id}{id_counter[id]}"
-                id_counter[id] += 1
-            else:
-                raise ValueError(
-                    (
-                        f"Role {role} was incorrectly converted from raw Dom Node."
-                        " It is an interaction node. It should have a short ID but is currently None"
-                    )
-                )
-        stack.extend(reversed(children))
+    return root
+
+
+@profiler.profiled()
+def generate_incremental_ids(
+    root: DOMBaseNode, subtrees: Sequence[DOMBaseNode], previous_ids: Mapping[str, str]
+) -> DOMBaseNode:
+    """
+    Generates IDs for the interactive elements of freshly re-parsed `subtrees` of `root`.
+
+    Nodes outside of `subtrees` keep their IDs. Nodes inside `subtrees` reuse the ID of the previous
+    node with the same notte selector (see `previous_ids`) when available, otherwise they get a new ID
+    that continues the existing sequence of their role.
+    """
+    subtree_nodes = [node for subtree in subtrees for node in _iter_nodes(subtree)]
+    for node in subtree_nodes:
+        node.notte_id = None
+
+    taken: set[str] = set()
+    id_counter: defaultdict[str, int] = defaultdict(lambda: 1)
+    for node in _iter_nodes(root):
+        if node.notte_id is None:
+            continue
+        taken.add(node.notte_id)
+        match = ID_PATTERN.match(node.notte_id)
+        if match is not None:
+            prefix, number = match.groups()
+            id_counter[prefix] = max(id_counter[prefix], int(number) + 1)
+
+    for node in subtree_nodes:
+        id = node_id_prefix(node)
+        if id is None:
+            continue
+        previous = previous_ids.get(node.notte_selector) if isinstance(node, DOMElementNode) else None
+        previous_match = ID_PATTERN.match(previous) if previous is not None else None
+        if previous is not None and previous_match is not None and previous_match[1] == id and previous not in taken:
+            notte_id = previous
+        else:
+            notte_id = f"{id}{id_counter[id]}"
+            id_counter[id] += 1
+        node.notte_id = notte_id
+        taken.add(notte_id)
 
     return root
@@ -0,0 +1,162 @@
+from pathlib import Path
+from typing import Any, ClassVar
+
+from loguru import logger
+from notte_core.browser.dom_tree import DomErrorBuffer
+from notte_core.browser.dom_tree import DomNode as NotteDomNode
+from notte_core.common.config import config
+from notte_core.profiling import profiler
+from typing_extensions import TypedDict
+
+from notte_browser.dom.id_generation import generate_incremental_ids, generate_sequential_ids
+from notte_browser.dom.parsing import DOM_TREE_JS_PATH, ParseDomTreePipe
+from notte_browser.dom.types import DOMBaseNode, DOMElementNode
+from notte_browser.playwright_async_api import Page
+
+MUTATION_TRACKER_JS_PATH = Path(__file__).parent / "trackMutations.js"
+
+
+class MutationTrackerDict(TypedDict):
+    installed: bool
+    overflow: bool
+    layout_changed: bool
+    dirty: list[str]
+
+
+class IncrementalParseDomTreePipe:
+    """
+    Stateful version of `ParseDomTreePipe` used when `config.incremental_snapshot` is enabled.
+
+    A MutationObserver injected in the page (see `trackMutations.js`) records the subtrees mutated since the
+    previous snapshot. Only those subtrees are re-evaluated by `buildDomNode.js` and patched into the previous
+    tree, which keeps the IDs of untouched nodes stable. Any situation the tracker cannot account for
+    (navigation, page switch, scroll, resize, iframes, too many mutations) falls back to a full parse.
+    """
+
+    max_dirty_roots: ClassVar[int] = 50
+
+    def __init__(self) -> None:
+        self._page: Page | None = None
+        self._url: str | None = None
+        self._root: DOMElementNode | None = None
+
+    def reset(self) -> None:
+        self._page = None
+        self._url = None
+        self._root = None
+
+    @profiler.profiled("domforward")
+    async def forward(self, page: Page) -> NotteDomNode:
+        dom_tree = await self.parse_dom_tree(page)
+        notte_dom_tree = dom_tree.to_notte_domnode()
+        DomErrorBuffer.flush()
+        return notte_dom_tree
+
+    @profiler.profiled()
+    async def parse_dom_tree(self, page: Page) -> DOMBaseNode:
+        # the tracker has to be (re-)armed before parsing so that mutations happening during the parse are not lost
+        tracker: MutationTrackerDict = await profiler.profiled()(page.evaluate)(
+            MUTATION_TRACKER_JS_PATH.read_text(), {"max_dirty_roots": self.max_dirty_roots}
+        )
+        previous = self._root if self._page is page and page.url == self._url else None
+        # the previous tree is patched in place: forget it until the new tree is complete
+        self.reset()
+        dom_tree: DOMBaseNode | None = None
+        if previous is not None and tracker["installed"] and not tracker["overflow"] and not tracker["layout_changed"]:
+            dom_tree = await self._patch(page, previous, tracker["dirty"])
+        if dom_tree is None:
+            dom_tree = generate_sequential_ids(await ParseDomTreePipe.parse_dom_tree(page))
+
+        self._page = page
+        self._url = page.url
+        self._root = dom_tree if isinstance(dom_tree, DOMElementNode) else None
+        return dom_tree
+
+    @staticmethod
+    def _is_parent_highlighted(node: DOMBaseNode) -> bool:
+        parent = node.parent
+        while parent is not None:
+            if parent.highlight_index is not None:
+                return True
+            if parent.tag_name.lower() == "iframe":
+                return False
+            parent = parent.parent
+        return False
+
+    @profiler.profiled()
+    async def _patch(self, page: Page, root: DOMElementNode, dirty_xpaths: list[str]) -> DOMBaseNode | None:
+        """
+        Re-parses the `dirty_xpaths` subtrees and patches them into `root` (in place).
+        Returns None if the patch is not possible and a full parse is required.
+        """
+        if len(dirty_xpaths) == 0:
+            return root
+
+        index: dict[str, DOMElementNode] = {}
+        stack: list[DOMBaseNode] = [root]
+        max_highlight_index = -1
+        while stack:
+            node = stack.pop()
+            stack.extend(node.children)
+            if node.highlight_index is not None:
+                max_highlight_index = max(max_highlight_index, node.highlight_index)
+            if not isinstance(node, DOMElementNode):
+                continue
+            if node.in_iframe:
+                # iframe documents are not observed by the tracker
+                return None
+            if not node.in_shadow_root and node.parent is not None:
+                _ = index.setdefault(node.xpath, node)
+
+        # map each dirty element to its closest ancestor known from the previous parse
+        subtree_xpaths: set[str] = set()
+        for xpath in dirty_xpaths:
+            while len(xpath) > 0 and xpath not in index:
+                xpath = xpath.rpartition("/")[0]
+            if len(xpath) == 0:
+                return None
+            subtree_xpaths.add(xpath)
+        # drop subtrees that are already covered by one of their ancestors
+        roots: list[str] = []
+        for xpath in sorted(subtree_xpaths, key=len):
+            if not any(xpath.startswith(f"{other}/") for other in roots):
+                roots.append(xpath)
+
+        dom_config = ParseDomTreePipe.dom_config()
+        dom_config["subtree_roots"] = [
+            {"xpath": xpath, "parent_highlighted": self._is_parent_highlighted(index[xpath])} for xpath in roots
+        ]
+        dom_config["highlight_index_offset"] = max_highlight_index + 1
+        page_eval: dict[str, Any] | None = await profiler.profiled()(page.evaluate)(
+            DOM_TREE_JS_PATH.read_text(), dom_config
+        )
+        if page_eval is None or len(page_eval["missing"]) > 0:
+            return None
+
+        previous_ids: dict[str, str] = {}
+        subtrees: list[DOMBaseNode] = []
+        for xpath in roots:
+            old_node = index[xpath]
+            parent = old_node.parent
+            assert parent is not None
+            old_stack: list[DOMBaseNode] = [old_node]
+            while old_stack:
+                old = old_stack.pop()
+                old_stack.extend(old.children)
+                if isinstance(old, DOMElementNode) and old.notte_id is not None:
+                    _ = previous_ids.setdefault(old.notte_selector, old.notte_id)
+
+            position = next(i for i, child in enumerate(parent.children) if child is old_node)
+            js_root_id = page_eval["roots"][xpath]
+            new_node = (
+                None if js_root_id is None else ParseDomTreePipe.parse_subtree(page_eval["map"], js_root_id, parent)
+            )
+            if new_node is None:
+                _ = parent.children.pop(position)
+            else:
+                parent.children[position] = new_node
+                subtrees.append(new_node)
+
+        if config.verbose:
+            logger.trace(f"Incremental snapshot: re-parsed {len(roots)} subtree(s) for {page.url}")
+        return generate_incremental_ids(root, subtrees, previous_ids)
@@ -43,16 +43,20 @@ class ParseDomTreePipe:
         DomErrorBuffer.flush()
         return notte_dom_tree
 
-    @profiler.profiled()
     @staticmethod
-    async def parse_dom_tree(page: Page) -> DOMBaseNode:
-        js_code = DOM_TREE_JS_PATH.read_text()
-        dom_config: dict[str, bool | int] = {
+    def dom_config() -> dict[str, Any]:
+        return {
             "highlight_elements": config.highlight_elements,
             "focus_element": config.focus_element,
             "viewport_expansion": config.viewport_expansion,
             "enable_pointer_elements": config.enable_pointer_elements,
         }
+
+    @profiler.profiled()
+    @staticmethod
+    async def parse_dom_tree(page: Page) -> DOMBaseNode:
+        js_code = DOM_TREE_JS_PATH.read_text()
+        dom_config = ParseDomTreePipe.dom_config()
         if config.verbose:
             logger.trace(f"Parsing DOM tree for {page.url} with config: {dom_config}")
         page_eval: dict[str, Any] | None = await profiler.profiled()(page.evaluate)(js_code, dom_config)
@@ -163,9 +167,22 @@ class ParseDomTreePipe:
     async def _reconstruct_dom_tree(
         eval_page: dict[str, Any],
     ) -> DomTreeDict:
-        js_node_map = eval_page["map"]
-        js_root_id = eval_page["rootId"]
+        return ParseDomTreePipe._reconstruct_subtree(eval_page["map"], eval_page["rootId"])
 
+    @staticmethod
+    def parse_subtree(js_node_map: dict[str, Any], js_root_id: str, parent: DOMElementNode) -> DOMBaseNode | None:
+        """Parse the subtree rooted at `js_root_id` of a DOM tree evaluation, to be attached under `parent`"""
+        return ParseDomTreePipe._parse_node(
+            ParseDomTreePipe._reconstruct_subtree(js_node_map, js_root_id),
+            parent=parent,
+            in_iframe=False,
+            in_shadow_root=False,
+            iframe_parent_css_paths=[],
+            notte_selector=parent.notte_selector,
+        )
+
+    @staticmethod
+    def _reconstruct_subtree(js_node_map: dict[str, Any], js_root_id: str) -> DomTreeDict:
         def rebuild_dom_tree(node_data: dict[str, Any]):
             children_ids = node_data.get("children", [])
             children = [js_node_map[child_id] for child_id in children_ids if child_id in js_node_map]
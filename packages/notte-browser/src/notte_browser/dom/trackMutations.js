@@ -0,0 +1,163 @@
+// Tracks DOM mutations between two snapshots so that only the mutated subtrees have to be re-parsed.
+// - The first call installs a MutationObserver on the page and returns `installed: false`:
+//   the caller has no reference point and must perform a full parse.
+// - Every following call returns the xpaths of the minimal set of mutated subtrees (main document only,
+//   mutations inside shadow roots are attributed to their host) and resets the tracker.
+(
+	{ max_dirty_roots }
+) => {
+	const TRACKER_KEY = "__notteMutationTracker";
+	// raw number of dirty elements after which we stop tracking and ask for a full parse
+	const MAX_TRACKED_ELEMENTS = max_dirty_roots * 20;
+
+	/**
+	 * Gets the position of an element in its parent (same logic as `buildDomNode.js`).
+	 *
+	 * @param {HTMLElement} currentElement - The element to get the position for.
+	 * @returns {number} The position of the element in its parent.
+	 */
+	function getElementPosition(currentElement) {
+		if (!currentElement.parentElement) {
+			return 0;
+		}
+		const tagName = currentElement.nodeName.toLowerCase();
+		const siblings = Array.from(currentElement.parentElement.children)
+			.filter((sib) => sib.nodeName.toLowerCase() === tagName);
+		if (siblings.length === 1) {
+			return 0;
+		}
+		return siblings.indexOf(currentElement) + 1;
+	}
+
+	/**
+	 * Computes the xpath of a main document element (same format as `getXPathTree` in `buildDomNode.js`).
+	 *
+	 * @param {HTMLElement} element - The element to get the xpath for.
+	 * @returns {string} The xpath of the element.
+	 */
+	function getXPath(element) {
+		const segments = [];
+		let currentElement = element;
+		while (currentElement && currentElement.nodeType === Node.ELEMENT_NODE) {
+			const position = getElementPosition(currentElement);
+			const tagName = currentElement.nodeName.toLowerCase();
+			const xpathIndex = position > 0 ? `[${position}]` : "";
+			segments.unshift(`${tagName}${xpathIndex}`);
+			currentElement = currentElement.parentNode;
+		}
+		return segments.join("/");
+	}
+
+	/**
+	 * Maps a mutated node to the closest element of the main document.
+	 * Nodes living in a shadow root are mapped to their (outermost) host.
+	 *
+	 * @param {Node} node - The mutated node.
+	 * @returns {HTMLElement | null} The element to re-parse, or null if the mutation can be ignored.
+	 */
+	function toDocumentElement(node) {
+		let current = node;
+		while (current) {
+			const root = current.getRootNode();
+			if (root === document) {
+				const element = current.nodeType === Node.ELEMENT_NODE ? current : current.parentElement;
+				// head mutations (scripts, styles, title) are never part of the DOM tree
+				if (!element || (document.head && document.head.contains(element))) {
+					return null;
+				}
+				return element;
+			}
+			if (root instanceof ShadowRoot) {
+				current = root.host;
+				continue;
+			}
+			// detached node: its removal is already recorded on its former parent
+			return null;
+		}
+		return null;
+	}
+
+	/**
+	 * Snapshot of the layout values that invalidate every cached node when they change.
+	 */
+	function getLayout() {
+		return {
+			scroll_x: window.scrollX,
+			scroll_y: window.scrollY,
+			viewport_width: window.innerWidth,
+			viewport_height: window.innerHeight,
+			total_width: document.documentElement.scrollWidth,
+			total_height: document.documentElement.scrollHeight,
+		};
+	}
+
+	function install() {
+		const tracker = { dirty: new Set(), overflow: false, layout: getLayout(), observer: null };
+		const observe = (root) => tracker.observer.observe(root, {
+			childList: true,
+			subtree: true,
+			attributes: true,
+			characterData: true,
+		});
+		const observeShadowRoots = (root) => {
+			const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT);
+			for (let element = walker.currentNode; element; element = walker.nextNode()) {
+				if (element.shadowRoot) {
+					observe(element.shadowRoot);
+					observeShadowRoots(element.shadowRoot);
+				}
+			}
+		};
+
+		tracker.observer = new MutationObserver((mutations) => {
+			if (tracker.overflow) return;
+			for (const mutation of mutations) {
+				const element = toDocumentElement(mutation.target);
+				if (element) tracker.dirty.add(element);
+				for (const added of mutation.addedNodes) {
+					if (added.nodeType === Node.ELEMENT_NODE) observeShadowRoots(added);
+				}
+			}
+			if (tracker.dirty.size > MAX_TRACKED_ELEMENTS) {
+				tracker.overflow = true;
+				tracker.dirty = new Set();
+			}
+		});
+		observe(document.documentElement);
+		observeShadowRoots(document.documentElement);
+		return tracker;
+	}
+
+	const tracker = window[TRACKER_KEY];
+	if (!tracker) {
+		window[TRACKER_KEY] = install();
+		return { installed: false, overflow: false, layout_changed: false, dirty: [] };
+	}
+
+	// only keep the top-most dirty elements: re-parsing them covers their dirty descendants
+	const roots = [];
+	if (!tracker.overflow) {
+		for (const element of tracker.dirty) {
+			if (!element.isConnected) continue;
+			let covered = false;
+			for (let parent = element.parentElement; parent; parent = parent.parentElement) {
+				if (tracker.dirty.has(parent)) {
+					covered = true;
+					break;
+				}
+			}
+			if (!covered) roots.push(getXPath(element));
+		}
+	}
+
+	const layout = getLayout();
+	const layoutChanged = Object.keys(layout).some((key) => layout[key] !== tracker.layout[key]);
+	const overflow = tracker.overflow || roots.length > max_dirty_roots;
+
+	// reset the tracker: the caller is about to (re-)parse the page
+	tracker.dirty = new Set();
+	tracker.overflow = false;
+	tracker.layout = layout;
+
+	return { installed: true, overflow, layout_changed: layoutChanged, dirty: overflow ? [] : roots };
+};
@@ -34,7 +34,7 @@ def cleanup_aria_attributes(attrs: dict[str, str]) -> dict[str, str]:
     return attrs
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class DOMBaseNode:
     parent: "DOMElementNode | None"
     is_visible: bool
@@ -63,7 +63,7 @@ class DOMBaseNode:
         raise NotImplementedError("role property not implemented for DOMBaseNode")
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class DOMTextNode(DOMBaseNode):
     text: str = ""
     type: str = "TEXT_NODE"
@@ -110,7 +110,7 @@ class DOMTextNode(DOMBaseNode):
         )
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class DOMElementNode(DOMBaseNode):
     """
     xpath: the xpath of the element from the last root node
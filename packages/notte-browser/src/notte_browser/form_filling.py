@@ -1,25 +1,160 @@
 import asyncio
 import random
+import re
+from functools import cache
+from typing import ClassVar, Literal, Self
 
 from loguru import logger
+from notte_core.profiling import profiler
+from pydantic import BaseModel
 
 from notte_browser.playwright_async_api import Locator, Page
 
+# attribute set on the form fields found by `FORM_INVENTORY_SCRIPT`, to locate them afterwards
+FORM_FIELD_ATTRIBUTE = "data-notte-form-field"
+
+# Lists all the input / select elements of the page (including open shadow roots) with their attributes, and the
+# labels with the fields they refer to: `for` attribute (input then select, by id then name), child, next sibling,
+# then following siblings. Fields get a stable id, kept if the inventory is taken again.
+FORM_INVENTORY_SCRIPT = """
+(attribute) => {
+    const fieldElements = [];
+    const labelElements = [];
+    const visit = (root) => {
+        for (const el of root.querySelectorAll("*")) {
+            const tag = el.tagName.toLowerCase();
+            if (tag === "input" || tag === "select") fieldElements.push(el);
+            else if (tag === "label") labelElements.push(el);
+            if (el.shadowRoot) visit(el.shadowRoot);
+        }
+    };
+    visit(document);
+
+    const indices = new Map();
+    const fields = fieldElements.map((el, index) => {
+        indices.set(el, index);
+        if (!el.hasAttribute(attribute)) {
+            window.__notteFormFieldCount = (window.__notteFormFieldCount || 0) + 1;
+            el.setAttribute(attribute, String(window.__notteFormFieldCount));
+        }
+        const attributes = {};
+        for (const attr of el.attributes) attributes[attr.name] = attr.value;
+        return {
+            id: el.getAttribute(attribute),
+            tag: el.tagName.toLowerCase(),
+            attributes: attributes,
+            options: el.tagName.toLowerCase() === "select" ? el.options.length : 0,
+        };
+    });
+
+    const isField = (el) => el !== null && indices.has(el);
+    const labels = labelElements.map((label) => {
+        const candidates = [];
+        const add = (el) => {
+            if (isField(el) && !candidates.includes(indices.get(el))) candidates.push(indices.get(el));
+        };
+        const target = label.getAttribute("for");
+        if (target) {
+            for (const tag of ["INPUT", "SELECT"]) {
+                add(fieldElements.find((el) => el.tagName === tag && el.id === target) || null);
+                add(fieldElements.find((el) => el.tagName === tag && el.getAttribute("name") === target) || null);
+            }
+        }
+        add(label.querySelector("input, select"));
+        add(label.nextElementSibling);
+        let sibling = label.nextElementSibling;
+        while (sibling !== null && !isField(sibling)) sibling = sibling.nextElementSibling;
+        add(sibling);
+        return { text: label.textContent || "", fields: candidates };
+    });
+    return { fields: fields, labels: labels };
+}
+"""
+
+
+class FormField(BaseModel):
+    id: str
+    tag: str
+    attributes: dict[str, str]
+    options: int
+
+    @property
+    def fillable(self) -> bool:
+        # select elements need options to be filled
+        return self.tag == "input" or self.options > 0
+
+
+class FormLabel(BaseModel):
+    text: str
+    # indices of the fields the label may refer to, by order of preference
+    fields: list[int]
+
+
+class FormInventory(BaseModel):
+    fields: list[FormField]
+    labels: list[FormLabel]
+
+
+class AttributeCondition(BaseModel):
+    name: str
+    operator: Literal["=", "*="]
+    value: str
+    ignore_case: bool
+
+    def matches(self, attributes: dict[str, str]) -> bool:
+        actual = attributes.get(self.name)
+        if actual is None:
+            return False
+        expected = self.value
+        # `type` values are case-insensitive in html
+        if self.ignore_case or self.name == "type":
+            actual, expected = actual.lower(), expected.lower()
+        return actual == expected if self.operator == "=" else expected in actual
+
+
+class FieldSelector(BaseModel):
+    """Attribute selectors of `FormFiller.FIELD_SELECTORS`, matched against the form inventory"""
+
+    pattern: ClassVar[re.Pattern[str]] = re.compile(r"(?P<tag>[a-z]+)?(?P<conditions>(?:\[[^\]]+\])+)")
+    condition_pattern: ClassVar[re.Pattern[str]] = re.compile(
+        r'\[(?P<name>[\w-]+)(?P<operator>\*?=)"(?P<value>[^"]*)"(?P<flag> i)?\]'
+    )
+
+    tag: str | None
+    conditions: list[AttributeCondition]
+
+    @classmethod
+    def parse(cls, selector: str) -> Self | None:
+        """Parse a selector, or return None if it is not made of attribute conditions only"""
+        match = cls.pattern.fullmatch(selector)
+        if match is None:
+            return None
+        conditions = list(cls.condition_pattern.finditer(match["conditions"]))
+        # every bracket should be a supported attribute condition
+        if "".join(condition.group(0) for condition in conditions) != match["conditions"]:
+            return None
+        return cls(
+            tag=match["tag"],
+            conditions=[
+                AttributeCondition(
+                    name=condition["name"],
+                    operator=condition["operator"],  # pyright: ignore[reportArgumentType]
+                    value=condition["value"],
+                    ignore_case=condition["flag"] is not None,
+                )
+                for condition in conditions
+            ],
+        )
+
+    def matches(self, field: FormField) -> bool:
+        if self.tag is not None and self.tag != field.tag:
+            return False
+        return all(condition.matches(field.attributes) for condition in self.conditions)
+
 
-def escape_css_selector(selector: str) -> str:
-    """
-    Escape special characters in CSS selectors.
-    This is a simplified version of CSS.escape() for common cases.
-    """
-    # Handle special characters that need escaping in CSS selectors
-    special_chars = ":._-[]#()"
-    result = ""
-    for char in selector:
-        if char in special_chars:
-            result += f"\\{char}"
-        else:
-            result += char
-    return result
+@cache
+def parse_field_selector(selector: str) -> FieldSelector | None:
+    return FieldSelector.parse(selector)
 
 
 class FormFiller:
@@ -294,6 +429,9 @@ class FormFiller:
         """Initialize the FormFiller with a Playwright page."""
         self.page: Page = page
         self._found_fields: dict[str, Locator] = {}
+        self._found_tags: dict[str, str] = {}
+        self._inventory: FormInventory | None = None
+        self._inventory_stale: bool = False
 
     async def _detect_name_field_conflicts(self, data: dict[str, str]) -> dict[str, str]:
         """
@@ -360,8 +498,62 @@ class FormFiller:
         # If no full_name field exists, keep individual fields as is
         return data
 
+    @profiler.profiled()
+    async def inventory(self, refresh: bool = False) -> FormInventory:
+        """List all the form fields and labels of the page in a single call (cached until refreshed)"""
+        if self._inventory is None or refresh:
+            self._inventory = FormInventory.model_validate(
+                await self.page.evaluate(FORM_INVENTORY_SCRIPT, FORM_FIELD_ATTRIBUTE)
+            )
+            self._inventory_stale = False
+        return self._inventory
+
+    def _found(self, field_type: str, locator: Locator, tag: str) -> Locator:
+        self._found_fields[field_type] = locator
+        self._found_tags[field_type] = tag
+        return locator
+
+    async def _find_by_selector(self, field_type: str, selector: str) -> Locator | None:
+        """Find a field with a selector that cannot be matched against the inventory (e.g. xpath)"""
+        try:
+            locator = self.page.locator(selector).first
+            if await locator.count() == 0:
+                return None
+            tag_name: str = await locator.evaluate("el => el.tagName.toLowerCase()")
+            # For select elements, verify they have options
+            if tag_name == "input" or (tag_name == "select" and await locator.locator("option").count() > 0):
+                return self._found(field_type, locator, tag_name)
+        except Exception as e:
+            logger.warning(f"Warning: Invalid selector {selector}: {str(e)}")
+        return None
+
+    async def _match_field(self, field_type: str, inventory: FormInventory) -> Locator | None:
+        # Try each selector until we find a match
+        for selector in self.FIELD_SELECTORS[field_type]:
+            field_selector = parse_field_selector(selector)
+            if field_selector is None:
+                locator = await self._find_by_selector(field_type, selector)
+                if locator is not None:
+                    return locator
+                continue
+            for field in inventory.fields:
+                if field.fillable and field_selector.matches(field):
+                    return self._found(
+                        field_type, self.page.locator(f'[{FORM_FIELD_ATTRIBUTE}="{field.id}"]').first, field.tag
+                    )
+
+        # Try finding by label text, then the associated input or select
+        label_text = field_type.replace("_", " ")
+        for label in inventory.labels:
+            if label_text in label.text.lower() and len(label.fields) > 0:
+                field = inventory.fields[label.fields[0]]
+                return self._found(
+                    field_type, self.page.locator(f'[{FORM_FIELD_ATTRIBUTE}="{field.id}"]').first, field.tag
+                )
+        return None
+
     async def find_field(self, field_type: str) -> Locator | None:
-        """Find a field by trying multiple selectors."""
+        """Find a field by matching the form inventory against multiple selectors, then labels."""
         if field_type not in self.FIELD_SELECTORS:
             return None
 
@@ -369,110 +561,12 @@ class FormFiller:
         if field_type in self._found_fields:
             return self._found_fields[field_type]
 
-        # Try each selector until we find a match
-        for selector in self.FIELD_SELECTORS[field_type]:
-            try:
-                # First try exact selector
-                locator = self.page.locator(selector)
-                if await locator.count() > 0:
-                    # Get the first element and check its tag name
-                    tag_name = await locator.first.evaluate("el => el.tagName.toLowerCase()")
-
-                    # For select elements, verify they have options
-                    if tag_name == "select":
-                        options = locator.first.locator("option")
-                        if await options.count() > 0:
-                            self._found_fields[field_type] = locator.first
-                            return self._found_fields[field_type]
-                    # For input elements, just verify it's an input
-                    elif tag_name == "input":
-                        self._found_fields[field_type] = locator.first
-                        return self._found_fields[field_type]
-            except Exception as e:
-                logger.warning(f"Warning: Invalid selector {selector}: {str(e)}")
-                continue
-
-        # Try finding by label text
         try:
-            labels = self.page.locator("label")
-            count = await labels.count()
-
-            for i in range(count):
-                label = labels.nth(i)
-                label_text = await label.text_content()
-                if not label_text:
-                    continue
-
-                label_text = label_text.lower()
-                if field_type.replace("_", " ") in label_text:
-                    # Try to find the associated input or select
-                    for_attr = await label.get_attribute("for")
-                    if for_attr:
-                        try:
-                            # Try different strategies to find the input/select
-                            escaped_id = escape_css_selector(for_attr)
-
-                            # Try both input and select elements
-                            for element_type in ["input", "select"]:
-                                # Try by ID with proper escaping
-                                field = self.page.locator(f"{element_type}#{escaped_id}")
-                                if await field.count() > 0:
-                                    # Verify it's a valid input/select element
-                                    tag_name = await field.first.evaluate("el => el.tagName.toLowerCase()")
-                                    if tag_name in ["input", "select"]:
-                                        self._found_fields[field_type] = field.first
-                                        return self._found_fields[field_type]
-
-                                # Try by exact attribute match
-                                field = self.page.locator(f'{element_type}[id="{for_attr}"]')
-                                if await field.count() > 0:
-                                    # Verify it's a valid input/select element
-                                    tag_name = await field.first.evaluate("el => el.tagName.toLowerCase()")
-                                    if tag_name in ["input", "select"]:
-                                        self._found_fields[field_type] = field.first
-                                        return self._found_fields[field_type]
-
-                                # Try by name attribute
-                                field = self.page.locator(f'{element_type}[name="{for_attr}"]')
-                                if await field.count() > 0:
-                                    # Verify it's a valid input/select element
-                                    tag_name = await field.first.evaluate("el => el.tagName.toLowerCase()")
-                                    if tag_name in ["input", "select"]:
-                                        self._found_fields[field_type] = field.first
-                                        return self._found_fields[field_type]
-
-                        except Exception as e:
-                            logger.error(f"Warning: Failed to find field for label with for={for_attr}: {str(e)}")
-                            continue
-
-                    # If no 'for' attribute or not found, try finding the field as a child or sibling
-                    try:
-                        # Try finding any input/select related to this label
-                        related_fields = [
-                            label.locator("input, select"),  # Child elements
-                            label.locator("+ input, + select"),  # Next siblings
-                            label.locator("~ input, ~ select"),  # Any following siblings
-                            self.page.locator(
-                                f'input[aria-labelledby="{label.get_attribute("id")}"], select[aria-labelledby="{label.get_attribute("id")}"]'
-                            ),  # ARIA relationship
-                        ]
-
-                        for field in related_fields:
-                            if await field.count() > 0:
-                                # Verify it's a valid input/select element
-                                tag_name: str = await field.first.evaluate("el => el.tagName.toLowerCase()")
-                                if tag_name in ["input", "select"]:
-                                    self._found_fields[field_type] = field.first
-                                    return self._found_fields[field_type]
-
-                    except Exception as e:
-                        logger.error(f"Warning: Failed to find related field for label: {str(e)}")
-                        continue
-
+            # filling fields can reveal or re-render others (e.g. state after country): match an up-to-date inventory
+            return await self._match_field(field_type, await self.inventory(refresh=self._inventory_stale))
         except Exception as e:
-            logger.error(f"Warning: Error while searching by label: {str(e)}")
-
-        return None
+            logger.error(f"Warning: Error while searching for field {field_type}: {str(e)}")
+            return None
 
     async def fill_form(self, data: dict[str, str]) -> dict[str, Locator | str]:
         """
@@ -510,11 +604,12 @@ class FormFiller:
 
             try:
                 # Handle select elements
-                tag_name: str = await field.evaluate("el => el.tagName.toLowerCase()")
+                tag_name = self._found_tags[field_type]
                 if tag_name == "select":
                     success = await self._fill_select_field(field, field_type, value)
                     if success:
                         filled_count += 1
+                        self._inventory_stale = True
                         result[field_type] = field
                     else:
                         failed_fields.append(field_type)
@@ -524,6 +619,7 @@ class FormFiller:
                     success = await self._fill_input_field(field, field_type, value)
                     if success:
                         filled_count += 1
+                        self._inventory_stale = True
                         result[field_type] = field
                     else:
                         failed_fields.append(field_type)
@@ -117,34 +117,37 @@ class PlaywrightManager(BaseModel, BaseWindowManager):
                 raise FirefoxNotAvailableError()
         return browser
 
+    async def create_context(self, options: BrowserWindowOptions, browser: Browser) -> BrowserContext:
+        viewport = None
+        if options.viewport_width is not None or options.viewport_height is not None:
+            viewport = {
+                "width": options.viewport_width,
+                "height": options.viewport_height,
+            }
+        else:
+            logger.warning(
+                f"🪟 No viewport set in {'headless' if options.headless else 'headful'} mode, using default viewport in playwright"
+            )
+
+        return await browser.new_context(
+            # no viewport should be False for headless browsers
+            no_viewport=not options.headless,
+            viewport=viewport,  # pyright: ignore[reportArgumentType]
+            permissions=[
+                # Needed for clipboard copy/paste to respect tabs / new lines for chromium browsers
+                "clipboard-read",
+                "clipboard-write",
+            ]
+            if options.browser_type in ["chromium", "chrome"]
+            else [],
+            proxy=options.proxy,
+            user_agent=options.user_agent,
+        )
+
     @profiler.profiled()
     async def get_browser_resource(self, options: BrowserWindowOptions, browser: Browser) -> BrowserResource:
         async with asyncio.timeout(self.BROWSER_OPERATION_TIMEOUT_SECONDS):
-            viewport = None
-            if options.viewport_width is not None or options.viewport_height is not None:
-                viewport = {
-                    "width": options.viewport_width,
-                    "height": options.viewport_height,
-                }
-            else:
-                logger.warning(
-                    f"🪟 No viewport set in {'headless' if options.headless else 'headful'} mode, using default viewport in playwright"
-                )
-
-            context: BrowserContext = await browser.new_context(
-                # no viewport should be False for headless browsers
-                no_viewport=not options.headless,
-                viewport=viewport,  # pyright: ignore[reportArgumentType]
-                permissions=[
-                    # Needed for clipboard copy/paste to respect tabs / new lines for chromium browsers
-                    "clipboard-read",
-                    "clipboard-write",
-                ]
-                if options.browser_type in ["chromium", "chrome"]
-                else [],
-                proxy=options.proxy,
-                user_agent=options.user_agent,
-            )
+            context = await self.create_context(options, browser)
 
             if len(context.pages) == 0:
                 page = await context.new_page()
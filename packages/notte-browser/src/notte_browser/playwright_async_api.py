@@ -13,6 +13,7 @@ match config.browser_backend:
             Locator,
             Page,
             Playwright,
+            Request,
             Response,
             TimeoutError,
             async_playwright,
@@ -30,6 +31,7 @@ match config.browser_backend:
             Locator,
             Page,
             Playwright,
+            Request,
             Response,
             TimeoutError,
             async_playwright,
@@ -93,6 +95,7 @@ __all__ = [
     "Error",
     "Locator",
     "Response",
+    "Request",
     "Page",
     "CDPSession",
     "FrameLocator",
@@ -35,11 +35,9 @@ class NodeResolutionPipe:
             raise NoSnapshotObservedError()
 
         # resolve selector
-        selector_map: dict[str, InteractionDomNode] = {inode.id: inode for inode in snapshot.interaction_nodes()}
-        is_id_resolved = action.id in selector_map
-        if not is_id_resolved:
+        node = snapshot.interaction_node(action.id)
+        if node is None:
             raise InvalidActionError(action_id=action.id, reason=f"action '{action.id}' not found in page context.")
-        node = selector_map[action.id]
         action.selector = NodeResolutionPipe.resolve_selectors(node, verbose)
         action.text_label = node.text
         return action
@@ -1,9 +1,11 @@
 from loguru import logger
-from notte_core.browser.dom_tree import DomNode, InteractionDomNode
+from notte_core.browser.dom_tree import DomNode, InteractionDomNode, NodeSelectors
 from notte_core.browser.node_type import NodeType
 from notte_core.browser.snapshot import BrowserSnapshot
 from notte_core.data.space import ImageCategory, ImageData
+from notte_core.profiling import profiler
 from notte_core.utils.image import construct_image_url
+from pydantic import BaseModel
 
 from notte_browser.dom.locate import locate_element
 from notte_browser.playwright_async_api import Locator, Page
@@ -194,6 +196,104 @@ async def get_parent_inner_text(dom_node: DomNode, max_depth: int = 3) -> str |
     return None
 
 
+# Classifies all the requested image/svg elements of the page in a single round trip, with the same rules as
+# `classify_svg` and `classify_raster_image`. Elements are found by xpath, or by css selector if it is unique.
+IMAGE_EXTRACTION_SCRIPT = """
+(items) => {
+    const results = {};
+    const isIcon = (width, height, classes, label) =>
+        (width <= 64 && height <= 64) || classes.includes("icon") || label.includes("icon");
+    const firstSrcsetUrl = (srcset) => (srcset || "").trim().split(/\\s+/)[0] || null;
+    for (const { key, xpath, css } of items) {
+        let el = null;
+        try {
+            if (xpath) {
+                el = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            }
+            if (!el && css) {
+                const matches = document.querySelectorAll(css);
+                el = matches.length === 1 ? matches[0] : null;
+            }
+        } catch (e) {
+            el = null;
+        }
+        if (!el || el.nodeType !== Node.ELEMENT_NODE) continue;
+
+        const role = el.getAttribute("role");
+        const label = (el.getAttribute("aria-label") || "").toLowerCase();
+        const classes = (el.getAttribute("class") || "").toLowerCase();
+        const src =
+            el.currentSrc ||
+            el.getAttribute("src") ||
+            el.getAttribute("data-src") ||
+            firstSrcsetUrl(el.getAttribute("srcset") || el.getAttribute("data-srcset"));
+
+        if (el.tagName.toLowerCase() === "svg") {
+            let bbox = null;
+            try {
+                bbox = el.getBBox();
+            } catch (e) {}
+            const icon = bbox !== null && (isIcon(bbox.width, bbox.height, classes, label) || (role === "img" && bbox.width <= 64));
+            results[key] = {
+                category: icon ? "svg_icon" : "svg_content",
+                src: src,
+                svg_content: icon ? null : el.outerHTML,
+            };
+            continue;
+        }
+        const width = el.naturalWidth || el.width;
+        const height = el.naturalHeight || el.height;
+        const alt = el.getAttribute("alt");
+        let category = "content_image";
+        if (width === undefined || height === undefined) {
+            category = "svg_content";
+        } else if (isIcon(width, height, classes, label) || (alt || "").toLowerCase().includes("icon")) {
+            category = "icon";
+        } else if (role === "presentation" || el.getAttribute("aria-hidden") === "true" || (alt === "" && !label)) {
+            category = "decorative";
+        }
+        results[key] = { category: category, src: src, svg_content: null };
+    }
+    return results;
+}
+"""
+
+
+class PageImage(BaseModel):
+    category: ImageCategory
+    src: str | None = None
+    svg_content: str | None = None
+
+
+def image_selectors(node: DomNode) -> NodeSelectors | None:
+    """Selectors of the image nodes that can be extracted in batch (i.e. outside of iframes and shadow roots)"""
+    selectors = node.computed_attributes.selectors
+    if selectors is None or selectors.in_iframe or selectors.in_shadow_root:
+        return None
+    if len(selectors.xpath_selector) == 0 and len(selectors.css_selector) == 0:
+        return None
+    return selectors
+
+
+@profiler.profiled()
+async def extract_images(page: Page, nodes: list[DomNode]) -> dict[str, PageImage]:
+    """Classify and get the sources of all the image nodes at once, keyed by xpath (or css) selector"""
+    items: dict[str, dict[str, str]] = {}
+    for node in nodes:
+        selectors = image_selectors(node)
+        if selectors is not None:
+            key = selectors.xpath_selector or selectors.css_selector
+            items[key] = {"key": key, "xpath": selectors.xpath_selector, "css": selectors.css_selector}
+    if len(items) == 0:
+        return {}
+    try:
+        results: dict[str, dict[str, str | None]] = await page.evaluate(IMAGE_EXTRACTION_SCRIPT, list(items.values()))
+    except Exception as e:
+        logger.debug(f"Failed to extract images in batch: {e}")
+        return {}
+    return {key: PageImage.model_validate(result) for key, result in results.items()}
+
+
 class ImageScrapingPipe:
     """
     Data scraping pipe that scrapes images from the page
@@ -212,27 +312,35 @@ class ImageScrapingPipe:
                 description=f"Favicon for {snapshot.clean_url}",
             )
         ]
-        from tqdm import tqdm
-
-        for i, node in tqdm(enumerate(image_nodes)):
-            locator = await resolve_image_conflict(
-                page=window.page,
-                node=snapshot.dom_node,
-                image_node=InteractionDomNode(
-                    id=node.id or f"image_{i}",
-                    type=NodeType.INTERACTION,
-                    role=node.role,
-                    text=node.text,
-                    children=[],
-                    attributes=node.attributes,
-                    computed_attributes=node.computed_attributes,
-                ),
-            )
-            # if image_src is None:
-            #     logger.debug(f"No src attribute found for image node {node.id}")
-            #     continue
-            category = await classify_image_element(node, locator)
-            image_src = await get_image_src(node, locator)
+        page_images = await extract_images(window.page, image_nodes)
+
+        for i, node in enumerate(image_nodes):
+            selectors = image_selectors(node)
+            page_image = page_images.get(selectors.xpath_selector or selectors.css_selector) if selectors else None
+            locator: Locator | None = None
+            if page_image is not None:
+                category: ImageCategory | None = page_image.category
+                # `currentSrc` first: the source the browser actually loaded (e.g. for responsive images)
+                image_src = page_image.src
+                if not image_src and node.attributes is not None:
+                    image_src = node.attributes.get_resource_url()
+            else:
+                # elements in iframes / shadow roots, or not found by the batch extraction
+                locator = await resolve_image_conflict(
+                    page=window.page,
+                    node=snapshot.dom_node,
+                    image_node=InteractionDomNode(
+                        id=node.id or f"image_{i}",
+                        type=NodeType.INTERACTION,
+                        role=node.role,
+                        text=node.text,
+                        children=[],
+                        attributes=node.attributes,
+                        computed_attributes=node.computed_attributes,
+                    ),
+                )
+                category = await classify_image_element(node, locator)
+                image_src = await get_image_src(node, locator)
             if image_src is not None:
                 if len(image_src) > 0 and image_src != snapshot.metadata.url:
                     original_url = image_src
@@ -249,9 +357,9 @@ class ImageScrapingPipe:
                     # or the same as the page url (likely just a href)
                     image_src = None
             if image_src is None and category is ImageCategory.SVG_CONTENT:
-                image_src = await get_svg_content(locator)
+                image_src = page_image.svg_content if page_image is not None else await get_svg_content(locator)
 
-            if locator is None and (category is None or image_src is None):
+            if page_image is None and locator is None and (category is None or image_src is None):
                 if self.verbose:
                     logger.debug(f"No locator found for image node {node.id}")
                 continue
@@ -17,13 +17,13 @@ class MainContentScrapingPipe:
     """
 
     @staticmethod
-    def forward(
+    async def forward(
         snapshot: BrowserSnapshot,
         scrape_links: bool,
         output_format: str = "markdown",
     ) -> str:
         data = MainContentExtractor.extract(  # type: ignore[attr-defined]
-            html=snapshot.html_content,
+            html=await snapshot.ahtml_content(),
             output_format=output_format,
             include_links=scrape_links,
         )
@@ -62,10 +62,12 @@ class MarkdownifyScrapingPipe:
         include_iframes: bool = True,
     ) -> str:
         if params.only_main_content:
-            html = MainContentScrapingPipe.forward(snapshot, scrape_links=params.scrape_links, output_format="html")
+            html = await MainContentScrapingPipe.forward(
+                snapshot, scrape_links=params.scrape_links, output_format="html"
+            )
 
         else:
-            html = snapshot.html_content
+            html = await snapshot.ahtml_content()
         converter = VisibleMarkdownConverter(strip=params.removed_tags())
         content: str = converter.convert(html)  # type: ignore[attr-defined]
 
@@ -51,42 +51,55 @@ class DataScrapingPipe:
                     logger.trace("📀 Scraping page with main content scraping pipe")
                 if not params.only_main_content:
                     raise ValueError("Main content scraping pipe only supports only_main_content=True")
+                # fetch the html first so that the global config below is not swapped across an await
+                _ = await snapshot.ahtml_content()
                 # band-aid fix for now: html2text only takes this global config, no args
                 # want to keep image, but can't handle nicer conversion when src is base64
                 tmp_images_to_alt = html2text_config.IMAGES_TO_ALT
                 html2text_config.IMAGES_TO_ALT = True
-                data = MainContentScrapingPipe.forward(snapshot, params.scrape_links)
+                data = await MainContentScrapingPipe.forward(snapshot, params.scrape_links)
                 html2text_config.IMAGES_TO_ALT = tmp_images_to_alt
                 return data
 
-    async def forward(
+    async def scrape(
         self,
         window: BrowserWindow,
         snapshot: BrowserSnapshot,
         params: ScrapeParams,
     ) -> DataSpace:
+        """Page-bound part of the scraping (markdown and images): the page can be closed afterwards"""
         markdown = await self.scrape_markdown(window, snapshot, params)
         if config.verbose:
             logger.trace(f"📀 Extracted page as markdown\n: {markdown}\n")
         images = None
-        structured = None
 
         # scrape images if required
         if params.only_images:
             if config.verbose:
                 logger.trace("🏞️ Scraping images with image pipe")
             images = await self.image_pipe.forward(window, snapshot)
+        return DataSpace(markdown=markdown, images=images)
 
-        # scrape structured data if required
+    async def structure(self, url: str, data: DataSpace, params: ScrapeParams) -> DataSpace:
+        """LLM-bound part of the scraping: structure the markdown if required by the params"""
         if params.requires_schema():
             if config.verbose:
                 logger.trace("🎞️ Structuring data with schema pipe")
-            structured = await self.schema_pipe.forward(
-                url=snapshot.metadata.url,
-                document=markdown,
+            data.structured = await self.schema_pipe.forward(
+                url=url,
+                document=data.markdown,
                 response_format=params.response_format,
                 instructions=params.instructions,
                 verbose=config.verbose,
                 use_link_placeholders=params.use_link_placeholders,
             )
-        return DataSpace(markdown=markdown, images=images, structured=structured)
+        return data
+
+    async def forward(
+        self,
+        window: BrowserWindow,
+        snapshot: BrowserSnapshot,
+        params: ScrapeParams,
+    ) -> DataSpace:
+        data = await self.scrape(window, snapshot, params)
+        return await self.structure(snapshot.metadata.url, data, params)
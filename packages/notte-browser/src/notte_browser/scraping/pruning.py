@@ -1,4 +1,5 @@
 import functools
+import json
 import re
 from typing import Any, Callable, ClassVar, TypeVar
 
@@ -36,33 +37,38 @@ class MarkdownPruningPipe:
     # Then handle links - using a pattern that can contain nested images
     link_pattern: ClassVar[str] = r"\[((?:[^\[\]]|\[(?:[^\[\]]|\[[^\[\]]*\])*\])*)\]\s*\(([^)]*?)\)"
 
+    # Target of any link or image, to unmask links and images in a single pass
+    target_pattern: ClassVar[str] = r"\]\s*\(([^)]*?)\)"
+
+    image_regex: ClassVar[re.Pattern[str]] = re.compile(image_pattern)
+    link_regex: ClassVar[re.Pattern[str]] = re.compile(link_pattern)
+    target_regex: ClassVar[re.Pattern[str]] = re.compile(target_pattern)
+
     @staticmethod
-    def image_mask(match: re.Match[str], images: dict[str, str]) -> str:
+    def image_mask(match: re.Match[str], images: dict[str, str], placeholders: dict[str, str]) -> str:
         alt_text, url = match.groups()
         # Skip empty URLs
         if not url.strip():
             return f"![{alt_text}]()"
 
-        if url in images.values():
-            # already masked => reuse the same placeholder
-            placeholder = next(k for k, v in images.items() if v == url)
-        else:
-            placeholder = f"img{len(images) + 1}.png"
+        # already masked => reuse the same placeholder
+        placeholder = placeholders.get(url)
+        if placeholder is None:
+            placeholder = placeholders[url] = f"img{len(images) + 1}.png"
             images[placeholder] = url
         return f"![{alt_text}]({placeholder})"
 
     @staticmethod
-    def link_mask(match: re.Match[str], links: dict[str, str]) -> str:
+    def link_mask(match: re.Match[str], links: dict[str, str], placeholders: dict[str, str]) -> str:
         text, url = match.groups()
         # Skip if the URL is already a placeholder reference
         if url.startswith("img"):
             return match.group(0)
 
-        if url in links.values():
-            # already masked => reuse the same placeholder
-            placeholder = next(k for k, v in links.items() if v == url)
-        else:
-            placeholder = f"link{len(links) + 1}"
+        # already masked => reuse the same placeholder
+        placeholder = placeholders.get(url)
+        if placeholder is None:
+            placeholder = placeholders[url] = f"link{len(links) + 1}"
             links[placeholder] = url
         return f"[{text}]({placeholder})"
 
@@ -72,20 +78,22 @@ class MarkdownPruningPipe:
         Process markdown content to replace links and images with placeholders.
         Returns a Document with the processed content and mappings.
         """
-        # Initialize storage for links and images
+        # Initialize storage for links and images, and their reverse index (url -> placeholder)
         links: dict[str, str] = {}
         images: dict[str, str] = {}
+        link_placeholders: dict[str, str] = {}
+        image_placeholders: dict[str, str] = {}
 
         def replace_images(content: str) -> str:
             """Replace image markdown with placeholders."""
-            return re.sub(
-                MarkdownPruningPipe.image_pattern, lambda match: MarkdownPruningPipe.image_mask(match, images), content
+            return MarkdownPruningPipe.image_regex.sub(
+                lambda match: MarkdownPruningPipe.image_mask(match, images, image_placeholders), content
             )
 
         def replace_links(content: str) -> str:
             """Replace regular markdown links with placeholders."""
-            return re.sub(
-                MarkdownPruningPipe.link_pattern, lambda match: MarkdownPruningPipe.link_mask(match, links), content
+            return MarkdownPruningPipe.link_regex.sub(
+                lambda match: MarkdownPruningPipe.link_mask(match, links, link_placeholders), content
             )
 
         # Apply transformations in sequence
@@ -100,58 +108,41 @@ class MarkdownPruningPipe:
         Unmask the links and images from the document using regex pattern matching.
         Replaces inline-style placeholders with their original URLs.
         """
+        targets = {**masked_document.links, **masked_document.images}
+        if len(targets) == 0:
+            return masked_document.content
 
-        def unmask_links(content: str) -> str:
-            """Replace link placeholders with their original URLs."""
-            pattern = MarkdownPruningPipe.link_pattern
-
-            def replacement(match: re.Match[str]) -> str:
-                text, placeholder = match.groups()
-                return f"[{text}]({masked_document.links.get(placeholder, placeholder)})"
-
-            return re.sub(pattern, replacement, content)
+        def replacement(match: re.Match[str]) -> str:
+            url = targets.get(match.group(1))
+            return match.group(0) if url is None else f"]({url})"
 
-        def unmask_images(content: str) -> str:
-            """Replace image placeholders with their original URLs."""
-            pattern = MarkdownPruningPipe.image_pattern
-
-            def replacement(match: re.Match[str]) -> str:
-                alt_text, placeholder = match.groups()
-                return f"![{alt_text}]({masked_document.images.get(placeholder, placeholder)})"
-
-            return re.sub(pattern, replacement, content)
-
-        # Apply transformations in sequence
-        process = compose(unmask_images, unmask_links)
-        return process(masked_document.content)
+        return MarkdownPruningPipe.target_regex.sub(replacement, masked_document.content)
 
     @staticmethod
     def unmask_pydantic(document: MaskedDocument, data: TBaseModel) -> TBaseModel:
         """
         Unmask the links and images from the document using pydantic.
         """
+        targets = {**document.links, **document.images}
+        if len(targets) == 0:
+            return data
+
         # Step 1: first try to unmask the JSON string
-        json_document = document.with_content(data.model_dump_json())
         try:
-            unmasked = MarkdownPruningPipe.unmask(json_document)
-            data = data.__class__.model_validate_json(unmasked)
+            raw: Any = json.loads(MarkdownPruningPipe.unmask(document.with_content(data.model_dump_json())))
         except Exception as e:
-            # if that fails, try to unmask the markdown string
+            # if that fails, only unmask the string fields
             logger.debug(f"Failed to unmask the JSON string: {e}")
-
-        # Step 2: look for string fields in the model that are exactly the same as the masked document
-        def recursive_unmask(data: dict[str, Any]) -> dict[str, Any]:
-            for key, value in data.items():
-                if isinstance(value, str):
-                    if value in document.links:
-                        data[key] = document.links[value]
-                    elif value in document.images:
-                        data[key] = document.images[value]
-                elif isinstance(value, dict):
-                    data[key] = recursive_unmask(value)  # pyright: ignore[reportUnknownArgumentType]
-                elif isinstance(value, list):
-                    data[key] = [recursive_unmask(item) for item in value]  # pyright: ignore[reportUnknownArgumentType, reportUnknownVariableType]
-            return data
-
-        unmasked_data = recursive_unmask(data.model_dump())
-        return data.__class__.model_validate(unmasked_data)
+            raw = data.model_dump(mode="json")
+
+        # Step 2: look for string fields in the model that are exactly the same as the masked placeholders
+        def unmask_value(value: Any) -> Any:
+            if isinstance(value, str):
+                return targets.get(value, value)
+            if isinstance(value, dict):
+                return {key: unmask_value(item) for key, item in value.items()}  # pyright: ignore[reportUnknownVariableType]
+            if isinstance(value, list):
+                return [unmask_value(item) for item in value]  # pyright: ignore[reportUnknownVariableType]
+            return value
+
+        return data.__class__.model_validate_json(json.dumps(unmask_value(raw)))
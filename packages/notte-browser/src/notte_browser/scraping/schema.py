@@ -1,13 +1,175 @@
+import asyncio
 import datetime as dt
+import re
+from collections.abc import Callable
+from typing import Any, cast
 
 from litellm import json
 from loguru import logger
+from notte_core.common.config import config
 from notte_core.data.space import DictBaseModel, NoStructuredData, StructuredData
 from notte_core.llms.service import LLMService
 from notte_core.llms.types import TResponseFormat
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
-from notte_browser.scraping.pruning import MarkdownPruningPipe
+from notte_browser.scraping.pruning import MarkdownPruningPipe, MaskedDocument
+
+# structural boundaries used to split long documents, from the coarsest to the finest, with the text used to join
+# the parts back together: headings, paragraphs, lines and words
+CHUNK_SEPARATORS: list[tuple[re.Pattern[str], str]] = [
+    (re.compile(r"\n(?=#{1,6} )"), "\n"),
+    (re.compile(r"\n\s*\n"), "\n\n"),
+    (re.compile(r"\n"), "\n"),
+    (re.compile(r" "), " "),
+]
+
+# fields identifying list items extracted from different chunks as the same entity, when there is no schema
+DEDUP_KEYS = ("id", "url", "link", "href")
+SCALAR_TYPES = frozenset({"string", "integer", "number", "boolean"})
+
+
+def split_markdown(text: str, max_tokens: int, count_tokens: Callable[[str], int], level: int = 0) -> list[str]:
+    """Split a markdown document into chunks of at most `max_tokens` tokens, cutting on the coarsest boundaries"""
+    if level >= len(CHUNK_SEPARATORS) or count_tokens(text) <= max_tokens:
+        return [text]
+    separator, joiner = CHUNK_SEPARATORS[level]
+    chunks: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+
+    def flush() -> None:
+        nonlocal current, current_tokens
+        if len(current) > 0:
+            chunks.append(joiner.join(current))
+        current, current_tokens = [], 0
+
+    for part in separator.split(text):
+        tokens = count_tokens(part)
+        if tokens > max_tokens:
+            flush()
+            chunks.extend(split_markdown(part, max_tokens, count_tokens, level + 1))
+            continue
+        # token counts are added up (+1 for the joiner): slightly overestimates the chunk size
+        if current_tokens + tokens + 1 > max_tokens:
+            flush()
+        current.append(part)
+        current_tokens += tokens + 1
+    flush()
+    return chunks
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, str | list | dict) and len(value) == 0)  # pyright: ignore[reportUnknownArgumentType]
+
+
+def _resolve_schema(schema: dict[str, Any] | None, defs: dict[str, Any]) -> dict[str, Any] | None:
+    """Follow `$ref` and unwrap optional (`anyOf` with `null`) json schemas"""
+    while schema is not None:
+        if "$ref" in schema:
+            schema = defs.get(str(schema["$ref"]).split("/")[-1])
+        elif "anyOf" in schema:
+            variants: list[dict[str, Any]] = [variant for variant in schema["anyOf"] if variant.get("type") != "null"]
+            schema = variants[0] if len(variants) == 1 else None
+        else:
+            return schema
+    return None
+
+
+def _identity_fields(item_schema: dict[str, Any] | None, defs: dict[str, Any]) -> list[str] | None:
+    """
+    Fields identifying the list items of a schema: its required scalar fields.
+    Items without schema (None) are identified by their first non-empty `DEDUP_KEYS` field.
+    """
+    if item_schema is None or item_schema.get("type") != "object":
+        return None
+    properties: dict[str, Any] = item_schema.get("properties", {})
+    fields: list[str] = []
+    for name in item_schema.get("required", []):
+        field_schema = _resolve_schema(properties.get(name), defs)
+        if field_schema is not None and field_schema.get("type") in SCALAR_TYPES:
+            fields.append(name)
+    return fields
+
+
+def _item_key(item: Any, fields: list[str] | None) -> str:
+    if isinstance(item, dict):
+        item_dict = cast(dict[str, Any], item)
+        if fields is None:
+            fields = [key for key in DEDUP_KEYS if not _is_missing(item_dict.get(key))][:1]
+        if len(fields) > 0:
+            return json.dumps({field: item_dict.get(field) for field in fields}, sort_keys=True, default=str)
+    return json.dumps(item, sort_keys=True, default=str)
+
+
+def merge_values(
+    first: Any, second: Any, schema: dict[str, Any] | None = None, defs: dict[str, Any] | None = None
+) -> Any:
+    """
+    Merge data extracted from two consecutive chunks, following the json `schema` of the response format (if any):
+    lists are concatenated (deduplicated by the required scalar fields of their items, see `_identity_fields`),
+    objects are merged field by field, and the first non-empty value is kept for other fields.
+    """
+    if _is_missing(first):
+        return second
+    if _is_missing(second):
+        return first
+    defs = defs or {}
+    schema = _resolve_schema(schema, defs)
+    kind = schema.get("type") if schema is not None else None
+    if isinstance(first, dict) and isinstance(second, dict) and kind in (None, "object"):
+        first_dict, second_dict = cast(dict[str, Any], first), cast(dict[str, Any], second)
+        properties: dict[str, Any] = schema.get("properties", {}) if schema is not None else {}
+        return {
+            key: merge_values(first_dict.get(key), second_dict.get(key), properties.get(key), defs)
+            for key in first_dict | second_dict
+        }
+    if isinstance(first, list) and isinstance(second, list) and kind in (None, "array"):
+        item_schema = _resolve_schema(schema.get("items"), defs) if schema is not None else None
+        fields = _identity_fields(item_schema, defs)
+        items: dict[str, Any] = {}
+        for item in [*cast(list[Any], first), *cast(list[Any], second)]:
+            key = _item_key(item, fields)
+            items[key] = merge_values(items[key], item, item_schema, defs) if key in items else item
+        return list(items.values())
+    return first
+
+
+def merge_structured(
+    results: list[StructuredData[BaseModel]], response_format: type[BaseModel] | None
+) -> StructuredData[BaseModel]:
+    """
+    Merge the data extracted from each chunk of a document into the `response_format` schema.
+
+    If some chunks failed, the result is not successful: its error lists the failed chunks and its data holds
+    what was extracted from the other ones.
+    """
+    successes = [result for result in results if result.success and result.data is not None]
+    failures = [(index, result) for index, result in enumerate(results) if not result.success or result.data is None]
+    if len(successes) == 0:
+        return results[0]
+    if len(successes) == 1:
+        data = successes[0].data
+    else:
+        schema = response_format.model_json_schema() if response_format is not None else None
+        defs: dict[str, Any] = schema.get("$defs", {}) if schema is not None else {}
+        merged: Any = None
+        for result in successes:
+            assert result.data is not None
+            merged = merge_values(merged, result.data.model_dump(), schema, defs)
+        try:
+            data = response_format.model_validate(merged) if response_format is not None else DictBaseModel(merged)
+        except ValidationError as e:
+            return StructuredData(
+                success=False, error=f"Cannot merge the data extracted from the document chunks: {e}", data=None
+            )
+    if len(failures) > 0:
+        errors = "; ".join(f"chunk {index + 1}: {result.error or 'unknown error'}" for index, result in failures)
+        return StructuredData[BaseModel](
+            success=False,
+            error=f"Failed to extract data from {len(failures)} of {len(results)} document chunks ({errors})",
+            data=data,
+        )
+    return StructuredData[BaseModel](success=True, data=data)
 
 
 class _Hotel(BaseModel):
@@ -74,10 +236,44 @@ class SchemaScrapingPipe:
         verbose: bool = False,
         use_link_placeholders: bool = True,
     ) -> StructuredData[BaseModel]:
-        # make LLM call
         # TODO: add masking but needs more testing
         masked_document = MarkdownPruningPipe.mask(document)
-        document = self.llmserve.clip_tokens(masked_document.content if use_link_placeholders else document)
+        content = masked_document.content if use_link_placeholders else document
+        if config.scraping_chunk_tokens <= 0:
+            chunks = [self.llmserve.clip_tokens(content)]
+        else:
+            max_tokens = min(config.scraping_chunk_tokens, self.llmserve.context_length() - 2000)
+            chunks = split_markdown(content, max_tokens, lambda text: self.llmserve.estimate_tokens(text=text))
+
+        if len(chunks) == 1:
+            return await self.extract(
+                url, chunks[0], response_format, instructions, masked_document, verbose, use_link_placeholders
+            )
+
+        if verbose:
+            logger.trace(f"Extracting structured data from {len(chunks)} chunks of the document")
+        semaphore = asyncio.Semaphore(config.scraping_max_parallel_chunks)
+
+        async def extract_chunk(chunk: str) -> StructuredData[BaseModel]:
+            async with semaphore:
+                return await self.extract(
+                    url, chunk, response_format, instructions, masked_document, verbose, use_link_placeholders
+                )
+
+        results = await asyncio.gather(*[extract_chunk(chunk) for chunk in chunks])
+        return merge_structured(results, response_format)
+
+    async def extract(
+        self,
+        url: str,
+        document: str,
+        response_format: type[TResponseFormat] | None,
+        instructions: str | None,
+        masked_document: MaskedDocument,
+        verbose: bool = False,
+        use_link_placeholders: bool = True,
+    ) -> StructuredData[BaseModel]:
+        # make LLM call
         match (response_format, instructions):
             case (None, None):
                 raise ValueError("response_format and instructions cannot be both None")
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import asyncio
 import datetime as dt
-from collections.abc import Sequence
+import itertools
+from collections.abc import AsyncIterator, Iterable, Sequence
 from pathlib import Path
 from typing import Any, ClassVar, Literal, Unpack, overload
 
@@ -33,7 +34,7 @@ from notte_core.space import ActionSpace
 from notte_core.storage import BaseStorage
 from notte_core.trajectory import Trajectory
 from notte_core.utils.files import create_or_append_cookies_to_file
-from notte_core.utils.webp_replay import ScreenshotReplay, WebpReplay
+from notte_core.utils.webp_replay import WebpReplay, build_webp_replay, replay_size
 from notte_sdk.types import (
     ExecutionRequest,
     ExecutionRequestDict,
@@ -49,6 +50,7 @@ from pydantic import RootModel, ValidationError
 from typing_extensions import override
 
 from notte_browser.action_selection.pipe import ActionSelectionPipe
+from notte_browser.browser_pool import BrowserPool
 from notte_browser.captcha import CaptchaHandler
 from notte_browser.controller import BrowserController
 from notte_browser.dom.locate import locate_element
@@ -60,13 +62,13 @@ from notte_browser.errors import (
     NoStorageObjectProvidedError,
     NoToolProvidedError,
 )
-from notte_browser.playwright import PlaywrightManager
+from notte_browser.playwright import BaseWindowManager, PlaywrightManager
 from notte_browser.playwright_async_api import Locator, Page
 from notte_browser.resolution import NodeResolutionPipe
 from notte_browser.scraping.pipe import DataScrapingPipe
 from notte_browser.tagging.action.pipe import MainActionSpacePipe
 from notte_browser.tools.base import BaseTool
-from notte_browser.window import BrowserWindow, BrowserWindowOptions
+from notte_browser.window import BrowserResource, BrowserWindow, BrowserWindowOptions
 
 enable_nest_asyncio()
 
@@ -131,8 +133,9 @@ class NotteSession(AsyncResource, SyncResource):
     async def astart(self) -> None:
         if self._window is not None:
             return
-        manager = PlaywrightManager()
         options = BrowserWindowOptions.from_request(self._request)
+        pool = BrowserPool.default()
+        manager: BaseWindowManager = pool if pool is not None and options.cdp_url is None else PlaywrightManager()
         self._window = await manager.new_window(options)
         if self._cookie_file is not None:
             if Path(self._cookie_file).exists():
@@ -197,13 +200,22 @@ class NotteSession(AsyncResource, SyncResource):
     def replay(self, screenshot_type: ScreenshotType | None = None) -> WebpReplay:
         screenshot_type = screenshot_type or self.screenshot_type
 
-        screenshots_traj = list(self.trajectory.all_screenshots())
-        screenshots: list[bytes] = [screen.bytes(screenshot_type) for screen in screenshots_traj]
-        if len(screenshots) == 0:
+        # screenshots are streamed from the trajectory (possibly spilled to disk) into the replay, one at a time
+        screenshots = self.trajectory.all_screenshots()
+        first, second = next(screenshots, None), next(screenshots, None)
+        if first is None:
             raise ValueError("No screenshots found in agent trajectory")
-        elif len(screenshots) > 1 and screenshots[0] == Observation.empty().screenshot.bytes(screenshot_type):
-            screenshots = screenshots[1:]
-        return ScreenshotReplay.from_bytes(screenshots).get(quality=90)  # pyright: ignore [reportArgumentType]
+        skip_first = second is not None and first.bytes(screenshot_type) == Observation.empty().screenshot.bytes(
+            screenshot_type
+        )
+        leading = [first] if second is None else [second] if skip_first else [first, second]
+        # rendering does not change the screenshot size: only the raw image headers are read to compute it
+        size = replay_size(
+            itertools.islice((screen.raw for screen in self.trajectory.all_screenshots()), int(skip_first), None),
+            scale_factor=0.7,
+        )
+        frames = (screen.bytes(screenshot_type) for screen in itertools.chain(leading, screenshots))
+        return WebpReplay(build_webp_replay(frames, quality=90, size=size))
 
     # ---------------------------- observe, step functions ----------------------------
 
@@ -528,6 +540,10 @@ class NotteSession(AsyncResource, SyncResource):
     @track_usage("local.session.scrape")
     async def ascrape(self, **params: Unpack[ScrapeParamsDict]) -> StructuredData[BaseModel] | str | list[ImageData]:
         data = await self._ascrape(**params)
+        return self._scrape_output(data)
+
+    @staticmethod
+    def _scrape_output(data: DataSpace) -> StructuredData[BaseModel] | str | list[ImageData]:
         if data.images is not None:
             return data.images
         if data.structured is not None:
@@ -539,20 +555,96 @@ class NotteSession(AsyncResource, SyncResource):
 
     @profiler.profiled()
     async def _ascrape(self, retries: int = 3, wait_time: int = 2000, **params: Unpack[ScrapeParamsDict]) -> DataSpace:
+        scrape_params = ScrapeParams.model_validate(params)
+        url, data = await self._ascrape_page(self.window, scrape_params, retries=retries, wait_time=wait_time)
+        return await self._data_scraping_pipe.structure(url, data, scrape_params)
+
+    async def _ascrape_page(
+        self, window: BrowserWindow, params: ScrapeParams, retries: int = 3, wait_time: int = 2000
+    ) -> tuple[str, DataSpace]:
         try:
-            return await self._data_scraping_pipe.forward(
-                window=self.window,
-                snapshot=await self.window.snapshot(),
-                params=ScrapeParams.model_validate(params),
-            )
+            snapshot = await window.snapshot()
+            return snapshot.metadata.url, await self._data_scraping_pipe.scrape(window, snapshot, params)
         except EmptyPageContentError as e:
             if retries == 0:
                 raise e
             logger.warning(f"Scrape failed after empty page content, retrying in {wait_time / 1000} seconds...")
             await asyncio.sleep(wait_time / 1000)
-            return await self._ascrape(retries=retries - 1, wait_time=wait_time, **params)
-        except Exception as e:
-            raise e
+            return await self._ascrape_page(window, params, retries=retries - 1, wait_time=wait_time)
+
+    @track_usage("local.session.scrape_many")
+    async def ascrape_many(
+        self,
+        urls: Iterable[str],
+        *,
+        max_tabs: int = 4,
+        max_llm_calls: int = 4,
+        raise_on_failure: bool | None = None,
+        **params: Unpack[ScrapeParamsDict],
+    ) -> AsyncIterator[tuple[str, StructuredData[BaseModel] | str | list[ImageData] | Exception]]:
+        """
+        Scrape several URLs concurrently and yield `(url, result)` pairs as soon as they are ready.
+
+        Each URL is loaded in its own tab of the session (sharing its cookies), at most `max_tabs` at a time. Tabs
+        are closed as soon as the page is converted to markdown, so that page loads are pipelined with the
+        structured data extraction, which runs at most `max_llm_calls` LLM calls at a time. Results are yielded in
+        completion order. If `raise_on_failure` is False, failed URLs are yielded with the exception as result.
+        """
+        scrape_params = ScrapeParams.model_validate(params)
+        raise_on_failure = raise_on_failure if raise_on_failure is not None else self.default_raise_on_failure
+        tabs = asyncio.Semaphore(max_tabs)
+        llm_calls = asyncio.Semaphore(max_llm_calls)
+
+        async def scrape(url: str) -> tuple[str, StructuredData[BaseModel] | str | list[ImageData] | Exception]:
+            try:
+                async with tabs:
+                    page = await self.window.page.context.new_page()
+                    try:
+                        window = BrowserWindow(
+                            resource=BrowserResource(page=page, options=self.window.resource.options),
+                            screenshot_mask=self.window.screenshot_mask,
+                        )
+                        await window.goto(url)
+                        page_url, data = await self._ascrape_page(window, scrape_params)
+                    finally:
+                        await page.close()
+                async with llm_calls:
+                    data = await self._data_scraping_pipe.structure(page_url, data, scrape_params)
+                return url, self._scrape_output(data)
+            except Exception as e:
+                if raise_on_failure:
+                    raise
+                logger.warning(f"Failed to scrape {url}: {e}")
+                return url, e
+
+        tasks = [asyncio.create_task(scrape(url)) for url in urls]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # stop the remaining scrapes if the consumer stops iterating (or on failure)
+            for task in tasks:
+                _ = task.cancel()
+            _ = await asyncio.gather(*tasks, return_exceptions=True)
+
+    def scrape_many(
+        self,
+        urls: Iterable[str],
+        *,
+        max_tabs: int = 4,
+        max_llm_calls: int = 4,
+        raise_on_failure: bool | None = None,
+        **params: Unpack[ScrapeParamsDict],
+    ) -> list[tuple[str, StructuredData[BaseModel] | str | list[ImageData] | Exception]]:
+        async def collect() -> list[tuple[str, StructuredData[BaseModel] | str | list[ImageData] | Exception]]:
+            return [
+                result
+                async for result in self.ascrape_many(
+                    urls, max_tabs=max_tabs, max_llm_calls=max_llm_calls, raise_on_failure=raise_on_failure, **params
+                )
+            ]
+
+        return asyncio.run(collect())
 
     @overload
     def scrape(self, /, **params: Unpack[ScrapeMarkdownParamsDict]) -> str: ...
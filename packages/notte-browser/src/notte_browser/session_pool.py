@@ -0,0 +1,126 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any, TypeVar, Unpack
+
+from notte_core.common.config import PerceptionType, config
+from notte_core.common.resource import AsyncResource
+from notte_core.errors.base import NotteTimeoutError
+from notte_sdk.types import SessionStartRequest, SessionStartRequestDict
+from typing_extensions import override
+
+from notte_browser.browser_pool import BrowserPool
+from notte_browser.playwright import BaseWindowManager
+from notte_browser.session import NotteSession
+from notte_browser.window import BrowserWindow, BrowserWindowOptions
+
+T = TypeVar("T")
+Item = TypeVar("Item")
+
+
+class SessionPool(AsyncResource):
+    """
+    Run many `NotteSession`s concurrently as asyncio tasks on one event loop.
+
+    By default, all the sessions share a single Playwright driver and browser (one browser context per session).
+    At most `max_concurrency` sessions run at the same time, each one is stopped after `timeout` seconds, and the
+    running sessions can be cancelled at any time.
+
+    ```python
+    async def title(session: NotteSession, url: str) -> str:
+        obs = await session.aobserve(url=url)
+        return obs.metadata.title
+
+    async with SessionPool(max_concurrency=16, timeout=60, headless=True) as pool:
+        titles = await pool.map(title, urls)
+    ```
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        timeout: float | None = None,
+        *,
+        perception_type: PerceptionType = config.perception_type,
+        window_manager: BaseWindowManager | None = None,
+        **data: Unpack[SessionStartRequestDict],
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency should be at least 1")
+        self.max_concurrency: int = max_concurrency
+        self.timeout: float | None = timeout
+        self.perception_type: PerceptionType = perception_type
+        self.window_manager: BaseWindowManager = window_manager or BrowserPool(
+            size=1, max_contexts_per_browser=max_concurrency, max_idle_contexts_per_browser=max_concurrency
+        )
+        # window managers provided by the caller may be shared with other pools: they are not stopped with this one
+        self._owns_window_manager: bool = window_manager is None
+        self._request: SessionStartRequest = SessionStartRequest.model_validate(data)
+        self._data: SessionStartRequestDict = data
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: set[asyncio.Task[Any]] = set()
+
+    @override
+    async def astart(self) -> None:
+        if isinstance(self.window_manager, BrowserPool):
+            await self.window_manager.warmup(BrowserWindowOptions.from_request(self._request))
+        elif self._owns_window_manager:
+            await self.window_manager.astart()
+
+    @override
+    async def astop(self) -> None:
+        await self.cancel()
+        if self._owns_window_manager:
+            await self.window_manager.astop()
+
+    def __len__(self) -> int:
+        """Number of submitted sessions that are not done yet (running or waiting for a slot)"""
+        return len(self._tasks)
+
+    async def run(self, fn: Callable[[NotteSession], Awaitable[T]], timeout: float | None = None) -> T:
+        """Run `fn` in a new session, once a slot is available. The session is always stopped afterwards."""
+        timeout = timeout if timeout is not None else self.timeout
+        async with self._semaphore:
+            window: BrowserWindow | None = None
+            session: NotteSession | None = None
+            deadline = asyncio.timeout(timeout)
+            try:
+                async with deadline:
+                    window = await self.window_manager.new_window(BrowserWindowOptions.from_request(self._request))
+                    session = NotteSession(window=window, perception_type=self.perception_type, **self._data)
+                    return await fn(session)
+            except TimeoutError as e:
+                if deadline.expired():
+                    raise NotteTimeoutError(message=f"Session timed out after {timeout} seconds.") from e
+                raise
+            finally:
+                # shielded: the browser context has to be released even if the task is cancelled again
+                if session is not None:
+                    await asyncio.shield(session.astop())
+                elif window is not None:
+                    # the session could not be created: release its window
+                    await asyncio.shield(window.close())
+
+    def submit(self, fn: Callable[[NotteSession], Awaitable[T]], timeout: float | None = None) -> asyncio.Task[T]:
+        """Schedule `fn` to run in a new session, and return its task (which can be awaited or cancelled)"""
+        task = asyncio.create_task(self.run(fn, timeout=timeout))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def map(
+        self, fn: Callable[[NotteSession, Item], Awaitable[T]], items: Iterable[Item], timeout: float | None = None
+    ) -> list[T | BaseException]:
+        """Run `fn(session, item)` for every item, each in its own session. Errors are returned in place of results."""
+
+        def bind(item: Item) -> Callable[[NotteSession], Awaitable[T]]:
+            return lambda session: fn(session, item)
+
+        tasks = [self.submit(bind(item), timeout=timeout) for item in items]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def cancel(self) -> None:
+        """Cancel all the submitted sessions and wait for them to be stopped"""
+        tasks = list(self._tasks)
+        for task in tasks:
+            _ = task.cancel()
+        _ = await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,114 @@
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Literal
+
+from notte_core.common.config import SettleStrategy
+
+from notte_browser.playwright_async_api import Page, Request
+
+SettleKind = Literal["short", "long"]
+
+# Resolves to true once the DOM had no mutation for `quietMs` (checked after the pending animation frames have been
+# rendered), or to false after `timeoutMs`. `requestAnimationFrame` doesn't fire in background tabs: timers are
+# used as a fallback.
+PAGE_QUIET_SCRIPT = """
+({ quietMs, timeoutMs }) => new Promise((resolve) => {
+    const start = performance.now();
+    let lastMutation = start;
+    const observer = new MutationObserver(() => { lastMutation = performance.now(); });
+    observer.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    const nextFrame = (callback) => {
+        let called = false;
+        const once = () => { if (!called) { called = true; callback(); } };
+        requestAnimationFrame(once);
+        setTimeout(once, 50);
+    };
+    const check = () => {
+        const now = performance.now();
+        if (now - lastMutation >= quietMs || now - start >= timeoutMs) {
+            observer.disconnect();
+            resolve(now - start < timeoutMs);
+            return;
+        }
+        setTimeout(check, Math.min(quietMs - (now - lastMutation), timeoutMs - (now - start)) + 1);
+    };
+    nextFrame(() => nextFrame(check));
+})
+"""
+
+# requests that can change the page content (images, fonts, media, beacons... are ignored)
+TRACKED_RESOURCE_TYPES = frozenset({"document", "xhr", "fetch", "script", "stylesheet"})
+
+
+class NetworkTracker:
+    """Tracks the pending requests of a page that can still change its content"""
+
+    def __init__(self, page: Page) -> None:
+        self._pending: set[Request] = set()
+        self._idle: asyncio.Event = asyncio.Event()
+        self._idle.set()
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_done)
+        page.on("requestfailed", self._on_done)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _on_request(self, request: Request) -> None:
+        if request.resource_type in TRACKED_RESOURCE_TYPES:
+            self._pending.add(request)
+            self._idle.clear()
+
+    def _on_done(self, request: Request) -> None:
+        self._pending.discard(request)
+        if len(self._pending) == 0:
+            self._idle.set()
+
+    async def wait_idle(self, timeout: float) -> bool:
+        try:
+            async with asyncio.timeout(timeout):
+                _ = await self._idle.wait()
+            return True
+        except TimeoutError:
+            return False
+
+
+@dataclass
+class SettleTiming:
+    count: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+    # sum of the upper bounds of the waits, i.e. what the `fixed` strategy waits for short settles
+    bound_s: float = 0.0
+
+
+class SettleStats:
+    """Time spent waiting for the page to settle, per action type and strategy"""
+
+    def __init__(self) -> None:
+        self.timings: dict[tuple[str, SettleStrategy], SettleTiming] = defaultdict(SettleTiming)
+
+    def record(self, action_type: str, strategy: SettleStrategy, elapsed_s: float, bound_s: float) -> None:
+        timing = self.timings[(action_type, strategy)]
+        timing.count += 1
+        timing.total_s += elapsed_s
+        timing.max_s = max(timing.max_s, elapsed_s)
+        timing.bound_s += bound_s
+
+    @property
+    def total_s(self) -> float:
+        return sum(timing.total_s for timing in self.timings.values())
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        return {
+            f"{action_type}[{strategy}]": {
+                "count": timing.count,
+                "total_ms": round(timing.total_s * 1000, 1),
+                "mean_ms": round(timing.total_s / timing.count * 1000, 1),
+                "max_ms": round(timing.max_s * 1000, 1),
+                "bound_ms": round(timing.bound_s * 1000, 1),
+            }
+            for (action_type, strategy), timing in sorted(self.timings.items())
+        }
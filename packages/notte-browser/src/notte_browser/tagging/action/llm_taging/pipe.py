@@ -110,10 +110,11 @@ class LlmActionSpacePipe(BaseActionSpacePipe):
         n_trials: int,
     ) -> ActionSpace:
         # this function assumes tld(previous_actions_list) == tld(context)!
-        inodes_ids = [inode.id for inode in snapshot.interaction_nodes()]
+        inodes = snapshot.interaction_node_index()
+        inodes_ids = list(inodes.keys())
         previous_action_list = previous_action_list or []
         # we keep only intersection of current context inodes and previous actions!
-        previous_action_list = [action for action in previous_action_list if action.id in inodes_ids]
+        previous_action_list = [action for action in previous_action_list if action.id in inodes]
         # TODO: question, can we already perform a `check_enough_actions` here ?
         possible_space = await self.action_listing_pipe.forward(snapshot, previous_action_list)
         _merged_actions = self.merge_action_lists(inodes_ids, possible_space.actions, previous_action_list)
@@ -173,7 +174,7 @@ class LlmActionSpacePipe(BaseActionSpacePipe):
             previous_action_list,
             pagination=pagination,
             n_trials=self.get_n_trials(
-                nb_nodes=len(snapshot.interaction_nodes()),
+                nb_nodes=len(snapshot.interaction_node_index()),
                 max_nb_actions=pagination.max_nb_actions,
             ),
         )
@@ -187,7 +188,7 @@ class LlmActionSpacePipe(BaseActionSpacePipe):
         self, actions: Sequence[InteractionAction | PossibleAction], snapshot: BrowserSnapshot
     ) -> Sequence[InteractionAction]:
         interaction_actions: list[InteractionAction] = []
-        inodes = {inode.id: inode for inode in snapshot.interaction_nodes()}
+        inodes = snapshot.interaction_node_index()
         for action in actions:
             if isinstance(action, PossibleAction):
                 inode = inodes[action.id]
@@ -1,4 +1,6 @@
 import asyncio
+import functools
+import json
 import os
 import random
 import time
@@ -16,7 +18,7 @@ from notte_core.browser.snapshot import (
     TabsData,
     ViewportData,
 )
-from notte_core.common.config import BrowserType, CookieDict, PlaywrightProxySettings, config
+from notte_core.common.config import BrowserType, CookieDict, PlaywrightProxySettings, SettleStrategy, config
 from notte_core.errors.processing import SnapshotProcessingError
 from notte_core.profiling import profiler
 from notte_core.utils.url import is_valid_url
@@ -26,9 +28,10 @@ from notte_sdk.types import (
     Cookie,
     SessionStartRequest,
 )
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 from typing_extensions import override
 
+from notte_browser.dom.incremental import IncrementalParseDomTreePipe
 from notte_browser.dom.parsing import dom_tree_parsers
 from notte_browser.errors import (
     BrowserExpiredError,
@@ -42,6 +45,17 @@ from notte_browser.errors import (
     UnexpectedBrowserError,
 )
 from notte_browser.playwright_async_api import CDPSession, Locator, Page, Response
+from notte_browser.settling import PAGE_QUIET_SCRIPT, NetworkTracker, SettleKind, SettleStats
+
+# javascript expressions needed to build `ViewportData`, evaluated in a single round trip by `BrowserWindow.probe`
+VIEWPORT_PROBE: dict[str, str] = {
+    "scroll_x": "window.scrollX",
+    "scroll_y": "window.scrollY",
+    "viewport_width": "window.innerWidth",
+    "viewport_height": "window.innerHeight",
+    "total_width": "document.documentElement.scrollWidth",
+    "total_height": "document.documentElement.scrollHeight",
+}
 
 
 class BrowserWindowOptions(BaseModel):
@@ -59,6 +73,12 @@ class BrowserWindowOptions(BaseModel):
     cdp_url: str | None
     debug_port: int | None
     custom_devtools_frontend: str | None
+    _default_viewport: bool = PrivateAttr(default=False)
+
+    @property
+    def default_viewport(self) -> bool:
+        """Whether the viewport was not requested but randomly set around the default headless viewport"""
+        return self._default_viewport
 
     def set_cdp_url(self, cdp_url: str) -> Self:
         self.cdp_url = cdp_url
@@ -78,6 +98,7 @@ class BrowserWindowOptions(BaseModel):
             )
             self.viewport_width = DEFAULT_HEADLESS_VIEWPORT_WIDTH + width_variation
             self.viewport_height = DEFAULT_HEADLESS_VIEWPORT_HEIGHT + height_variation
+            self._default_viewport = True
 
     def get_chrome_args(self) -> list[str]:
         chrome_args = self.chrome_args or []
@@ -161,6 +182,9 @@ class BrowserWindow(BaseModel):
     on_close: Callable[[], Awaitable[None]] | None = None
     page_callbacks: dict[str, Callable[[Page], None]] = Field(default_factory=dict)
     goto_response: Response | None = Field(exclude=True, default=None)
+    _incremental_dom_pipe: IncrementalParseDomTreePipe = PrivateAttr(default_factory=IncrementalParseDomTreePipe)
+    _settle_stats: SettleStats = PrivateAttr(default_factory=SettleStats)
+    _network_trackers: dict[Page, NetworkTracker] = PrivateAttr(default_factory=dict)
 
     model_config: ClassVar[ConfigDict] = ConfigDict(arbitrary_types_allowed=True)
 
@@ -168,6 +192,7 @@ class BrowserWindow(BaseModel):
     def model_post_init(self, __context: Any) -> None:
         self.resource.page.set_default_timeout(config.timeout_default_ms)
         self.apply_page_callbacks()
+        _ = self.track_network()
 
     def apply_page_callbacks(self):
         for key, callback in self.page_callbacks.items():
@@ -178,10 +203,13 @@ class BrowserWindow(BaseModel):
         return self.resource.page
 
     async def close(self) -> None:
-        if self.on_close is not None:
-            await self.on_close()
-        for tab in self.tabs:
-            await tab.close()
+        # close the tabs first: `on_close` may hand the browser context back to a pool
+        try:
+            for tab in self.tabs:
+                await tab.close()
+        finally:
+            if self.on_close is not None:
+                await self.on_close()
 
     @property
     def port(self) -> int:
@@ -212,6 +240,7 @@ class BrowserWindow(BaseModel):
     def page(self, page: Page) -> None:
         self.resource.page = page
         self.apply_page_callbacks()
+        _ = self.track_network()
 
     @property
     def tabs(self) -> list[Page]:
@@ -234,6 +263,70 @@ class BrowserWindow(BaseModel):
     async def short_wait(self) -> None:
         await self.page.wait_for_timeout(config.wait_short_ms)
 
+    @property
+    def settle_stats(self) -> SettleStats:
+        """Time spent waiting for the page to settle after each action type"""
+        return self._settle_stats
+
+    def track_network(self) -> NetworkTracker | None:
+        """Start tracking the pending requests of the current page, if any action settles with the `quiet` strategy"""
+        if config.settle_strategy != "quiet" and "quiet" not in config.settle_strategy_by_action.values():
+            return None
+        page = self.page
+        tracker = self._network_trackers.get(page)
+        if tracker is None:
+            tracker = self._network_trackers[page] = NetworkTracker(page)
+            page.once("close", lambda _: self._network_trackers.pop(page, None))
+        return tracker
+
+    @profiler.profiled()
+    async def wait_until_quiet(self, timeout_ms: int) -> bool:
+        """Wait until the DOM had no mutation for `settle_quiet_ms` and no request is pending, for at most `timeout_ms`"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_ms / 1000
+        tracker = self.track_network()
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                quiet: bool = await self.page.evaluate(
+                    PAGE_QUIET_SCRIPT, {"quietMs": config.settle_quiet_ms, "timeoutMs": remaining * 1000}
+                )
+            except PlaywrightError:
+                if self.page.is_closed():
+                    return False
+                # the execution context was destroyed by a navigation: wait for the new document
+                try:
+                    await self.page.wait_for_load_state("domcontentloaded", timeout=remaining * 1000)
+                except PlaywrightError:
+                    await asyncio.sleep(0.05)
+                continue
+            if not quiet:
+                return False
+            if tracker is None or tracker.pending == 0:
+                return True
+            _ = await tracker.wait_idle(deadline - loop.time())
+        return False
+
+    async def settle(self, action_type: str, kind: SettleKind = "short", bound_ms: int | None = None) -> None:
+        """
+        Wait for the page to settle after an action, with the strategy configured for `action_type`.
+
+        `short` settles are bounded by `bound_ms` (`wait_short_ms` by default), `long` ones (after navigations)
+        by `timeout_goto_ms`.
+        """
+        strategy: SettleStrategy = config.settle_strategy_by_action.get(action_type, config.settle_strategy)
+        if bound_ms is None:
+            bound_ms = config.wait_short_ms if kind == "short" else config.timeout_goto_ms + config.wait_short_ms
+        start_time = time.perf_counter()
+        match strategy, kind:
+            case "fixed", "short":
+                await self.page.wait_for_timeout(bound_ms)
+            case "fixed", "long":
+                await self.long_wait()
+            case "quiet", _:
+                if not await self.wait_until_quiet(bound_ms) and config.verbose:
+                    logger.trace(f"Page '{self.page.url}' did not settle after {action_type} within {bound_ms}ms")
+        self._settle_stats.record(action_type, strategy, time.perf_counter() - start_time, bound_ms / 1000)
+
     async def tab_metadata(self, tab_idx: int | None = None) -> TabsData:
         page = self.tabs[tab_idx] if tab_idx is not None else self.page
         return TabsData(
@@ -242,20 +335,32 @@ class BrowserWindow(BaseModel):
             url=page.url,
         )
 
+    async def probe(self, expressions: dict[str, str], tab_idx: int | None = None) -> dict[str, Any]:
+        """
+        Evaluates several javascript expressions in a single round trip to the page.
+
+        Example: `await window.probe({"title": "document.title", "scroll_y": "window.scrollY"})`
+        """
+        page = self.tabs[tab_idx] if tab_idx is not None else self.page
+        fields = ", ".join(f"{json.dumps(key)}: ({expression})" for key, expression in expressions.items())
+        return await page.evaluate(f"() => ({{{fields}}})")
+
+    async def viewport(self, tab_idx: int | None = None) -> ViewportData:
+        probe = await self.probe(VIEWPORT_PROBE, tab_idx=tab_idx)
+        return ViewportData.model_validate({key: int(value) for key, value in probe.items()})
+
     @profiler.profiled()
     async def snapshot_metadata(self) -> SnapshotMetadata:
+        probe, tabs = await asyncio.gather(
+            self.probe({"title": "document.title", **VIEWPORT_PROBE}),
+            asyncio.gather(*[self.tab_metadata(i) for i, _ in enumerate(self.tabs)]),
+        )
+        title = probe.pop("title")
         return SnapshotMetadata(
-            title=await self.page.title(),
+            title=title,
             url=self.page.url,
-            viewport=ViewportData(
-                scroll_x=int(await self.page.evaluate("window.scrollX")),
-                scroll_y=int(await self.page.evaluate("window.scrollY")),
-                viewport_width=int(await self.page.evaluate("window.innerWidth")),
-                viewport_height=int(await self.page.evaluate("window.innerHeight")),
-                total_width=int(await self.page.evaluate("document.documentElement.scrollWidth")),
-                total_height=int(await self.page.evaluate("document.documentElement.scrollHeight")),
-            ),
-            tabs=[await self.tab_metadata(i) for i, _ in enumerate(self.tabs)],
+            viewport=ViewportData.model_validate({key: int(value) for key, value in probe.items()}),
+            tabs=list(tabs),
         )
 
     @profiler.profiled()
@@ -282,21 +387,38 @@ class BrowserWindow(BaseModel):
             raw=a11y_raw,
         )
 
+    @profiler.profiled()
+    async def page_content(self, page: Page | None = None, retries: int = config.empty_page_max_retry) -> str:
+        """Html content of the page, with the same retry on navigating pages and error mapping as `snapshot`"""
+        page = page or self.page
+        try:
+            return await page.content()
+        except Exception as e:
+            if "has been closed" in str(e):
+                raise BrowserExpiredError() from e
+            if retries > 1 and "Unable to retrieve content because the page is navigating" in str(e):
+                await self.short_wait()
+                return await self.page_content(page, retries=retries - 1)
+            raise UnexpectedBrowserError(url=page.url) from e
+
     @profiler.profiled()
     async def snapshot(
         self, screenshot: bool | None = None, retries: int = config.empty_page_max_retry
     ) -> BrowserSnapshot:
         if retries <= 0:
             raise EmptyPageContentError(url=self.page.url, nb_retries=config.empty_page_max_retry)
-        html_content: str = ""
+        html_content: str | None = None
         dom_node: DomNode | None = None
         snapshot_screenshot = None
+        page = self.page
         try:
-            html_content = await profiler.profiled()(self.page.content)()
-            dom_tree_pipe = dom_tree_parsers["default"]
+            if not config.lazy_html_content:
+                html_content = await profiler.profiled()(page.content)()
+            dom_tree_pipe = self._incremental_dom_pipe if config.incremental_snapshot else dom_tree_parsers["default"]
             snapshot_screenshot, dom_node = await asyncio.gather(self.screenshot(), dom_tree_pipe.forward(self.page))
 
         except SnapshotProcessingError:
+            self._incremental_dom_pipe.reset()
             await self.long_wait()
             return await self.snapshot(screenshot=screenshot, retries=retries - 1)
 
@@ -324,7 +446,7 @@ class BrowserWindow(BaseModel):
                 a11y_tree=None,
                 dom_node=dom_node,
                 screenshot=snapshot_screenshot,
-            )
+            ).with_html_loader(functools.partial(self.page_content, page))
         except PlaywrightError:
             return await self.snapshot(screenshot=screenshot, retries=retries - 1)
 
@@ -369,7 +491,7 @@ class BrowserWindow(BaseModel):
 
             # extra wait to make sure that css animations can start
             # to make extra element visible
-            await self.short_wait()
+            await self.settle(f"go_{operation}" if operation is not None else "goto")
 
             if not is_default_page() or tries < 0:
                 break
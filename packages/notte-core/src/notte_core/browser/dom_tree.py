@@ -1,5 +1,5 @@
 import time
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
 from dataclasses import asdict, dataclass, field
 from typing import Callable, ClassVar, Required, TypeAlias, TypeVar
 
@@ -146,7 +146,7 @@ These attributes should be added to the DomAttributes class. Fix this ASAP.
         DomErrorBuffer._buffer.clear()
 
 
-@dataclass
+@dataclass(slots=True)
 class DomAttributes:
     # State attributes
     modal: bool | None
@@ -348,7 +348,7 @@ class DomAttributes:
         return f"{self.__class__.__name__}({attrs})"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ComputedDomAttributes:
     in_viewport: bool = False
     is_interactive: bool = False
@@ -362,7 +362,7 @@ class ComputedDomAttributes:
         object.__setattr__(self, "selectors", selectors)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DomNode:
     id: str | None
     type: NodeType
@@ -371,7 +371,8 @@ class DomNode:
     children: list["DomNode"]
     attributes: DomAttributes | None
     computed_attributes: ComputedDomAttributes
-    subtree_ids: list[str] = field(init=False, default_factory=list)
+    # lazily computed by the `subtree_ids` property
+    _subtree_ids: list[str] | None = field(init=False, default=None, repr=False, compare=False)
     bbox: BoundingBox | None = None
     # parents cannot be set in the constructor because it is a recursive structure
     # we need to set it after the constructor
@@ -385,13 +386,18 @@ class DomNode:
         return f"{self.__class__.__name__}(id={self.id}, role={self.get_role_str()}, text={self.text[:40]}...)\n{children_repr}"
 
     def __post_init__(self) -> None:
-        subtree_ids: list[str] = [] if self.id is None else [self.id]
-        for child in self.children:
-            subtree_ids.extend(child.subtree_ids)
-        object.__setattr__(self, "subtree_ids", subtree_ids)
         if isinstance(self.role, str):
             object.__setattr__(self, "role", NodeRole.from_value(self.role))
 
+    @property
+    def subtree_ids(self) -> list[str]:
+        """IDs of the nodes in the subtree (depth-first pre-order), computed on first access."""
+        subtree_ids = self._subtree_ids
+        if subtree_ids is None:
+            subtree_ids = [node.id for node in self.iter_nodes() if node.id is not None]
+            object.__setattr__(self, "_subtree_ids", subtree_ids)
+        return subtree_ids
+
     def set_parent(self, parent: "DomNode | None") -> None:
         object.__setattr__(self, "parent", parent)
 
@@ -457,15 +463,17 @@ class DomNode:
             return False
         return self.role.category().value == NodeCategory.IMAGE.value
 
-    def flatten(self, keep_filter: Callable[["DomNode"], bool] | None = None) -> list["DomNode"]:
-        def inner(node: DomNode, acc: list["DomNode"]) -> list["DomNode"]:
+    def iter_nodes(self, keep_filter: Callable[["DomNode"], bool] | None = None) -> Iterator["DomNode"]:
+        """Iterates over the subtree in depth-first pre-order without materializing it."""
+        stack: list[DomNode] = [self]
+        while stack:
+            node = stack.pop()
             if keep_filter is None or keep_filter(node):
-                acc.append(node)
-            for child in node.children:
-                _ = inner(child, acc)
-            return acc
+                yield node
+            stack.extend(reversed(node.children))
 
-        return inner(self, [])
+    def flatten(self, keep_filter: Callable[["DomNode"], bool] | None = None) -> list["DomNode"]:
+        return list(self.iter_nodes(keep_filter))
 
     @staticmethod
     def find_all_matching_subtrees_with_parents(
@@ -505,7 +513,7 @@ class DomNode:
         return dialogs
 
     def interaction_nodes(self) -> Sequence["InteractionDomNode"]:
-        inodes = self.flatten(keep_filter=lambda node: node.is_interaction())
+        inodes = self.iter_nodes(keep_filter=lambda node: node.is_interaction())
         return [inode.to_interaction_node() for inode in inodes]
 
     def image_nodes(self) -> list["DomNode"]:
@@ -608,7 +616,7 @@ class InteractionDomNode(DomNode):
         super().__post_init__()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ResolvedLocator:
     role: NodeRole | str
     is_editable: bool
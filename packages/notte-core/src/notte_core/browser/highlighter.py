@@ -1,8 +1,12 @@
 import io
+from collections import defaultdict
+from collections.abc import Iterator
 from dataclasses import dataclass
 from enum import Enum
 from typing import ClassVar
 
+import numpy as np
+import numpy.typing as npt
 from PIL import Image, ImageDraw, ImageFont
 from pydantic import BaseModel
 
@@ -110,15 +114,26 @@ class LabelConfig:
 
 
 class ColorAnalyzer:
-    """Handles color analysis for label placement optimization"""
+    """
+    Handles color analysis for label placement optimization.
 
-    @staticmethod
-    def is_area_uniform_color(image: Image.Image, rect: Rectangle, config: LabelConfig) -> bool:
+    The image is converted once to a numpy array: the color statistics of each candidate label region are then
+    computed on a view of that array, instead of cropping the image and iterating over its pixels in python.
+    """
+
+    def __init__(self, image: Image.Image):
+        self._pixels: npt.NDArray[np.uint8] = np.asarray(image if image.mode == "RGB" else image.convert("RGB"))
+        self.height: int = self._pixels.shape[0]
+        self.width: int = self._pixels.shape[1]
+
+    def is_area_uniform_color(self, rect: Rectangle, config: LabelConfig) -> bool:
         """
         Check if an area is mostly uniform color (indicating no content).
 
+        The area is uniform if at least `color_uniformity_threshold` of its pixels are within `color_tolerance`
+        (euclidean distance) of its average color.
+
         Args:
-            image: PIL Image to analyze
             rect: Rectangle area to analyze
             config: Label configuration
 
@@ -126,47 +141,50 @@ class ColorAnalyzer:
             True if area is mostly uniform color, False otherwise
         """
         # Clamp coordinates to image bounds
-        x1 = max(0, min(int(rect.x1), image.width - 1))
-        y1 = max(0, min(int(rect.y1), image.height - 1))
-        x2 = max(0, min(int(rect.x2), image.width))
-        y2 = max(0, min(int(rect.y2), image.height))
+        x1 = max(0, min(int(rect.x1), self.width - 1))
+        y1 = max(0, min(int(rect.y1), self.height - 1))
+        x2 = max(0, min(int(rect.x2), self.width))
+        y2 = max(0, min(int(rect.y2), self.height))
 
         if x2 <= x1 or y2 <= y1:
             return False
 
-        # Extract the region
-        region = image.crop((x1, y1, x2, y2))
+        region = self._pixels[y1:y2, x1:x2].reshape(-1, 3).astype(np.float32)
+        distances = np.square(region - region.mean(axis=0)).sum(axis=1)
+        similar_pixels = int(np.count_nonzero(distances <= config.color_tolerance**2))
+        return similar_pixels / len(region) >= config.color_uniformity_threshold
 
-        # Convert to RGB if needed
-        if region.mode != "RGB":
-            region = region.convert("RGB")
 
-        # Get pixel data
-        pixels: list[list[int]] = list(region.getdata())  # pyright: ignore [reportUnknownArgumentType, reportUnknownMemberType]
-        if not pixels:
-            return True
+class RectangleGrid:
+    """Spatial grid index of the placed labels, so that overlap checks only look at nearby labels"""
 
-        # Calculate average color
-        total_r = sum(p[0] for p in pixels)
-        total_g = sum(p[1] for p in pixels)
-        total_b = sum(p[2] for p in pixels)
-        num_pixels = len(pixels)
+    def __init__(self, cell_size: float = 64):
+        self.cell_size: float = cell_size
+        self._cells: dict[tuple[int, int], list[Rectangle]] = defaultdict(list)
+        self._rects: list[Rectangle] = []
 
-        avg_r = total_r / num_pixels
-        avg_g = total_g / num_pixels
-        avg_b = total_b / num_pixels
+    def _cells_of(self, rect: Rectangle) -> Iterator[tuple[int, int]]:
+        for cx in range(int(rect.x1 // self.cell_size), int(rect.x2 // self.cell_size) + 1):
+            for cy in range(int(rect.y1 // self.cell_size), int(rect.y2 // self.cell_size) + 1):
+                yield cx, cy
 
-        # Count pixels that are similar to average (within tolerance)
-        similar_pixels = 0
+    def add(self, rect: Rectangle) -> None:
+        self._rects.append(rect)
+        for cell in self._cells_of(rect):
+            self._cells[cell].append(rect)
 
-        for r, g, b in pixels:
-            # Calculate color distance
-            distance = ((r - avg_r) ** 2 + (g - avg_g) ** 2 + (b - avg_b) ** 2) ** 0.5
-            if distance <= config.color_tolerance:
-                similar_pixels += 1
+    def overlaps(self, rect: Rectangle) -> bool:
+        """Check if `rect` overlaps with any rectangle of the grid"""
+        # overlapping rectangles share an interior point, hence a cell
+        return any(
+            rect.overlaps(other) for cell in self._cells_of(rect) if cell in self._cells for other in self._cells[cell]
+        )
+
+    def __len__(self) -> int:
+        return len(self._rects)
 
-        uniformity = similar_pixels / num_pixels
-        return uniformity >= config.color_uniformity_threshold
+    def __iter__(self) -> Iterator[Rectangle]:
+        return iter(self._rects)
 
 
 class CoordinateTransformer:
@@ -197,14 +215,17 @@ class CoordinateTransformer:
 class LabelPlacementOptimizer:
     """Handles label placement optimization"""
 
-    def __init__(self, img_width: int, img_height: int, config: LabelConfig):
+    def __init__(self, img_width: int, img_height: int, config: LabelConfig, image: Image.Image | None = None):
         self.img_width: int = img_width
         self.img_height: int = img_height
         self.config: LabelConfig = config
-        self.color_analyzer: ColorAnalyzer = ColorAnalyzer()
+        # pass `image` before drawing on it, so that colors are analyzed on the original screenshot
+        self.color_analyzer: ColorAnalyzer | None = (
+            ColorAnalyzer(image) if image is not None and not config.skip_color_analysis else None
+        )
 
     def find_best_position(
-        self, element_rect: Rectangle, label_rect: Rectangle, placed_labels: list[Rectangle], image: Image.Image
+        self, element_rect: Rectangle, label_rect: Rectangle, placed_labels: RectangleGrid, image: Image.Image
     ) -> tuple[Rectangle, LabelPosition]:
         """Find the best position for a label"""
         candidates = self._generate_candidates(element_rect, label_rect)
@@ -229,7 +250,7 @@ class LabelPlacementOptimizer:
                 continue
 
             # Check overlap with existing labels
-            if any(rect.overlaps(existing) for existing in placed_labels):
+            if placed_labels.overlaps(rect):
                 continue
 
             # Score this position
@@ -348,8 +369,10 @@ class LabelPlacementOptimizer:
 
         # Skip expensive color analysis in fast mode
         if not self.config.skip_color_analysis:
+            if self.color_analyzer is None:
+                self.color_analyzer = ColorAnalyzer(image)
             # High score for uniform areas
-            if self.color_analyzer.is_area_uniform_color(image, label_rect, self.config):
+            if self.color_analyzer.is_area_uniform_color(label_rect, self.config):
                 score += 10
 
         # Bonus for positions that don't overlap with the highlighted element
@@ -602,10 +625,10 @@ class ScreenshotHighlighter:
         transformer = CoordinateTransformer(
             img_width, img_height, bounding_boxes[0].viewport_width, bounding_boxes[0].viewport_height
         )
-        placement_optimizer = LabelPlacementOptimizer(img_width, img_height, config)
+        placement_optimizer = LabelPlacementOptimizer(img_width, img_height, config, image=image)
         arrow_renderer = ArrowLabelRenderer(config)
 
-        placed_labels: list[Rectangle] = []
+        placed_labels = RectangleGrid()
 
         for i, bbox in enumerate(bounding_boxes):
             if bbox.notte_id is None:
@@ -641,7 +664,7 @@ class ScreenshotHighlighter:
         bbox: BoundingBox,
         color: str,
         label: str,
-        placed_labels: list[Rectangle],
+        placed_labels: RectangleGrid,
         image: Image.Image,
         transformer: CoordinateTransformer,
         placement_optimizer: LabelPlacementOptimizer,
@@ -687,7 +710,7 @@ class ScreenshotHighlighter:
         element_rect: Rectangle,
         color: str,
         label: str,
-        placed_labels: list[Rectangle],
+        placed_labels: RectangleGrid,
         image: Image.Image,
         placement_optimizer: LabelPlacementOptimizer,
         arrow_renderer: ArrowLabelRenderer,
@@ -732,4 +755,4 @@ class ScreenshotHighlighter:
         text_y = best_rect.center_y
         draw.text((text_x, text_y), label, fill="white", font=font, anchor="mm")
 
-        placed_labels.append(best_rect)
+        placed_labels.add(best_rect)
@@ -1,13 +1,20 @@
+import asyncio
 import base64
+import builtins
+import hashlib
 import io
+import json
+import threading
 from base64 import b64encode
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from io import BytesIO
 from textwrap import dedent
 from typing import Annotated, Any
 
 from PIL import Image, ImageDraw, ImageFont
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator
 from typing_extensions import override
 
 from notte_core.actions import ActionUnion
@@ -23,10 +30,47 @@ from notte_core.utils.url import clean_url
 _empty_observation_instance = None
 
 
+class ScreenshotRenderCache:
+    """LRU cache of rendered screenshots (highlighted / annotated), bounded by the total size of the cached images."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes: int = max_bytes
+        self._size: int = 0
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def set(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+SCREENSHOT_RENDER_CACHE = ScreenshotRenderCache(max_bytes=128 * 1024 * 1024)
+# PIL releases the GIL while decoding / encoding images, so threads are enough to keep rendering off the event loop
+_SCREENSHOT_RENDER_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="notte-screenshot")
+
+
 class Screenshot(BaseModel):
     raw: bytes = Field(repr=False)
     bboxes: list[BoundingBox] = Field(default_factory=list)
     last_action_id: str | None = None
+    # digest of `raw`, memoized along with the `raw` object it was computed for (`model_copy` can replace it)
+    _raw_digest: tuple[bytes, str] | None = PrivateAttr(default=None)
 
     model_config = {  # type: ignore[reportUnknownMemberType]
         "json_encoders": {
@@ -41,10 +85,32 @@ class Screenshot(BaseModel):
         return data
 
     def bytes(self, type: ScreenshotType | None = None, text: str | None = None) -> bytes:
+        type = type or ("full" if config.highlight_elements else "raw")
+        if type == "raw" and text is None:
+            return self.raw
+        key = self.render_key(type, text)
+        data = SCREENSHOT_RENDER_CACHE.get(key)
+        if data is None:
+            data = self._render(type, text)
+            if data is not self.raw:
+                SCREENSHOT_RENDER_CACHE.set(key, data)
+        return data
+
+    def render_key(self, type: ScreenshotType, text: str | None = None) -> str:
+        """Content digest of a rendering, so that equal screenshots (e.g. copies, or reloaded from disk) share it"""
+        if self._raw_digest is None or self._raw_digest[0] is not self.raw:
+            self._raw_digest = (self.raw, hashlib.sha256(self.raw).hexdigest())
+        content = json.dumps(
+            [self._raw_digest[1], [bbox.model_dump() for bbox in self.bboxes], self.last_action_id, type, text]
+        )
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    async def abytes(self, type: ScreenshotType | None = None, text: str | None = None) -> builtins.bytes:
+        """Same as `bytes`, but renders the screenshot in a worker thread to avoid blocking the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(_SCREENSHOT_RENDER_POOL, self.bytes, type, text)
+
+    def _render(self, type: ScreenshotType, text: str | None) -> builtins.bytes:
         def _bytes():
-            nonlocal type
-            type = type or ("full" if config.highlight_elements else "raw")
-            # config.highlight_elements
             match type:
                 case "raw":
                     return self.raw
@@ -1,11 +1,13 @@
+import asyncio
 import datetime as dt
 from base64 import b64encode
-from collections.abc import Sequence
+from collections.abc import Awaitable, Sequence
 from dataclasses import field
+from typing import Callable
 
 from loguru import logger
 from PIL import Image
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from notte_core.actions import InteractionAction
 from notte_core.browser.dom_tree import A11yTree, DomNode, InteractionDomNode
@@ -45,10 +47,16 @@ class SnapshotMetadata(BaseModel):
 
 class BrowserSnapshot(BaseModel):
     metadata: SnapshotMetadata
-    html_content: str
+    # None if the html content has not been fetched yet (see `ahtml_content`)
+    html_content: str | None = Field(repr=False)
     a11y_tree: A11yTree | None
     dom_node: DomNode
     screenshot: bytes = Field(repr=False)
+    _html_loader: Callable[[], Awaitable[str]] | None = PrivateAttr(default=None)
+    # concurrent `ahtml_content` calls share a single fetch
+    _html_lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+    # lazily built by `interaction_nodes`
+    _interaction_nodes: dict[str, InteractionDomNode] | None = PrivateAttr(default=None)
 
     model_config = {  # type: ignore[reportUnknownMemberType]
         "json_encoders": {
@@ -61,29 +69,54 @@ class BrowserSnapshot(BaseModel):
 
         return image_from_bytes(self.screenshot)
 
+    def with_html_loader(self, loader: Callable[[], Awaitable[str]]) -> "BrowserSnapshot":
+        """Sets the callback used to lazily fetch `html_content` the first time it is needed."""
+        self._html_loader = loader
+        return self
+
+    async def ahtml_content(self) -> str:
+        if self.html_content is None:
+            async with self._html_lock:
+                if self.html_content is None:
+                    if self._html_loader is None:
+                        raise ValueError("Snapshot has no html content and no html loader to fetch it")
+                    self.html_content = await self._html_loader()
+        return self.html_content
+
     @property
     def clean_url(self) -> str:
         return clean_url(self.metadata.url)
 
     def compare_with(self, other: "BrowserSnapshot") -> bool:
-        inodes = {node.id for node in self.dom_node.interaction_nodes()}
-        new_inodes = {node.id for node in other.dom_node.interaction_nodes()}
+        inodes = self.interaction_node_index().keys()
+        new_inodes = other.interaction_node_index().keys()
         identical = inodes == new_inodes
         if not identical:
-            logger.trace(f"Interactive nodes changed: {new_inodes.difference(inodes)}")
+            logger.trace(f"Interactive nodes changed: {new_inodes - inodes}")
         return identical
 
+    def interaction_node_index(self) -> dict[str, InteractionDomNode]:
+        """Interaction nodes keyed by id (in document order), built once per snapshot."""
+        if self._interaction_nodes is None:
+            self._interaction_nodes = {inode.id: inode for inode in self.dom_node.interaction_nodes()}
+        return self._interaction_nodes
+
     def interaction_nodes(self) -> Sequence[InteractionDomNode]:
-        return self.dom_node.interaction_nodes()
+        return list(self.interaction_node_index().values())
+
+    def interaction_node(self, node_id: str) -> InteractionDomNode | None:
+        return self.interaction_node_index().get(node_id)
 
     def with_dom_node(self, dom_node: DomNode) -> "BrowserSnapshot":
-        return BrowserSnapshot(
+        snapshot = BrowserSnapshot(
             metadata=self.metadata,
             html_content=self.html_content,
             a11y_tree=self.a11y_tree,
             dom_node=dom_node,
             screenshot=self.screenshot,
         )
+        snapshot._html_loader = self._html_loader
+        return snapshot
 
     def subgraph_without(
         self, actions: Sequence[InteractionAction], roles: set[str] | None = None
@@ -92,7 +125,7 @@ class BrowserSnapshot(BaseModel):
             subgraph = self.dom_node.subtree_without(roles)
             return self.with_dom_node(subgraph)
         id_existing_actions = set([action.id for action in actions])
-        failed_actions = {node.id for node in self.interaction_nodes() if node.id not in id_existing_actions}
+        failed_actions = self.interaction_node_index().keys() - id_existing_actions
 
         def only_failed_actions(node: DomNode) -> bool:
             return len(set(node.subtree_ids).intersection(failed_actions)) > 0
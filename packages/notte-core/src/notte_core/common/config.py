@@ -161,6 +161,10 @@ class ScrapingType(StrEnum):
 
 PerceptionType = Literal["fast", "deep"]
 
+LlmCacheType = Literal["none", "memory", "sqlite"]
+
+SettleStrategy = Literal["fixed", "quiet"]
+
 
 class RaiseCondition(StrEnum):
     """How to raise an error when the agent fails to complete a step.
@@ -187,6 +191,10 @@ class NotteConfigDict(TypedDict, total=False):
     clip_tokens: int
     use_llamux: bool
     temperature: float
+    llm_cache_type: LlmCacheType
+    llm_cache_path: str
+    llm_cache_max_entries: int
+    llm_cache_ttl_seconds: float | None
 
     # [browser]
     headless: bool
@@ -203,6 +211,9 @@ class NotteConfigDict(TypedDict, total=False):
     debug_port: int | None
     chrome_args: list[str] | None
     raise_on_session_execution_failure: bool
+    browser_pool_size: int
+    browser_pool_max_uses: int
+    browser_pool_max_browsers: int
 
     # [perception]
     perception_type: PerceptionType
@@ -210,6 +221,9 @@ class NotteConfigDict(TypedDict, total=False):
 
     # [scraping]
     scraping_type: ScrapingType
+    lazy_html_content: bool
+    scraping_chunk_tokens: int
+    scraping_max_parallel_chunks: int
 
     # [error]
     max_error_length: int
@@ -231,6 +245,7 @@ class NotteConfigDict(TypedDict, total=False):
     focus_element: int
     viewport_expansion: int
     enable_pointer_elements: bool
+    incremental_snapshot: bool
 
     # [playwright wait/timeout]
     timeout_goto_ms: int
@@ -239,6 +254,14 @@ class NotteConfigDict(TypedDict, total=False):
     wait_retry_snapshot_ms: int
     wait_short_ms: int
     empty_page_max_retry: int
+    settle_strategy: SettleStrategy
+    settle_strategy_by_action: dict[str, SettleStrategy]
+    settle_quiet_ms: int
+
+    # [trajectory]
+    trajectory_spill_to_disk: bool
+    trajectory_spill_dir: str | None
+    trajectory_keep_in_memory: int
 
     # [misc]
     enable_profiling: bool
@@ -290,6 +313,10 @@ class NotteConfig(TomlConfig):
     clip_tokens: int
     use_llamux: bool
     temperature: float
+    llm_cache_type: LlmCacheType
+    llm_cache_path: str
+    llm_cache_max_entries: int
+    llm_cache_ttl_seconds: float | None = None
 
     # [browser]
     headless: bool
@@ -306,6 +333,9 @@ class NotteConfig(TomlConfig):
     debug_port: int | None = None
     chrome_args: list[str] | None = None
     raise_on_session_execution_failure: bool
+    browser_pool_size: int
+    browser_pool_max_uses: int
+    browser_pool_max_browsers: int
 
     # [perception]
     perception_type: PerceptionType
@@ -313,6 +343,9 @@ class NotteConfig(TomlConfig):
 
     # [scraping]
     scraping_type: ScrapingType
+    lazy_html_content: bool
+    scraping_chunk_tokens: int
+    scraping_max_parallel_chunks: int
 
     # [error]
     max_error_length: int
@@ -334,6 +367,7 @@ class NotteConfig(TomlConfig):
     focus_element: int
     viewport_expansion: int
     enable_pointer_elements: bool
+    incremental_snapshot: bool
 
     # [playwright wait/timeout]
     timeout_goto_ms: int
@@ -342,6 +376,14 @@ class NotteConfig(TomlConfig):
     wait_retry_snapshot_ms: int
     wait_short_ms: int
     empty_page_max_retry: int
+    settle_strategy: SettleStrategy
+    settle_strategy_by_action: dict[str, SettleStrategy]
+    settle_quiet_ms: int
+
+    # [trajectory]
+    trajectory_spill_to_disk: bool
+    trajectory_spill_dir: str | None = None
+    trajectory_keep_in_memory: int
 
     # [misc]
     enable_profiling: bool
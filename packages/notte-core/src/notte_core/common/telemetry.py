@@ -1,9 +1,15 @@
+import atexit
 import importlib.metadata as metadata
+import inspect
 import logging
 import os
 import platform
+import queue
+import random
+import threading
 import uuid
-from functools import wraps
+from contextlib import aclosing
+from functools import cache, wraps
 from pathlib import Path
 from typing import Any, Callable, TypeVar
 
@@ -39,6 +45,10 @@ def get_cache_home() -> Path:
 
 
 DISABLE_TELEMETRY: bool = os.environ.get("DISABLE_TELEMETRY", "false").lower() == "true"
+# fraction of the tracked calls that are reported (sampled events carry the rate so that counts can be re-weighted)
+TELEMETRY_SAMPLE_RATE: float = float(os.environ.get("NOTTE_TELEMETRY_SAMPLE_RATE", "1.0"))
+# events are dropped once this many are waiting to be sent
+TELEMETRY_QUEUE_SIZE: int = int(os.environ.get("NOTTE_TELEMETRY_QUEUE_SIZE", "1000"))
 TELEMETRY_DIR = get_cache_home() / "notte"
 USER_ID_PATH = TELEMETRY_DIR / "telemetry_user_id"
 VERSION_DOWNLOAD_PATH = TELEMETRY_DIR / "download_version"
@@ -184,6 +194,7 @@ scarf_client = setup_scarf()
 INSTALLATION_ID: str = get_or_create_installation_id()
 
 
+@cache
 def get_system_info() -> dict[str, Any]:
     """Get anonymous system information."""
     return {
@@ -193,12 +204,12 @@ def get_system_info() -> dict[str, Any]:
     }
 
 
-def capture_event(event_name: str, properties: dict[str, Any] | None = None) -> None:
-    """Capture an event if telemetry is enabled."""
+def send_event(event_name: str, properties: dict[str, Any] | None = None) -> None:
+    """Send an event to posthog and scarf (blocking, called from the sender thread)."""
     # send to posthog
     if posthog_client is not None:
         try:
-            event_properties = properties or {}
+            event_properties = dict(properties or {})
             event_properties.update(get_system_info())
             event_properties.update(POSTHOG_EVENT_SETTINGS)
 
@@ -212,7 +223,7 @@ def capture_event(event_name: str, properties: dict[str, Any] | None = None) ->
     if scarf_client is not None:
         try:
             # Add package version and user_id to all events
-            properties = properties or {}
+            properties = dict(properties or {})
             properties.update(get_system_info())
             properties["event"] = event_name
             properties["installation_id"] = INSTALLATION_ID
@@ -221,23 +232,141 @@ def capture_event(event_name: str, properties: dict[str, Any] | None = None) ->
             logger.debug(f"Failed to send telemetry event {event_name}: {e}")
 
 
+class EventSender:
+    """
+    Sends telemetry events from a single background thread.
+
+    Events are dropped when the (bounded) queue is full, so that telemetry never blocks nor grows the memory of the
+    calling thread. Pending events are flushed at interpreter shutdown, for at most `shutdown_timeout` seconds.
+    """
+
+    def __init__(self, max_queue_size: int = TELEMETRY_QUEUE_SIZE, shutdown_timeout: float = 2.0) -> None:
+        self.shutdown_timeout: float = shutdown_timeout
+        self.dropped: int = 0
+        self._queue: queue.Queue[tuple[str, dict[str, Any]] | None] = queue.Queue(maxsize=max_queue_size)
+        self._thread: threading.Thread | None = None
+        self._lock: threading.Lock = threading.Lock()
+
+    def send(self, event_name: str, properties: dict[str, Any]) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="notte-telemetry", daemon=True)
+                    self._thread.start()
+                    _ = atexit.register(self.close)
+        try:
+            self._queue.put_nowait((event_name, properties))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Blocks until all events enqueued so far are sent."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=self.shutdown_timeout)
+            except queue.Full:
+                return
+            self._thread.join(timeout=self.shutdown_timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                send_event(*item)
+            except Exception as e:
+                logger.debug(f"Failed to send telemetry event: {e}")
+            finally:
+                self._queue.task_done()
+
+
+event_sender = EventSender()
+
+
+def capture_event(event_name: str, properties: dict[str, Any] | None = None) -> None:
+    """Capture an event if telemetry is enabled. The event is sent from a background thread."""
+    if posthog_client is None and scarf_client is None:
+        return
+    event_sender.send(event_name, properties or {})
+
+
+def summarize_value(value: Any, max_length: int = 100) -> Any:
+    """Cheap, json-friendly summary of an argument: objects are reduced to their type name."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return value if len(value) <= max_length else value[:max_length] + "..."
+    if isinstance(value, (list, tuple, set, frozenset, dict)):
+        return f"{type(value).__name__}[{len(value)}]"  # pyright: ignore [reportUnknownArgumentType]
+    return type(value).__name__
+
+
 def track_usage(method_name: str) -> Callable[[F], F]:
-    """Decorator to track usage of a method."""
+    """Decorator to track usage of a method (sync or async). The event is captured once the call completes."""
+
+    exclude_kwargs = set(["email", "username", "password", "mfa_secret"])
+
+    def track(args: tuple[Any, ...], kwargs: dict[str, Any], error: Exception | None = None) -> None:
+        if DISABLE_TELEMETRY or (TELEMETRY_SAMPLE_RATE < 1.0 and random.random() >= TELEMETRY_SAMPLE_RATE):
+            return
+        properties: dict[str, Any] = {
+            "input": {
+                "args": [summarize_value(arg) for arg in args],
+                "kwargs": {k: summarize_value(v) for k, v in kwargs.items() if k not in exclude_kwargs},
+            },
+            "sample_rate": TELEMETRY_SAMPLE_RATE,
+        }
+        if error is not None:
+            properties["error"] = str(error)
+        capture_event(method_name, properties=properties)
 
     def decorator(func: F) -> F:
-        exclude_kwargs = set(["email", "username", "password", "mfa_secret"])
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    track(args, kwargs, error=e)
+                    raise e
+                track(args, kwargs)
+                return result
+
+            return async_wrapper  # type: ignore
+
+        if inspect.isasyncgenfunction(func):
+
+            @wraps(func)
+            async def async_gen_wrapper(*args: Any, **kwargs: Any) -> Any:
+                error: Exception | None = None
+                try:
+                    # close the wrapped generator as soon as the consumer stops iterating
+                    async with aclosing(func(*args, **kwargs)) as generator:
+                        async for item in generator:
+                            yield item
+                except Exception as e:
+                    error = e
+                    raise e
+                finally:
+                    track(args, kwargs, error=error)
+
+            return async_gen_wrapper  # type: ignore
 
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            event_name = method_name
             try:
                 result = func(*args, **kwargs)
-                filtered_kwargs = {k: v for k, v in kwargs.items() if k not in exclude_kwargs}
-                capture_event(event_name, properties={"input": {"args": args, "kwargs": filtered_kwargs}})
-                return result
             except Exception as e:
-                capture_event(event_name, properties={"input": {"args": args, "kwargs": kwargs}, "error": str(e)})
+                track(args, kwargs, error=e)
                 raise e
+            track(args, kwargs)
+            return result
 
         return wrapper  # type: ignore
 
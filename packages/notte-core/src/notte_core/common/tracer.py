@@ -1,23 +1,159 @@
 from __future__ import annotations
 
+import atexit
 import datetime as dt
+import hashlib
 import json
 import os
+import queue
+import threading
 from pathlib import Path
-from typing import Any, ClassVar, Protocol
+from typing import Any, Callable, ClassVar, Protocol, TypeAlias, cast
 
 from litellm import AllMessageValues
+from loguru import logger
 from pydantic import BaseModel, Field
 from typing_extensions import override
 
 IS_TRACING_ENABLED = os.getenv("DISABLE_NOTTE_LLM_TRACING", "false").lower() == "false"
 LOCAL_TRACES_DIR = Path(__file__).parent.parent.parent.parent / "traces"
 TRACES_DIR = Path(os.getenv("NOTTE_TRACES_DIR", LOCAL_TRACES_DIR))
+# trace files are rotated (`file.jsonl` -> `file.1.jsonl` -> ...) once they exceed this size
+TRACES_MAX_BYTES = int(os.getenv("NOTTE_TRACES_MAX_BYTES", str(50 * 1024 * 1024)))
+TRACES_BACKUP_COUNT = int(os.getenv("NOTTE_TRACES_BACKUP_COUNT", "5"))
+# by default, base64 images are replaced by their sha256 in the llm usage traces
+TRACES_KEEP_IMAGES = os.getenv("NOTTE_TRACES_KEEP_IMAGES", "false").lower() == "true"
 
 if IS_TRACING_ENABLED:
     TRACES_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def hash_images_in_messages(messages: list[AllMessageValues]) -> list[AllMessageValues]:
+    """Replaces image urls (usually base64 screenshots) by a `sha256:<digest>` reference."""
+    hashed: list[AllMessageValues] = []
+    for message in messages:
+        content = message.get("content")  # pyright: ignore [reportUnknownVariableType, reportUnknownMemberType]
+        if isinstance(content, list):
+            blocks: list[Any] = []
+            for block in content:  # pyright: ignore [reportUnknownVariableType]
+                if isinstance(block, dict) and block.get("type") == "image_url":  # pyright: ignore [reportUnknownMemberType]
+                    image_url = block.get("image_url")  # pyright: ignore [reportUnknownMemberType, reportUnknownVariableType]
+                    url: str = image_url.get("url", "") if isinstance(image_url, dict) else str(image_url)  # pyright: ignore [reportUnknownMemberType, reportUnknownVariableType]
+                    block = {
+                        "type": "image_url",
+                        "image_url": {"url": f"sha256:{hashlib.sha256(url.encode()).hexdigest()}"},
+                    }
+                blocks.append(block)
+            message = cast(AllMessageValues, {**message, "content": blocks})
+        hashed.append(message)
+    return hashed
+
+
+RecordPreparer: TypeAlias = Callable[[dict[str, Any]], dict[str, Any]]
+
+
+class JsonlWriter:
+    """
+    Appends json records to a file from a background thread.
+
+    `write` only enqueues the record: `prepare` (e.g. image hashing), serialization and file IO happen
+    in batches on the writer thread, so that tracing never blocks the event loop.
+    Pending records are flushed at interpreter shutdown.
+    """
+
+    _writers: ClassVar[dict[Path, JsonlWriter]] = {}
+    _writers_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self,
+        file_path: Path,
+        max_bytes: int = TRACES_MAX_BYTES,
+        backup_count: int = TRACES_BACKUP_COUNT,
+        batch_size: int = 100,
+    ) -> None:
+        self.file_path: Path = file_path
+        self.max_bytes: int = max_bytes
+        self.backup_count: int = backup_count
+        self.batch_size: int = batch_size
+        self._queue: queue.Queue[tuple[dict[str, Any], RecordPreparer | None] | None] = queue.Queue()
+        self._thread: threading.Thread = threading.Thread(
+            target=self._run, name=f"notte-trace-writer-{file_path.name}", daemon=True
+        )
+        self._thread.start()
+        _ = atexit.register(self.close)
+
+    @classmethod
+    def get(cls, file_path: Path) -> JsonlWriter:
+        """Returns the writer of `file_path`, shared by all tracers writing to that file."""
+        with cls._writers_lock:
+            if file_path not in cls._writers:
+                cls._writers[file_path] = JsonlWriter(file_path)
+            return cls._writers[file_path]
+
+    def write(self, record: dict[str, Any], prepare: RecordPreparer | None = None) -> None:
+        if not self._thread.is_alive():
+            logger.debug(f"Trace writer for {self.file_path} is closed, dropping record")
+            return
+        self._queue.put((record, prepare))
+
+    def flush(self) -> None:
+        """Blocks until all records enqueued so far are written."""
+        if self._thread.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [item for item in batch if item is not None]
+            try:
+                if len(records) > 0:
+                    self._write_batch(records)
+            except Exception as e:
+                logger.debug(f"Failed to write traces to {self.file_path}: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if len(records) < len(batch):
+                # close() was called
+                return
+
+    def _write_batch(self, records: list[tuple[dict[str, Any], RecordPreparer | None]]) -> None:
+        lines = "".join(
+            json.dumps(record if prepare is None else prepare(record), default=str) + "\n"
+            for record, prepare in records
+        )
+        self._rotate_if_needed(len(lines))
+        with open(self.file_path, "a") as f:
+            _ = f.write(lines)
+
+    def _rotate_if_needed(self, incoming: int) -> None:
+        if self.max_bytes <= 0 or not self.file_path.exists():
+            return
+        if self.file_path.stat().st_size + incoming <= self.max_bytes:
+            return
+        if self.backup_count <= 0:
+            self.file_path.unlink()
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            src = self.backup_path(i)
+            if src.exists():
+                _ = src.replace(self.backup_path(i + 1))
+        _ = self.file_path.replace(self.backup_path(1))
+
+    def backup_path(self, index: int) -> Path:
+        return self.file_path.with_name(f"{self.file_path.stem}.{index}{self.file_path.suffix}")
+
+
 class Tracer(Protocol):
     """Protocol for database clients that handle LLM usage logging."""
 
@@ -133,18 +269,21 @@ class LlmUsageFileTracer(LlmTracer):
         """Log LLM usage to a file."""
         if not IS_TRACING_ENABLED:
             return
-        with open(self.file_path, "a") as f:
-            json.dump(
-                {
-                    "timestamp": timestamp,
-                    "model": model,
-                    "messages": messages,
-                    "completion": completion,
-                    "usage": usage,
-                },
-                f,
-            )
-            _ = f.write("\n")
+        JsonlWriter.get(self.file_path).write(
+            {
+                "timestamp": timestamp,
+                "model": model,
+                # copy: the message list can be extended by retries before the record is written
+                "messages": list(messages),
+                "completion": completion,
+                "usage": usage,
+            },
+            prepare=None if TRACES_KEEP_IMAGES else LlmUsageFileTracer.hash_images,
+        )
+
+    @staticmethod
+    def hash_images(record: dict[str, Any]) -> dict[str, Any]:
+        return {**record, "messages": hash_images_in_messages(record["messages"])}
 
 
 class LlmParsingErrorFileTracer(Tracer):
@@ -168,14 +307,11 @@ class LlmParsingErrorFileTracer(Tracer):
         """Log LLM parsing errors to a file."""
         if not IS_TRACING_ENABLED:
             return
-        with open(self.file_path, "a") as f:
-            json.dump(
-                LlmParsingErrorFileTracer.LLmParsingError(
-                    status=status,
-                    pipe_name=pipe_name,
-                    nb_retries=nb_retries,
-                    error_msgs=error_msgs,
-                ).model_dump(),
-                f,
-            )
-            _ = f.write("\n")
+        JsonlWriter.get(self.file_path).write(
+            LlmParsingErrorFileTracer.LLmParsingError(
+                status=status,
+                pipe_name=pipe_name,
+                nb_retries=nb_retries,
+                error_msgs=error_msgs,
+            ).model_dump()
+        )
@@ -0,0 +1,259 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from typing import Any, ClassVar
+
+from litellm import AllMessageValues, ModelResponse  # type: ignore[import]
+from loguru import logger
+from pydantic import BaseModel
+from typing_extensions import override
+
+from notte_core.common.config import config
+from notte_core.common.tracer import hash_images_in_messages
+
+
+@dataclass
+class LlmCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+def llm_cache_key(
+    model: str,
+    messages: list[AllMessageValues],
+    temperature: float,
+    response_format: dict[str, str] | type[BaseModel] | None,
+    n: int,
+) -> str:
+    """Content-addressed key of a completion request."""
+    if isinstance(response_format, type):
+        response_format_key: Any = response_format.model_json_schema()
+    else:
+        response_format_key = response_format
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": hash_images_in_messages(messages),
+            "temperature": temperature,
+            "response_format": response_format_key,
+            "n": n,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LlmCache(ABC):
+    """
+    Completion cache sitting in front of `LLMEngine.completion`.
+
+    Entries older than `ttl_seconds` are ignored (and dropped) and at most `max_entries`
+    entries are kept, evicting the least recently used ones first.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float | None = None) -> None:
+        self.max_entries: int = max_entries
+        self.ttl_seconds: float | None = ttl_seconds
+        self.stats: LlmCacheStats = LlmCacheStats()
+        self._lock: threading.Lock = threading.Lock()
+
+    def is_expired(self, created_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> ModelResponse | None:
+        with self._lock:
+            response = self._get(key)
+            if response is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+            return response
+
+    def set(self, key: str, response: ModelResponse) -> None:
+        with self._lock:
+            self.stats.evictions += self._set(key, response)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._delete(key)
+
+    @abstractmethod
+    def _get(self, key: str) -> ModelResponse | None:
+        pass
+
+    @abstractmethod
+    def _set(self, key: str, response: ModelResponse) -> int:
+        """Stores the response and returns the number of evicted entries."""
+        pass
+
+    @abstractmethod
+    def _delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+
+class InMemoryLlmCache(LlmCache):
+    def __init__(self, max_entries: int, ttl_seconds: float | None = None) -> None:
+        super().__init__(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._entries: OrderedDict[str, tuple[float, ModelResponse]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @override
+    def _get(self, key: str) -> ModelResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created_at, response = entry
+        if self.is_expired(created_at):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    @override
+    def _set(self, key: str, response: ModelResponse) -> int:
+        self._entries[key] = (time.time(), response)
+        self._entries.move_to_end(key)
+        evicted = 0
+        while len(self._entries) > self.max_entries:
+            _ = self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    @override
+    def _delete(self, key: str) -> None:
+        _ = self._entries.pop(key, None)
+
+    @override
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SqliteLlmCache(LlmCache):
+    # number of cache hits whose access time is buffered before being written to the database
+    ACCESS_FLUSH_BATCH: ClassVar[int] = 64
+
+    def __init__(self, path: str | Path, max_entries: int, ttl_seconds: float | None = None) -> None:
+        super().__init__(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.path: Path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn: sqlite3.Connection = sqlite3.connect(self.path, check_same_thread=False)
+        _ = self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL
+            )
+            """
+        )
+        _ = self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed_at ON llm_cache (accessed_at)")
+        self._conn.commit()
+        # hits only record their access time in memory, written to the database along with the next write
+        self._pending_accesses: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._flush_accesses()
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            return int(count)
+
+    @override
+    def _get(self, key: str) -> ModelResponse | None:
+        row = self._conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        raw, created_at = row
+        if self.is_expired(created_at):
+            _ = self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+        try:
+            response = ModelResponse(**json.loads(raw))
+        except Exception as e:
+            logger.debug(f"Dropping invalid llm cache entry: {e}")
+            _ = self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+        self._pending_accesses[key] = time.time()
+        if len(self._pending_accesses) >= self.ACCESS_FLUSH_BATCH:
+            self._flush_accesses()
+            self._conn.commit()
+        return response
+
+    def _flush_accesses(self) -> None:
+        if len(self._pending_accesses) == 0:
+            return
+        _ = self._conn.executemany(
+            "UPDATE llm_cache SET accessed_at = ? WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in self._pending_accesses.items()],
+        )
+        self._pending_accesses.clear()
+
+    @override
+    def _set(self, key: str, response: ModelResponse) -> int:
+        now = time.time()
+        _ = self._pending_accesses.pop(key, None)
+        self._flush_accesses()
+        _ = self._conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, response.model_dump_json(), now, now),
+        )
+        evicted = 0
+        if self.ttl_seconds is not None:
+            evicted += self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+            ).rowcount
+        evicted += self._conn.execute(
+            "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY accessed_at DESC, rowid DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        ).rowcount
+        self._conn.commit()
+        return evicted
+
+    @override
+    def _delete(self, key: str) -> None:
+        _ = self._pending_accesses.pop(key, None)
+        _ = self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+        self._conn.commit()
+
+    @override
+    def clear(self) -> None:
+        with self._lock:
+            self._pending_accesses.clear()
+            _ = self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+
+@cache
+def default_llm_cache() -> LlmCache | None:
+    """Process-wide cache configured by the `llm_cache_*` settings (None if disabled)."""
+    match config.llm_cache_type:
+        case "none":
+            return None
+        case "memory":
+            return InMemoryLlmCache(max_entries=config.llm_cache_max_entries, ttl_seconds=config.llm_cache_ttl_seconds)
+        case "sqlite":
+            return SqliteLlmCache(
+                path=config.llm_cache_path,
+                max_entries=config.llm_cache_max_entries,
+                ttl_seconds=config.llm_cache_ttl_seconds,
+            )
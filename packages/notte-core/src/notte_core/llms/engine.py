@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
+from functools import cache
 from typing import cast
 
 import litellm
@@ -38,11 +39,18 @@ from notte_core.errors.provider import (
     ModelNotFoundError,
 )
 from notte_core.errors.provider import RateLimitError as NotteRateLimitError
+from notte_core.llms.cache import LlmCache, default_llm_cache, llm_cache_key
 from notte_core.llms.logging import trace_llm_usage
 from notte_core.llms.types import TResponseFormat
 from notte_core.profiling import profiler
 
 
+@cache
+def default_llm_tracer() -> LlmTracer:
+    """Tracer shared by all engines created without an explicit tracer."""
+    return LlmUsageFileTracer()
+
+
 class LLMEngine:
     PREFIXES: list[str] = ['{"json":', '{"additionalProperties":']  # LLM Response Prefixes
 
@@ -52,15 +60,18 @@ class LLMEngine:
         tracer: LlmTracer | None = None,
         nb_retries_structured_output: int = config.nb_retries_structured_output,
         verbose: bool = False,
+        cache: LlmCache | None = None,
     ):
         self.model: str = model or LlmModel.default()
+        self.cache: LlmCache | None = cache if cache is not None else default_llm_cache()
         self.sc: StructuredContent = StructuredContent(inner_tag="json", fail_if_inner_tag=False)
 
         if tracer is None:
-            tracer = LlmUsageFileTracer()
+            tracer = default_llm_tracer()
 
         self.tracer: LlmTracer = tracer
-        self.completion = trace_llm_usage(tracer=self.tracer)(self.completion)  # pyright: ignore [reportAttributeAccessIssue]
+        # only the calls reaching the provider are traced: cache hits are not billed
+        self._provider_completion = trace_llm_usage(tracer=self.tracer)(self._provider_completion)  # pyright: ignore [reportAttributeAccessIssue]
         self.nb_retries_structured_output: int = nb_retries_structured_output
         self.verbose: bool = verbose
 
@@ -115,6 +126,7 @@ class LLMEngine:
             elif content.startswith(LLMEngine.PREFIXES[1]):
                 content = content[len(LLMEngine.PREFIXES[1]) : -1].strip()
             elif not content.startswith("{") or not content.endswith("}"):
+                self._evict_cached_completion(messages, model, litellm_response_format)
                 messages.append(
                     ChatCompletionUserMessage(
                         role="user",
@@ -125,6 +137,7 @@ class LLMEngine:
             try:
                 return response_format.model_validate_json(content)
             except ValidationError as e:
+                self._evict_cached_completion(messages, model, litellm_response_format)
                 messages.append(
                     ChatCompletionUserMessage(
                         role="user",
@@ -141,6 +154,16 @@ class LLMEngine:
         )
         raise LLMParsingError(error_string) from raised_exc
 
+    def _evict_cached_completion(
+        self,
+        messages: list[AllMessageValues],
+        model: str | None,
+        response_format: dict[str, str] | type[BaseModel] | None,
+    ) -> None:
+        """Drops the cached response of a `single_completion` call that could not be parsed, so it is not replayed"""
+        if self.cache is not None:
+            self.cache.delete(llm_cache_key(model or self.model, messages, config.temperature, response_format, 1))
+
     @profiler.profiled()
     async def single_completion(
         self,
@@ -169,6 +192,27 @@ class LLMEngine:
         n: int = 1,
     ) -> ModelResponse:
         model = model or self.model
+        cache_key: str | None = None
+        if self.cache is not None:
+            cache_key = llm_cache_key(model, messages, temperature, response_format, n)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                if self.verbose:
+                    logger.trace(f"LLM cache hit for model {model} (hit rate: {self.cache.stats.hit_rate:.0%})")
+                return cached
+        response = await self._provider_completion(messages, model, temperature, response_format, n)
+        if self.cache is not None and cache_key is not None:
+            self.cache.set(cache_key, response)
+        return response
+
+    async def _provider_completion(
+        self,
+        messages: list[AllMessageValues],
+        model: str,
+        temperature: float,
+        response_format: dict[str, str] | type[BaseModel] | None,
+        n: int,
+    ) -> ModelResponse:
         try:
             response = await litellm.acompletion(  # pyright: ignore [reportUnknownMemberType]
                 model,
@@ -180,8 +224,7 @@ class LLMEngine:
                 drop_params=True,
             )
             # Cast to ModelResponse since we know it's not streaming in this case
-            return cast(ModelResponse, response)
-
+            response = cast(ModelResponse, response)
         except NotFoundError as e:
             raise ModelNotFoundError(model) from e
         except RateLimitError:
@@ -236,6 +279,7 @@ class LLMEngine:
                 should_retry_later=True,
                 agent_message=None,
             ) from e
+        return response
 
 
 @dataclass
@@ -1,6 +1,6 @@
 import inspect
 import typing
-from collections.abc import Coroutine
+from collections.abc import Coroutine, Sequence
 from datetime import datetime
 from functools import wraps
 from typing import TYPE_CHECKING, Any, Callable, TypeAlias
@@ -31,18 +31,13 @@ def strip_images_from_llm_conversation(conversation: list[AllMessageValues]) ->
     return stripped
 
 
-def recover_args(func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]) -> dict[str, Any]:
-    sig = inspect.signature(func)
-    params = list(sig.parameters.keys())
+def map_args(params: Sequence[str], args: tuple[Any, ...], kwargs: dict[str, Any]) -> dict[str, Any]:
+    # Map positional args to parameter names and combine with kwargs
+    return {**dict(zip(params, args)), **kwargs}
 
-    # Map positional args to parameter names
-    named_args = {}
-    for param_name, arg_value in zip(params, args):
-        named_args[param_name] = arg_value
 
-    # Combine with kwargs
-    all_params: dict[str, Any] = {**named_args, **kwargs}
-    return all_params
+def recover_args(func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]) -> dict[str, Any]:
+    return map_args(list(inspect.signature(func).parameters.keys()), args, kwargs)
 
 
 ModelResponseCoroutine: TypeAlias = Coroutine[Any, Any, ModelResponse]
@@ -52,6 +47,9 @@ def trace_llm_usage(
     tracer: LlmTracer | None = None,
 ) -> Callable[[Callable[..., ModelResponseCoroutine]], Callable[..., ModelResponseCoroutine]]:
     def decorator(func: Callable[..., ModelResponseCoroutine]) -> Callable[..., ModelResponseCoroutine]:
+        # resolved once at decoration time: the wrapper is on the hot path of every llm call
+        params = list(inspect.signature(func).parameters.keys())
+
         @wraps(func)
         async def wrapper(
             *args: Any,
@@ -59,7 +57,7 @@ def trace_llm_usage(
         ) -> ModelResponse:
             # Call the original function
 
-            recovered_args = recover_args(func, args, kwargs)
+            recovered_args = map_args(params, args, kwargs)
             model = typing.cast(str, recovered_args.get("model"))
 
             messages = typing.cast(list[Any], recovered_args.get("messages"))
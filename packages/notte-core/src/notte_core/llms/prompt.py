@@ -1,59 +1,94 @@
+from dataclasses import dataclass
 from pathlib import Path
 
 import chevron
+from chevron.tokenizer import tokenize
 from litellm import Message
 
 from notte_core.errors.llm import InvalidPromptTemplateError
 
+VALID_ROLES = ["assistant", "user", "system", "tool", "function"]
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    role: str
+    content: str
+    # chevron tokens of `content`, so that rendering does not re-parse the template
+    tokens: list[tuple[str, str]]
+    path: Path
+    mtime: float
+
 
 class PromptLibrary:
-    def __init__(self, prompts_dir: str | Path) -> None:
+    """
+    Prompt templates, loaded from disk and compiled the first time they are used.
+
+    If `reload` is set (dev mode), templates are reloaded whenever one of their files changes.
+    """
+
+    def __init__(self, prompts_dir: str | Path, reload: bool = False) -> None:
         self.prompts_dir: Path = Path(prompts_dir)
         if not self.prompts_dir.exists():
             raise NotADirectoryError(f"Prompts directory not found: {prompts_dir}")
+        self.reload: bool = reload
+        self._compiled: dict[str, list[CompiledPrompt]] = {}
 
-    def get(self, prompt_id: str) -> list[Message]:
+    def compile(self, prompt_id: str) -> list[CompiledPrompt]:
         prompt_path: Path = self.prompts_dir / prompt_id
         prompt_files: list[Path] = list(prompt_path.glob("*.md"))
         if len(prompt_files) == 0:
             raise FileNotFoundError(f"Prompt template not found: {prompt_id}")
-        messages: list[Message] = []
+        compiled: list[CompiledPrompt] = []
         for prompt_file in prompt_files:
+            role: str = prompt_file.name.split(".")[0]
+            if role not in VALID_ROLES:
+                raise InvalidPromptTemplateError(
+                    prompt_id=prompt_id,
+                    message=f"invalid role: {role} in prompt template. Valid roles are: {', '.join(VALID_ROLES)}",
+                )
+            mtime = prompt_file.stat().st_mtime
             with open(prompt_file, "r") as file:
                 content: str = file.read()
-                role: str = prompt_file.name.split(".")[0]
-                if role not in ["assistant", "user", "system", "tool", "function"]:
-                    raise InvalidPromptTemplateError(
-                        prompt_id=prompt_id,
-                        message=(
-                            f"invalid role: {role} in prompt template. "
-                            "Valid roles are: assistant, user, system, tool, function"
-                        ),
-                    )
-                messages.append(Message(role=role, content=content))  # type: ignore
-        return messages
+            try:
+                tokens = list(tokenize(content))
+            except Exception as e:
+                raise InvalidPromptTemplateError(
+                    prompt_id=prompt_id,
+                    message=f"Error parsing prompt template {prompt_file.name}: {str(e)}",
+                ) from e
+            compiled.append(CompiledPrompt(role=role, content=content, tokens=tokens, path=prompt_file, mtime=mtime))
+        return compiled
+
+    def _is_stale(self, compiled: list[CompiledPrompt]) -> bool:
+        try:
+            return any(prompt.path.stat().st_mtime != prompt.mtime for prompt in compiled)
+        except FileNotFoundError:
+            return True
+
+    def get_compiled(self, prompt_id: str) -> list[CompiledPrompt]:
+        compiled = self._compiled.get(prompt_id)
+        if compiled is None or (self.reload and self._is_stale(compiled)):
+            compiled = self.compile(prompt_id)
+            self._compiled[prompt_id] = compiled
+        return compiled
+
+    def get(self, prompt_id: str) -> list[Message]:
+        return [Message(role=prompt.role, content=prompt.content) for prompt in self.get_compiled(prompt_id)]  # type: ignore
 
     def materialize(self, prompt_id: str, variables: dict[str, str] | None = None) -> list[dict[str, str]]:
         # TODO. You cant pass variables that are not in the prompt template
         # But you can fewer variables than in the prompt template
-        _messages: list[Message] = self.get(prompt_id)
-        messages: list[dict[str, str]] = []
-        for message in _messages:
-            if message.content is None:
-                raise InvalidPromptTemplateError(
-                    prompt_id=prompt_id,
-                    message=f"Message content is none: {message.role}",
-                )
-            messages.append({"role": message.role, "content": message.content})
+        compiled: list[CompiledPrompt] = self.get_compiled(prompt_id)
 
         if variables is None:
-            return messages
+            return [{"role": prompt.role, "content": prompt.content} for prompt in compiled]
 
         try:
             materialized_messages: list[dict[str, str]] = []
-            for message in messages:
-                formatted_content: str = chevron.render(message["content"], variables, warn=True)
-                materialized_messages.append({"role": message["role"], "content": formatted_content})
+            for prompt in compiled:
+                formatted_content: str = chevron.render(prompt.tokens, variables, warn=True)  # pyright: ignore [reportArgumentType]
+                materialized_messages.append({"role": prompt.role, "content": formatted_content})
             return materialized_messages
         except KeyError as e:
             raise InvalidPromptTemplateError(
@@ -14,6 +14,8 @@ from notte_core.llms.prompt import PromptLibrary
 from notte_core.llms.types import TResponseFormat
 
 PROMPT_DIR = Path(__file__).parent.parent / "llms" / "prompts"
+# dev mode: reload prompt templates when they are edited on disk
+RELOAD_PROMPTS = os.getenv("NOTTE_RELOAD_PROMPTS", "false").lower() == "true"
 LLAMUX_CONFIG = Path(__file__).parent.parent / "llms" / "config" / "endpoints.csv"
 
 
@@ -33,7 +35,7 @@ class LLMService:
     """
 
     def __init__(self, base_model: str | None = None) -> None:
-        self.lib: PromptLibrary = PromptLibrary(str(PROMPT_DIR))
+        self.lib: PromptLibrary = PromptLibrary(str(PROMPT_DIR), reload=RELOAD_PROMPTS)
         self.router: Router | None = None
 
         if config.use_llamux:
@@ -46,6 +48,9 @@ class LLMService:
         self.tokenizer: tiktoken.Encoding = tiktoken.get_encoding("cl100k_base")
         self.verbose: bool = config.verbose
         self.nb_retries_structured_output: int = config.nb_retries_structured_output
+        self.engine: LLMEngine = LLMEngine(
+            nb_retries_structured_output=self.nb_retries_structured_output, verbose=self.verbose
+        )
 
     @staticmethod
     def from_config(perception_type: PerceptionType = config.perception_type) -> "LLMService":
@@ -105,9 +110,7 @@ class LLMService:
     ) -> TResponseFormat:
         messages = self.lib.materialize(prompt_id, variables)
         base_model, _ = self.get_base_model(messages)
-        return await LLMEngine(
-            nb_retries_structured_output=self.nb_retries_structured_output, verbose=self.verbose
-        ).structured_completion(
+        return await self.engine.structured_completion(
             messages=messages,  # type: ignore[arg-type]
             response_format=response_format,
             model=base_model,
@@ -121,7 +124,7 @@ class LLMService:
     ) -> ModelResponse:
         messages = self.lib.materialize(prompt_id, variables)
         base_model, eid = self.get_base_model(messages)
-        response = await LLMEngine(verbose=self.verbose).completion(
+        response = await self.engine.completion(
             messages=messages,  # type: ignore[arg-type]
             model=base_model,
         )
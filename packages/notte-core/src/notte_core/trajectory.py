@@ -1,7 +1,19 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import heapq
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import weakref
+from bisect import bisect_left, bisect_right
+from collections import deque
 from collections.abc import Awaitable, Iterator
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Callable, Literal, TypeAlias, overload
 
 from loguru import logger
@@ -9,19 +21,106 @@ from typing_extensions import override
 
 from notte_core.agent_types import AgentCompletion
 from notte_core.browser.observation import ExecutionResult, Observation, Screenshot
+from notte_core.common.config import config
 from notte_core.profiling import profiler
 
 TrajectoryHoldee = ExecutionResult | Observation | AgentCompletion | Screenshot
 StepId: TypeAlias = int
+ElementLiteral: TypeAlias = Literal["observation", "execution_result", "agent_completion", "screenshot"]
+
+ELEMENT_TYPES: dict[ElementLiteral, type[TrajectoryHoldee]] = {
+    "observation": Observation,
+    "execution_result": ExecutionResult,
+    "agent_completion": AgentCompletion,
+    "screenshot": Screenshot,
+}
+# elements holding screenshots, which can be spilled to a `TrajectoryStore`
+SPILLABLE_ELEMENTS: set[ElementLiteral] = {"observation", "screenshot"}
+
+
+class TrajectoryStore:
+    """Content-addressed store of the trajectory elements spilled to disk.
+
+    Elements are pickled into a temporary sqlite database, which is deleted when the store is closed or garbage collected.
+    """
+
+    def __init__(self, directory: str | Path | None = None) -> None:
+        if directory is not None:
+            Path(directory).expanduser().mkdir(parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix="notte-trajectory-", suffix=".sqlite", dir=directory)
+        os.close(fd)
+        self.path: Path = Path(path)
+        self._lock: threading.Lock = threading.Lock()
+        self._conn: sqlite3.Connection = sqlite3.connect(self.path, check_same_thread=False)
+        # scratch database: no need for durability
+        _ = self._conn.execute("PRAGMA journal_mode = OFF")
+        _ = self._conn.execute("PRAGMA synchronous = OFF")
+        _ = self._conn.execute("CREATE TABLE IF NOT EXISTS elements (key TEXT PRIMARY KEY, data BLOB NOT NULL)")
+        self._finalizer: weakref.finalize[..., TrajectoryStore] = weakref.finalize(
+            self, TrajectoryStore._cleanup, self._conn, self.path
+        )
+
+    @staticmethod
+    def _cleanup(conn: sqlite3.Connection, path: Path) -> None:
+        conn.close()
+        path.unlink(missing_ok=True)
+
+    def put(self, element: TrajectoryHoldee) -> str:
+        data = pickle.dumps(element, protocol=pickle.HIGHEST_PROTOCOL)
+        key = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            _ = self._conn.execute("INSERT OR IGNORE INTO elements (key, data) VALUES (?, ?)", (key, data))
+            self._conn.commit()
+        return key
+
+    def get(self, key: str) -> TrajectoryHoldee:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM elements WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(f"Trajectory element {key} not found in {self.path}")
+        return pickle.loads(row[0])
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM elements").fetchone()
+            return int(count)
+
+    def close(self) -> None:
+        _ = self._finalizer()
 
 
 class TrajectoryElement:
     def __init__(self, elem: TrajectoryHoldee, step_id: StepId | None = None):
-        self.inner: TrajectoryHoldee = elem
+        self._inner: TrajectoryHoldee | None = elem
+        self._store: TrajectoryStore | None = None
+        self._key: str | None = None
+        self.kind: ElementLiteral = StepBundle.get_element_key(elem)
         self.step_id: StepId | None = step_id
 
+    @property
+    def inner(self) -> TrajectoryHoldee:
+        inner = self._inner  # read once: the element can be spilled concurrently (from a worker thread)
+        if inner is not None:
+            return inner
+        # spilled: load a fresh copy from the store
+        assert self._store is not None and self._key is not None
+        return self._store.get(self._key)
 
-ElementLiteral: TypeAlias = Literal["observation", "execution_result", "agent_completion", "screenshot"]
+    @property
+    def spilled(self) -> bool:
+        return self._inner is None
+
+    def is_a(self, element_type: type[TrajectoryHoldee]) -> bool:
+        """`isinstance(self.inner, element_type)`, without loading spilled elements"""
+        return issubclass(ELEMENT_TYPES[self.kind], element_type)
+
+    def spill(self, store: TrajectoryStore) -> None:
+        """Moves the element to `store`, it is loaded back on access"""
+        if self._inner is None:
+            return
+        self._key = store.put(self._inner)
+        self._store = store
+        self._inner = None
 
 
 @dataclass
@@ -53,13 +152,35 @@ class Trajectory:
     The trajectory helps you iterate on all kinds of elements, either by type, or by step
     """
 
-    def __init__(self, elements: list[TrajectoryElement] | None = None):
+    def __init__(
+        self,
+        elements: list[TrajectoryElement] | None = None,
+        store: TrajectoryStore | None = None,
+        keep_in_memory: int = config.trajectory_keep_in_memory,
+    ):
+        # the latest observation has to stay in memory: agents check its identity (e.g. `Observation.empty()`)
+        if keep_in_memory < 1:
+            raise ValueError(f"keep_in_memory should be at least 1, got {keep_in_memory}")
         if elements is None:
             elements = []
+            if store is None and config.trajectory_spill_to_disk:
+                store = TrajectoryStore(config.trajectory_spill_dir)
+
+        # if set, observations and screenshots are spilled to the store, except the `keep_in_memory` most recent ones
+        # of each kind (so that the latest observation is never spilled, whatever is appended after it)
+        self.store: TrajectoryStore | None = store
+        self.keep_in_memory: int = keep_in_memory
+        self._in_memory: dict[ElementLiteral, deque[TrajectoryElement]] = {kind: deque() for kind in SPILLABLE_ELEMENTS}
 
         self._step_starts: dict[StepId, int] = {}  # start steps
         self.__current_step: list[StepId | None] = [None]  # only a list because it needs to be a pointer
         self._elements: list[TrajectoryElement] = elements  # underlying elements
+        # indexes (positions in `_elements`), maintained on append and shared with the views
+        self._kind_indices: dict[ElementLiteral, list[int]] = {kind: [] for kind in ELEMENT_TYPES}
+        self._step_indices: dict[StepId, list[int]] = {}
+        self._step_start_positions: list[int] = []  # `_step_starts` values, in step order
+        for index, element in enumerate(elements):
+            self._index_element(index, element)
         self._slice: slice | None = None  # note if main, slice of the elements list if a view
         self.main_trajectory: Trajectory | None = None  # none if main, point to the main trajectory if a view
         self.callbacks: dict[
@@ -74,10 +195,39 @@ class Trajectory:
         else:
             self._slice = slice(self._slice.start, len(self._elements), self._slice.step)
 
+    def _bounds(self) -> tuple[int, int]:
+        """Start and stop positions of the view in `_elements`"""
+        if self._slice is None:
+            return 0, len(self._elements)
+        start, stop, _ = self._slice.indices(len(self._elements))
+        return start, stop
+
+    def _index_element(self, index: int, element: TrajectoryElement) -> None:
+        self._kind_indices[element.kind].append(index)
+        if element.step_id is not None:
+            self._step_indices.setdefault(element.step_id, []).append(index)
+
+    def _in_view(self, indices: list[int]) -> list[int]:
+        """Positions of `indices` (sorted) that are in the view"""
+        start, stop = self._bounds()
+        return indices[bisect_left(indices, start) : bisect_left(indices, stop)]
+
+    def _kinds(self, element_type: type[TrajectoryHoldee]) -> list[ElementLiteral]:
+        return [kind for kind, kind_type in ELEMENT_TYPES.items() if issubclass(kind_type, element_type)]
+
+    def _step_range(self) -> tuple[int, int]:
+        """Range of the steps (in step order) starting in the view"""
+        positions = self._step_start_positions
+        if self._slice is None:
+            return 0, len(positions)
+        start, stop = self._bounds()
+        return bisect_left(positions, start), bisect_left(positions, stop)
+
     @property
     def num_steps(self) -> int:
         """Counts the number of committed steps"""
-        return sum(1 for _ in self.step_starts) - (1 if self.in_step else 0)
+        first, last = self._step_range()
+        return last - first - (1 if self.in_step else 0)
 
     @property
     def in_step(self) -> bool:
@@ -96,21 +246,18 @@ class Trajectory:
         if self._slice is None:
             return self._step_starts
 
-        current_start, current_stop, _ = self._slice.indices(len(self._elements))
-        return {
-            step_id: start
-            for step_id, start in self._step_starts.items()
-            if start >= current_start and start < current_stop
-        }
+        # steps are numbered in order: the i-th step has id i
+        first, last = self._step_range()
+        return {step_id: self._step_start_positions[step_id] for step_id in range(first, last)}
 
     async def start_step(self) -> StepId:
         if self.in_step:
             raise ValueError(f"Currently in step {self._current_step}, stop it before starting a new step")
 
-        last_step_id = max(self._step_starts.keys(), default=-1)
-        next_step_id = last_step_id + 1
+        next_step_id = len(self._step_start_positions)
 
         self._step_starts[next_step_id] = len(self._elements)
+        self._step_start_positions.append(len(self._elements))
         self._current_step = next_step_id
         return self._current_step
 
@@ -130,22 +277,20 @@ class Trajectory:
         return tmp
 
     def _get_by_step(self, step_id: StepId, raise_if_multiple: bool = False) -> StepBundle:
-        if step_id not in self.step_starts:
+        first, last = self._step_range()
+        if step_id not in self._step_starts or not first <= step_id < last:
             raise ValueError(f"Invalid step id {step_id}")
 
-        step_start = self.step_starts[step_id]
         per_type_dict: dict[str, TrajectoryHoldee] = {}
 
-        for elem in self._elements[step_start:]:
-            if elem.step_id == step_id:
-                key = StepBundle.get_element_key(elem.inner)
+        for index in self._step_indices.get(step_id, []):
+            elem = self._elements[index]
+            key = elem.kind
 
-                if key in per_type_dict and raise_if_multiple:
-                    raise ValueError(
-                        f"Multiple items in trajectory match {key} for step {step_id}: '{per_type_dict[key]}'"
-                    )
-                else:
-                    per_type_dict[key] = elem.inner
+            if key in per_type_dict and raise_if_multiple:
+                raise ValueError(f"Multiple items in trajectory match {key} for step {step_id}: '{per_type_dict[key]}'")
+            else:
+                per_type_dict[key] = elem.inner
 
         return StepBundle(**per_type_dict)  # pyright: ignore [reportArgumentType]
 
@@ -177,10 +322,15 @@ class Trajectory:
         return iter(self.elements)
 
     def __getitem__(self, index: int) -> TrajectoryHoldee:
-        return self.inner_elements[index].inner
+        start, stop = self._bounds()
+        position = index + stop if index < 0 else index + start
+        if not start <= position < stop:
+            raise IndexError("trajectory index out of range")
+        return self._elements[position].inner
 
     def __len__(self) -> int:
-        return len(self.inner_elements)
+        start, stop = self._bounds()
+        return stop - start
 
     @overload
     def set_callback(
@@ -252,7 +402,21 @@ class Trajectory:
                         logger.trace(f"Running {cb_key} callback")
                         await callback(element)
 
-            self._elements.append(TrajectoryElement(element, self._current_step))
+            inner_element = TrajectoryElement(element, self._current_step)
+            self._elements.append(inner_element)
+            self._index_element(len(self._elements) - 1, inner_element)
+            if self.store is not None and inner_element.kind in SPILLABLE_ELEMENTS:
+                in_memory = self._in_memory[inner_element.kind]
+                in_memory.append(inner_element)
+                to_spill = [in_memory.popleft() for _ in range(len(in_memory) - self.keep_in_memory)]
+                if len(to_spill) > 0:
+                    # pickling and writing to the store happen in a worker thread, off the event loop
+                    await asyncio.to_thread(self._spill, to_spill, self.store)
+
+    @staticmethod
+    def _spill(elements: list[TrajectoryElement], store: TrajectoryStore) -> None:
+        for element in elements:
+            element.spill(store)
 
     @overload
     def filter_by_type(self, element_type: type[Observation]) -> Iterator[Observation]: ...
@@ -267,48 +431,49 @@ class Trajectory:
     def filter_by_type(self, element_type: type[AgentCompletion]) -> Iterator[AgentCompletion]: ...
 
     def filter_by_type(self, element_type: type[TrajectoryHoldee]) -> Iterator[TrajectoryHoldee]:
-        return (step for step in self.elements if isinstance(step, element_type))
+        return (self._elements[index].inner for index in self._kinds_indices(self._kinds(element_type)))
+
+    def _kinds_indices(self, kinds: list[ElementLiteral]) -> Iterator[int]:
+        """Positions of the elements of the given kinds in the view, in order"""
+        indices = [self._in_view(self._kind_indices[kind]) for kind in kinds]
+        return iter(indices[0]) if len(indices) == 1 else iter(heapq.merge(*indices))
 
     def screenshots(self) -> Iterator[Screenshot]:
         return self.filter_by_type(Screenshot)
 
-    def _get_next_action_id(self, elements_list: list[TrajectoryHoldee], current_index: int) -> str | None:
-        """Get the action ID from the next ExecutionResult after the current index."""
-        for j in range(current_index + 1, len(elements_list)):
-            next_step = elements_list[j]
-            if isinstance(next_step, ExecutionResult):
-                if hasattr(next_step.action, "id"):
-                    return getattr(next_step.action, "id")
-                break
+    def _get_next_action_id(self, index: int) -> str | None:
+        """Get the action ID from the next ExecutionResult (in the view) after the element at position `index`."""
+        results = self._kind_indices["execution_result"]
+        next_index = bisect_right(results, index)
+        if next_index < len(results) and results[next_index] < self._bounds()[1]:
+            next_step: ExecutionResult = self._elements[results[next_index]].inner  # pyright: ignore [reportAssignmentType]
+            if hasattr(next_step.action, "id"):
+                return getattr(next_step.action, "id")
         return None
 
     def all_screenshots(self) -> Iterator[Screenshot]:
-        # Convert elements to list to allow lookahead
-        elements_list = list(self.elements)
-
-        for i, step in enumerate(elements_list):
-            if isinstance(step, Observation):
-                next_action_id = self._get_next_action_id(elements_list, i)
+        for index in self._kinds_indices(["observation", "screenshot"]):
+            element = self._elements[index]
+            if element.kind == "observation":
+                step: Observation = element.inner  # pyright: ignore [reportAssignmentType]
+                next_action_id = self._get_next_action_id(index)
 
                 # Create a new screenshot with the action ID of the following ExecutionResult
                 screenshot = step.screenshot
                 new_screenshot = Screenshot(raw=screenshot.raw, bboxes=screenshot.bboxes, last_action_id=next_action_id)
                 yield new_screenshot
-            elif isinstance(step, Screenshot):
-                yield step
+            else:
+                yield element.inner  # pyright: ignore [reportReturnType]
 
     def observations(self) -> Iterator[Observation]:
-        # Convert elements to list to allow lookahead
-        elements_list = list(self.elements)
-
-        for i, step in enumerate(elements_list):
-            if isinstance(step, Observation):
-                next_action_id = self._get_next_action_id(elements_list, i)
+        for index in self._kinds_indices(["observation"]):
+            step: Observation = self._elements[index].inner  # pyright: ignore [reportAssignmentType]
+            next_action_id = self._get_next_action_id(index)
 
-                # Create a new screenshot with the action ID of the following ExecutionResult
-                screenshot = step.screenshot
-                new_screenshot = Screenshot(raw=screenshot.raw, bboxes=screenshot.bboxes, last_action_id=next_action_id)
-                yield step.model_copy(update={"screenshot": new_screenshot})
+            # Create a new screenshot with the action ID of the following ExecutionResult
+            screenshot = step.screenshot
+            new_screenshot = Screenshot(raw=screenshot.raw, bboxes=screenshot.bboxes, last_action_id=next_action_id)
+            yield step.model_copy(update={"screenshot": new_screenshot})
 
     def execution_results(self) -> Iterator[ExecutionResult]:
         return self.filter_by_type(ExecutionResult)
@@ -329,10 +494,14 @@ class Trajectory:
     def last_element(self, element_type: type[AgentCompletion]) -> AgentCompletion | None: ...
 
     def last_element(self, element_type: type[TrajectoryHoldee]) -> TrajectoryHoldee | None:
-        for step in reversed(self.inner_elements):
-            if isinstance(step.inner, element_type):
-                return step.inner
-        return None
+        start, stop = self._bounds()
+        last = -1
+        for kind in self._kinds(element_type):
+            indices = self._kind_indices[kind]
+            position = bisect_left(indices, stop) - 1
+            if position >= 0 and indices[position] >= start:
+                last = max(last, indices[position])
+        return self._elements[last].inner if last >= 0 else None
 
     @property
     def last_screenshot(self) -> Screenshot | None:
@@ -374,32 +543,36 @@ class Trajectory:
             else:
                 abs_stop = None
 
-            traj = Trajectory(self._elements)
             traj_slice = slice(abs_start, abs_stop, 1)
 
         else:
             # This is not a view, so just apply the slice directly
-            traj = Trajectory(self._elements)
             traj_slice = slice(start, stop, 1)
 
-        # keep a pointer to the root for appending
-        if self.main_trajectory is not None:
-            traj.main_trajectory = self.main_trajectory
-        else:
-            traj.main_trajectory = self
-
-        traj.callbacks = self.callbacks
-        traj._slice = traj_slice
+        # views share the elements and the indexes of the main trajectory: no need to go through `__init__`,
+        # which would index all the elements again
+        traj = Trajectory.__new__(Trajectory)
+        traj.store = self.store
+        traj.keep_in_memory = self.keep_in_memory
+        traj._in_memory = self._in_memory
+        traj._elements = self._elements
         traj._step_starts = self._step_starts
+        traj._step_start_positions = self._step_start_positions
+        traj._kind_indices = self._kind_indices
+        traj._step_indices = self._step_indices
         traj.__current_step = self.__current_step
+        traj.callbacks = self.callbacks
+        traj._slice = traj_slice
+        # keep a pointer to the root for appending
+        traj.main_trajectory = self.main_trajectory if self.main_trajectory is not None else self
         return traj
 
     @override
     def __repr__(self) -> str:
         """Return a concise representation showing step count and element counts."""
-        num_observations = len(list(self.observations()))
-        num_executions = len(list(self.execution_results()))
-        num_completions = len(list(self.agent_completions()))
+        num_observations = len(self._in_view(self._kind_indices["observation"]))
+        num_executions = len(self._in_view(self._kind_indices["execution_result"]))
+        num_completions = len(self._in_view(self._kind_indices["agent_completion"]))
 
         return f"Trajectory(steps={self.num_steps}, observations={num_observations}, executions={num_executions}, completions={num_completions})"
 
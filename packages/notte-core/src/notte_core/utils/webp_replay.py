@@ -1,14 +1,17 @@
 import base64
 import io
 import math
+import struct
 import tempfile
 import textwrap
-from collections import Counter
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, final
+from typing import Any, BinaryIO, final
 
 from PIL import Image, ImageDraw
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel
 
 from notte_core.utils.image import draw_text_with_rounded_background
 
@@ -147,43 +150,265 @@ class WebpReplay:
             image.show()
 
 
-class ScreenshotReplay(BaseModel):
-    class Config:
-        frozen: bool = True
+class WebpAnimationWriter:
+    """Incremental animated WebP encoder.
 
-    b64_screenshots: list[str]
-    _pillow_images: list[Image.Image] = []
+    Each frame is encoded on its own as a still WebP image (see `encode_webp_frame`) and muxed into
+    the animation as soon as it is added, so that at most one decoded frame is alive at any time.
+
+    Args:
+        output: Seekable binary stream the animation is written to.
+        size: Size of the animation canvas. All frames must have this size.
+        loop: Number of times the animation is played (0: infinite loop).
+    """
+
+    def __init__(self, output: BinaryIO, size: tuple[int, int], loop: int = 0):
+        self.output: BinaryIO = output
+        self.size: tuple[int, int] = size
+        self.nb_frames: int = 0
+        self._start: int = output.tell()
+        # RIFF size is written on `close`, once it is known
+        _ = output.write(b"RIFF\x00\x00\x00\x00WEBP")
+        width, height = size
+        # VP8X flags: animation
+        self._write_chunk(b"VP8X", b"\x02\x00\x00\x00" + _uint24(width - 1) + _uint24(height - 1))
+        # ANIM: white background (BGRA), loop count
+        self._write_chunk(b"ANIM", b"\xff\xff\xff\xff" + struct.pack("<H", loop))
+
+    def _write_chunk(self, fourcc: bytes, payload: bytes) -> None:
+        _ = self.output.write(fourcc + struct.pack("<I", len(payload)) + payload)
+        if len(payload) % 2 == 1:
+            _ = self.output.write(b"\x00")
+
+    def add(self, frame: bytes, duration_ms: int) -> None:
+        """Adds a frame encoded by `encode_webp_frame`."""
+        if frame[:4] != b"RIFF" or frame[8:12] != b"WEBP":
+            raise ValueError("Frame is not a WebP image")
+        width, height, bitstream = _parse_webp_still(frame)
+        if (width, height) != self.size:
+            raise ValueError(f"Frame size {(width, height)} does not match the animation size {self.size}")
+        header = _uint24(0) + _uint24(0) + _uint24(width - 1) + _uint24(height - 1) + _uint24(duration_ms)
+        # flags: do not blend with the previous frame, no disposal
+        self._write_chunk(b"ANMF", header + b"\x02" + bitstream)
+        self.nb_frames += 1
+
+    def close(self) -> None:
+        end = self.output.tell()
+        _ = self.output.seek(self._start + 4)
+        _ = self.output.write(struct.pack("<I", end - self._start - 8))
+        _ = self.output.seek(end)
+
+
+def _uint24(value: int) -> bytes:
+    return struct.pack("<I", value)[:3]
+
+
+def _parse_webp_still(data: bytes) -> tuple[int, int, bytes]:
+    """Returns the size and the image chunks (ALPH, VP8 / VP8L) of a still WebP image."""
+    offset = 12
+    bitstream: list[bytes] = []
+    size: tuple[int, int] | None = None
+    while offset + 8 <= len(data):
+        fourcc = data[offset : offset + 4]
+        (length,) = struct.unpack("<I", data[offset + 4 : offset + 8])
+        chunk = data[offset : offset + 8 + length + length % 2]
+        payload = data[offset + 8 : offset + 8 + length]
+        if fourcc in (b"ALPH", b"VP8 ", b"VP8L"):
+            bitstream.append(chunk)
+        if fourcc == b"VP8X":
+            size = (int.from_bytes(payload[4:7], "little") + 1, int.from_bytes(payload[7:10], "little") + 1)
+        elif fourcc == b"VP8 " and size is None:
+            size = (struct.unpack("<H", payload[6:8])[0] & 0x3FFF, struct.unpack("<H", payload[8:10])[0] & 0x3FFF)
+        elif fourcc == b"VP8L" and size is None:
+            bits = int.from_bytes(payload[1:5], "little")
+            size = ((bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+        offset += 8 + length + length % 2
+    if size is None or len(bitstream) == 0:
+        raise ValueError("Invalid WebP image: no image data found")
+    return size[0], size[1], b"".join(bitstream)
+
+
+def encode_webp_frame(image: Image.Image, quality: int) -> bytes:
+    """Encodes a single animation frame as a still WebP image."""
+    buffer = io.BytesIO()
+    # method=0 (fastest), same as PIL's animated WebP encoder defaults
+    image.save(buffer, "WEBP", quality=quality, method=0)
+    return buffer.getvalue()
+
+
+def replay_size(screenshots: Iterable[bytes], scale_factor: float) -> tuple[int, int]:
+    """Size of the replay frames: the most common screenshot size, scaled.
+
+    Only the image headers are read, screenshots are not decoded.
+    """
+    sizes: list[tuple[int, int]] = []
+    first_size: tuple[int, int] | None = None
+    for screenshot in screenshots:
+        with Image.open(io.BytesIO(screenshot)) as img:
+            first_size = first_size or img.size
+            if img.size[0] > 1 and img.size[1] > 1:
+                sizes.append(img.size)
+    width, height = Counter(sizes).most_common(1)[0][0] if sizes else (first_size or (1, 1))
+    return int(math.ceil(width * scale_factor)), int(math.ceil(height * scale_factor))
+
+
+def render_replay_frame(
+    screenshot: bytes | None,
+    index: int,
+    size: tuple[int, int],
+    quality: int,
+    start_text: str = "Start",
+    step_text: str | None = None,
+) -> bytes:
+    """Decodes, resizes and annotates a single replay frame, and encodes it with `encode_webp_frame`.
+
+    `screenshot=None` renders the start frame (white background with `start_text`).
+    """
+    width, height = size
+
+    # fonts
+    min_len = max(min(width, height), 25)
+    small_font_size = min_len // 25
+    medium_font_size = min_len // 20
+    big_font_size = min_len // 15
+
+    if screenshot is None:
+        img = Image.new("RGB", (width, height), color="white")
+        draw = ImageDraw.Draw(img)
+
+        # Use emoji-capable font for start text
+        from notte_core.utils.image import get_emoji_capable_font
+
+        start_font = get_emoji_capable_font(medium_font_size)
+
+        draw.text(
+            (width // 2, height // 2),
+            "\n".join(textwrap.wrap(start_text, width=30)),
+            fill="black",
+            anchor="mm",
+            font=start_font,
+        )
+    else:
+        with Image.open(io.BytesIO(screenshot)) as screen:
+            img = screen.convert("RGB").resize((width, height))
+
+    # Use the same rounded background technique for frame numbers
+    draw_text_with_rounded_background(
+        img=img,
+        text=f"{index}",
+        position=(width - 10, height - 10),
+        font=None,  # Will use emoji-capable font automatically
+        text_color="white",
+        bg_color=(0, 0, 0, 166),  # Black with 65% opacity
+        padding=8,  # Slightly smaller padding for frame numbers
+        corner_radius=8,  # Slightly smaller radius for frame numbers
+        anchor="rb",  # Right-bottom anchor for corner positioning
+        max_width=5,  # Frame numbers are short
+        font_size=big_font_size,
+    )
+
+    if step_text is not None:
+        draw_text_with_rounded_background(
+            img=img,
+            text=step_text,
+            position=(width // 2, 4 * height // 5),
+            font=None,  # Will use emoji-capable font automatically
+            text_color="white",
+            bg_color=(0, 0, 0, 166),  # Black with 65% opacity
+            padding=10,
+            corner_radius=12,
+            anchor="mm",
+            max_width=30,
+            font_size=small_font_size,
+        )
+
+    return encode_webp_frame(img, quality)
+
+
+def build_webp_replay(
+    screenshots: Iterable[bytes],
+    scale_factor: float = 0.7,
+    quality: int = 25,
+    frametime_in_ms: int = 1000,
+    start_text: str = "Start",
+    step_text: Sequence[str] | None = None,
+    max_workers: int = 4,
+    size: tuple[int, int] | None = None,
+) -> bytes:
+    """Builds an animated WebP replay from raw screenshots (png / jpeg bytes).
 
-    @model_validator(mode="after")
-    def process_images(self) -> "ScreenshotReplay":
-        """Process base64 screenshots into standardized PIL images after model initialization."""
-        if not self.b64_screenshots:
-            self._pillow_images = []
-            return self
+    Frames are rendered in a thread pool (at most `2 * max_workers` frames in flight) and streamed into a
+    `WebpAnimationWriter`, so memory usage does not grow with the number of decoded frames.
+    The first frame displays `start_text`; `step_text` adds one caption per screenshot.
 
-        # Convert base64 to pillow images
-        images = [self.base64_to_pillow_image(screen) for screen in self.b64_screenshots]
+    `screenshots` can be a lazy iterable, which is then consumed only once: pass the frame `size` (see `replay_size`)
+    along with it, otherwise all the screenshots are first collected to compute it.
+    """
+    if size is None:
+        screenshots = screenshots if isinstance(screenshots, Sequence) else list(screenshots)
+        if len(screenshots) == 0:
+            return b""
+        size = replay_size(screenshots, scale_factor)
+    if isinstance(screenshots, Sequence) and step_text is not None and len(step_text) != len(screenshots):
+        raise ValueError(
+            f"number of step text should match number of screenshots but got {len(step_text)=} and {len(screenshots)=}"
+        )
+    frame_size = size
+
+    def frames() -> Iterator[tuple[bytes | None, str | None]]:
+        yield None, None
+        nb_screenshots = 0
+        for nb_screenshots, screenshot in enumerate(screenshots, start=1):
+            if step_text is not None and nb_screenshots > len(step_text):
+                break
+            yield screenshot, step_text[nb_screenshots - 1] if step_text is not None else None
+        if step_text is not None and nb_screenshots != len(step_text):
+            raise ValueError(f"number of step text should match number of screenshots but got {len(step_text)=}")
+
+    def render(index: int, screenshot: bytes | None, text: str | None) -> bytes:
+        return render_replay_frame(screenshot, index, frame_size, quality, start_text, text)
+
+    buffer = io.BytesIO()
+    writer = WebpAnimationWriter(buffer, size)
+    nb_frames = 0
+    if max_workers <= 1:
+        for nb_frames, (screenshot, text) in enumerate(frames(), start=1):
+            writer.add(render(nb_frames - 1, screenshot, text), frametime_in_ms)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="notte-replay") as executor:
+            pending: deque[Future[bytes]] = deque()
+            for nb_frames, (screenshot, text) in enumerate(frames(), start=1):
+                pending.append(executor.submit(render, nb_frames - 1, screenshot, text))
+                if len(pending) >= 2 * max_workers:
+                    writer.add(pending.popleft().result(), frametime_in_ms)
+            while pending:
+                writer.add(pending.popleft().result(), frametime_in_ms)
+    if nb_frames <= 1:
+        # only the start frame: no screenshot
+        return b""
+    writer.close()
+    return buffer.getvalue()
 
-        if not images:
-            self._pillow_images = []
-            return self
 
-        sizes = [img.size for img in images if img.size[0] > 1 and img.size[1] > 1]
-        most_common_size = Counter(sizes).most_common(1)[0][0] if sizes else images[0].size
+class ScreenshotReplay(BaseModel):
+    class Config:
+        frozen: bool = True
 
-        # Standardize all images to the most common size
-        standardized_images: list[Image.Image] = []
-        for img in images:
-            if img.size != most_common_size:
-                img = img.resize(most_common_size)
-            standardized_images.append(img)
+    b64_screenshots: list[str]
 
-        self._pillow_images = standardized_images
-        return self
+    @property
+    def screenshots(self) -> list[bytes]:
+        return [base64.b64decode(screen) for screen in self.b64_screenshots]
 
     @property
     def pillow_images(self) -> list[Image.Image]:
-        return self._pillow_images
+        """All screenshots, decoded and resized to the most common size (prefer `build_webp`, which streams frames)."""
+        screenshots = self.screenshots
+        if len(screenshots) == 0:
+            return []
+        size = replay_size(screenshots, scale_factor=1.0)
+        images = [Image.open(io.BytesIO(screen)) for screen in screenshots]
+        return [img if img.size == size else img.resize(size) for img in images]
 
     @classmethod
     def from_base64(cls, screenshots: list[str]):
@@ -205,110 +430,18 @@ class ScreenshotReplay(BaseModel):
         quality: int = 25,
         frametime_in_ms: int = 1000,
         start_text: str = "Start",
-        ignore_incorrect_size: bool = False,
+        ignore_incorrect_size: bool = False,  # pyright: ignore [reportUnusedParameter]
         step_text: list[str] | None = None,
     ) -> bytes:
-        if len(self.b64_screenshots) == 0:
-            return b""
-
-        # resize images with scale factor
-        resized_screenshots: list[Image.Image] = []
-        prev_size = None
-
-        for im in self.pillow_images:
-            if prev_size is None:
-                prev_size = im.size
-            else:
-                # if next images are of incorrect size, either ignore or reshape them
-                if prev_size != im.size and ignore_incorrect_size:
-                    continue
-
-            (width, height) = (int(math.ceil(prev_size[0] * scale_factor)), int(math.ceil(prev_size[1] * scale_factor)))
-
-            resized_screenshots.append(im.resize((width, height)))
-
-        width, height = resized_screenshots[0].size
-
-        # fonts
-        min_len = max(min(width, height), 25)
-        small_font_size = min_len // 25
-        medium_font_size = min_len // 20
-        big_font_size = min_len // 15
-
-        # first frame with start
-        start_image = Image.new("RGB", (width, height), color="white")
-        draw = ImageDraw.Draw(start_image)
-
-        # Use emoji-capable font for start text
-        from notte_core.utils.image import get_emoji_capable_font
-
-        start_font = get_emoji_capable_font(medium_font_size)
-
-        draw.text(
-            (width // 2, height // 2),
-            "\n".join(textwrap.wrap(start_text, width=30)),
-            fill="black",
-            anchor="mm",
-            font=start_font,
-        )
-
-        if step_text is not None and len(step_text) != len(resized_screenshots):
-            raise ValueError(
-                f"number of step text should match number of screenshots but got {len(step_text)=} and {len(resized_screenshots)=}"
-            )
-
-        resized_screenshots.insert(0, start_image)
-        if step_text is not None:
-            step_text.insert(0, "")
-
-        # Add frame numbers to each screenshot
-        for i, img in enumerate(resized_screenshots):
-            frame_text = f"{i}"
-
-            # Use the same rounded background technique for frame numbers
-            draw_text_with_rounded_background(
-                img=img,
-                text=frame_text,
-                position=(width - 10, height - 10),
-                font=None,  # Will use emoji-capable font automatically
-                text_color="white",
-                bg_color=(0, 0, 0, 166),  # Black with 65% opacity
-                padding=8,  # Slightly smaller padding for frame numbers
-                corner_radius=8,  # Slightly smaller radius for frame numbers
-                anchor="rb",  # Right-bottom anchor for corner positioning
-                max_width=5,  # Frame numbers are short
-                font_size=big_font_size,
-            )
-
-            if step_text is not None:
-                text = step_text[i]
-                draw_text_with_rounded_background(
-                    img=img,
-                    text=text,
-                    position=(width // 2, 4 * height // 5),
-                    font=None,  # Will use emoji-capable font automatically
-                    text_color="white",
-                    bg_color=(0, 0, 0, 166),  # Black with 65% opacity
-                    padding=10,
-                    corner_radius=12,
-                    anchor="mm",
-                    max_width=30,
-                    font_size=small_font_size,
-                )
-
-        # Save as animated WebP to bytes buffer
-        buffer = io.BytesIO()
-        resized_screenshots[0].save(
-            buffer,
-            "WEBP",
-            save_all=True,
-            append_images=resized_screenshots[1:],
-            duration=frametime_in_ms,
+        # screenshots are all resized to the most common size, `ignore_incorrect_size` is kept for compatibility
+        return build_webp_replay(
+            self.screenshots,
+            scale_factor=scale_factor,
             quality=quality,
-            loop=0,
+            frametime_in_ms=frametime_in_ms,
+            start_text=start_text,
+            step_text=step_text,
         )
-        _ = buffer.seek(0)
-        return buffer.getvalue()
 
     def get(self, **kwargs: dict[Any, Any]) -> WebpReplay:
         return WebpReplay(self.build_webp(**kwargs))  # pyright: ignore [reportArgumentType]
@@ -5,18 +5,23 @@ import asyncio
 import contextlib
 import functools
 import io
+import json
 import logging
+import multiprocessing
+import queue
 import sys
 import time
 import tomllib
 import traceback
 from dataclasses import dataclass
+from multiprocessing.queues import Queue
 from pathlib import Path
-from typing import Any, Callable, TextIO
+from typing import Any, Callable, Literal, TextIO
 
 import cloudpickle  # type: ignore[reportMissingTypeStubs]
 import pebble
 from loguru import logger as loguru_logger
+from notte_browser.browser_pool import BrowserPool
 from notte_core.utils.webp_replay import ScreenshotReplay
 from pydantic import BaseModel
 from typing_extensions import Self
@@ -50,6 +55,10 @@ class RunParameters(BaseModel):
     evaluator: Evaluator | None = None
     experiment_path: Path | str = ""
     capture_logging: bool = True
+    # "process": each task try runs in a fresh process, "async": `n_jobs` long-lived worker processes each run up to
+    # `tasks_per_worker` tasks concurrently, sharing a browser pool
+    execution_mode: Literal["process", "async"] = "process"
+    tasks_per_worker: int = 4
 
 
 class InRunParameters(BaseModel):
@@ -60,6 +69,11 @@ class InRunParameters(BaseModel):
     evaluator: Evaluator | None = None
     experiment_path: Path | str = ""
     capture_logging: bool = True
+    # other tasks run concurrently in the same process
+    concurrent: bool = False
+
+
+Job = tuple[BenchmarkTask, InRunParameters]
 
 
 TaskSuccessResult = tuple[BenchmarkTask, AgentOut, TaskResult]
@@ -162,8 +176,17 @@ async def run_agent(
     stderr_capture = io.StringIO()
 
     sink = LoggingSink()
+    log_key = f"{task.id}/{inrun_params.run_id}"
+    sink_id: int | None = None
 
-    if inrun_params.capture_logging:
+    if inrun_params.capture_logging and inrun_params.concurrent:
+        # stdout, stderr and logging are shared with the other tasks of the process: only capture the loguru logs
+        sink_id = loguru_logger.add(
+            sink, level="DEBUG", filter=lambda record: record["extra"].get("eval_task") == log_key
+        )
+        stdout_capture = sys.stdout
+        stderr_capture = sys.stderr
+    elif inrun_params.capture_logging:
         loguru_logger.remove()
         _ = loguru_logger.add(sink, level="DEBUG")  # Redirect loguru logs
 
@@ -175,6 +198,8 @@ async def run_agent(
     def get_logs() -> dict[str, str]:
         if not inrun_params.capture_logging:
             return {}
+        if inrun_params.concurrent:
+            return {"loguru": "\n".join(sink.messages)}
 
         assert isinstance(stderr_capture, io.StringIO) and isinstance(stdout_capture, io.StringIO)
         logs: dict[str, str] = {}
@@ -188,6 +213,7 @@ async def run_agent(
         with (
             contextlib.redirect_stdout(stdout_capture),
             contextlib.redirect_stderr(stderr_capture),
+            loguru_logger.contextualize(eval_task=log_key),
         ):
             run = await agent_bench.run_agent(task)
             out = await agent_bench.process_output(task, run)
@@ -216,6 +242,9 @@ async def run_agent(
             exception=e,
             traceback_str=traceback.format_exc(),
         ).log()
+    finally:
+        if sink_id is not None:
+            loguru_logger.remove(sink_id)
 
 
 def compute_tasks(
@@ -230,28 +259,65 @@ def compute_tasks(
     task_slice = slice(run_parameters.task_set.start, run_parameters.task_set.end)
     tasks = tasks[task_slice]
 
+    jobs: list[Job] = []
+    for task in tasks:
+        for run_id in range(run_parameters.tries_per_task):
+            # resuming an experiment: skip the task tries that already completed
+            if is_completed(run_parameters.experiment_path, task, run_id):
+                continue
+            run_params = InRunParameters(
+                run_id=run_id,
+                evaluator=run_parameters.evaluator,
+                experiment_path=run_parameters.experiment_path,
+                capture_logging=run_parameters.capture_logging,
+                concurrent=run_parameters.execution_mode == "async" and run_parameters.tasks_per_worker > 1,
+            )
+            jobs.append((task, run_params))
+
+    skipped = len(tasks) * run_parameters.tries_per_task - len(jobs)
+    if skipped > 0:
+        loguru_logger.info(f"Skipping {skipped} task runs already completed in {run_parameters.experiment_path}")
+
+    match run_parameters.execution_mode:
+        case "process":
+            gathered_outputs = compute_tasks_in_processes(agent_bench, jobs, run_parameters)
+        case "async":
+            gathered_outputs = compute_tasks_in_workers(agent_bench, jobs, run_parameters)
+
+    final_outs: list[BenchmarkExecutionResult] = []
+    for out in gathered_outputs:
+        if isinstance(out, bytes):
+            try:
+                task_outputs: TaskSuccessResult = cloudpickle.loads(out)  # type: ignore
+                final_outs.append(BenchmarkExecutionResult.successful(task_outputs))  # type: ignore
+            except Exception:
+                raise ValueError(
+                    f"Could not read bytes from task return, this should not happen: {traceback.format_exc()}"
+                )
+        else:
+            final_outs.append(BenchmarkExecutionResult.failure(out))
+
+    return final_outs
+
+
+def compute_tasks_in_processes(
+    agent_bench: AgentBenchmark[AgentParams, AgentOut], jobs: list[Job], run_parameters: RunParameters
+) -> list[bytes | TaskErrorResult]:
+    """Run each task try in a fresh process"""
     futures: list[tuple[BenchmarkTask, InRunParameters, pebble.ProcessFuture]] = []
     gathered_outputs: list[bytes | TaskErrorResult] = []
 
     with pebble.ProcessPool(max_workers=run_parameters.n_jobs, max_tasks=1) as pool:
-        for task in tasks:
-            for run_id in range(run_parameters.tries_per_task):
-                run_params = InRunParameters(
-                    run_id=run_id,
-                    evaluator=run_parameters.evaluator,
-                    experiment_path=run_parameters.experiment_path,
-                    capture_logging=run_parameters.capture_logging,
-                )
-
-                wrapped_task = functools.partial(
-                    sync_wrapper,
-                    run_agent,
-                    agent_bench,  # type: ignore
-                    task,  # type: ignore
-                    run_params,  # type: ignore
-                )
-                future = pool.schedule(wrapped_task, timeout=run_parameters.max_task_duration_in_s)  # type: ignore[reportUnknownMemberType]
-                futures.append((task, run_params, future))
+        for task, run_params in jobs:
+            wrapped_task = functools.partial(
+                sync_wrapper,
+                run_agent,
+                agent_bench,  # type: ignore
+                task,  # type: ignore
+                run_params,  # type: ignore
+            )
+            future = pool.schedule(wrapped_task, timeout=run_parameters.max_task_duration_in_s)  # type: ignore[reportUnknownMemberType]
+            futures.append((task, run_params, future))
 
         try:
             for task, run_params, future in futures:
@@ -280,29 +346,142 @@ def compute_tasks(
             pool.stop()
             pool.join()
 
-    final_outs: list[BenchmarkExecutionResult] = []
-    for out in gathered_outputs:
-        if isinstance(out, bytes):
+    return gathered_outputs
+
+
+async def run_agent_with_timeout(
+    agent_bench: AgentBenchmark[AgentParams, AgentOut], task: BenchmarkTask, run_params: InRunParameters, timeout: float
+) -> bytes | TaskErrorResult:
+    try:
+        async with asyncio.timeout(timeout):
+            return await run_agent(agent_bench, task, run_params)
+    except TimeoutError as e:
+        return TaskErrorResult(
+            task,
+            run_params,
+            {},
+            run_params.experiment_path,
+            exception=e,
+            traceback_str=traceback.format_exc(),
+        ).log()
+
+
+async def run_worker(
+    agent_bench: AgentBenchmark[AgentParams, AgentOut],
+    jobs: Queue[bytes | None],
+    results: Queue[bytes],
+    tasks_per_worker: int,
+    max_task_duration_in_s: float,
+) -> None:
+    # all the sessions of the worker share the same playwright driver and browsers
+    pool = BrowserPool(
+        size=1, max_contexts_per_browser=tasks_per_worker, max_idle_contexts_per_browser=tasks_per_worker
+    ).install()
+
+    async def consume() -> None:
+        while (job := await asyncio.to_thread(jobs.get)) is not None:
+            index, task, run_params = cloudpickle.loads(job)
+            result = await run_agent_with_timeout(agent_bench, task, run_params, max_task_duration_in_s)
+            results.put(cloudpickle.dumps((index, result)))  # type: ignore[reportUnknownMemberType]
+
+    try:
+        _ = await asyncio.gather(*[consume() for _ in range(tasks_per_worker)])
+    finally:
+        await pool.astop()
+
+
+def worker_main(
+    agent_bench_bytes: bytes,
+    jobs: Queue[bytes | None],
+    results: Queue[bytes],
+    tasks_per_worker: int,
+    max_task_duration_in_s: float,
+) -> None:
+    """Entry point of the long-lived worker processes of the `async` execution mode"""
+    agent_bench: AgentBenchmark[Any, Any] = cloudpickle.loads(agent_bench_bytes)
+    asyncio.run(run_worker(agent_bench, jobs, results, tasks_per_worker, max_task_duration_in_s))
+
+
+def compute_tasks_in_workers(
+    agent_bench: AgentBenchmark[AgentParams, AgentOut], jobs: list[Job], run_parameters: RunParameters
+) -> list[bytes | TaskErrorResult]:
+    """Run the task tries as asyncio tasks in `n_jobs` long-lived worker processes, which pull them from a queue"""
+    if len(jobs) == 0:
+        return []
+    context = multiprocessing.get_context("spawn")
+    job_queue: Queue[bytes | None] = context.Queue()
+    result_queue: Queue[bytes] = context.Queue()
+    n_workers = min(run_parameters.n_jobs, len(jobs))
+    for index, (task, run_params) in enumerate(jobs):
+        job_queue.put(cloudpickle.dumps((index, task, run_params)))  # type: ignore[reportUnknownMemberType]
+    # one stop signal per consumer
+    for _ in range(n_workers * run_parameters.tasks_per_worker):
+        job_queue.put(None)
+
+    agent_bench_bytes: bytes = cloudpickle.dumps(agent_bench)  # type: ignore[reportUnknownMemberType]
+    workers = [
+        context.Process(
+            target=worker_main,
+            args=(
+                agent_bench_bytes,
+                job_queue,
+                result_queue,
+                run_parameters.tasks_per_worker,
+                run_parameters.max_task_duration_in_s,
+            ),
+        )
+        for _ in range(n_workers)
+    ]
+    for worker in workers:
+        worker.start()
+
+    outputs: dict[int, bytes | TaskErrorResult] = {}
+    try:
+        while len(outputs) < len(jobs):
             try:
-                task_outputs: TaskSuccessResult = cloudpickle.loads(out)  # type: ignore
-                final_outs.append(BenchmarkExecutionResult.successful(task_outputs))  # type: ignore
-            except Exception:
-                raise ValueError(
-                    f"Could not read bytes from task return, this should not happen: {traceback.format_exc()}"
-                )
-        else:
-            final_outs.append(BenchmarkExecutionResult.failure(out))
+                index, result = cloudpickle.loads(result_queue.get(timeout=1))
+                outputs[index] = result
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    break
+    finally:
+        for worker in workers:
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.terminate()
 
-    return final_outs
+    gathered_outputs: list[bytes | TaskErrorResult] = []
+    for index, (task, run_params) in enumerate(jobs):
+        if index not in outputs:
+            outputs[index] = TaskErrorResult(
+                task,
+                run_params,
+                {},
+                run_params.experiment_path,
+                exception=RuntimeError("The worker process running the task stopped unexpectedly"),
+            ).log()
+        gathered_outputs.append(outputs[index])
+    return gathered_outputs
+
+
+def task_path(root_path: str | Path, task: BenchmarkTask, run_id: int) -> Path:
+    return Path(root_path) / f"{task.website_name}_{task.id}" / str(run_id)
+
+
+def is_completed(root_path: str | Path, task: BenchmarkTask, run_id: int) -> bool:
+    """Whether a task try has been fully saved in the experiment directory (tries that crashed are not completed)"""
+    path = task_path(root_path, task, run_id)
+    if not (path / "summary.webp").exists():
+        return False
+    try:
+        result = json.loads((path / "results_no_screenshot.json").read_text())
+        return result["duration_in_s"] >= 0
+    except (OSError, ValueError, KeyError):
+        return False
 
 
 def save_task(root_path: str | Path, task_res: TaskResult):
-    if not isinstance(root_path, Path):
-        path = Path(root_path)
-    else:
-        path = root_path
-
-    path = path / f"{task_res.task_website}_{task_res.task_id}" / str(task_res.run_id)
+    path = task_path(root_path, task_res.task, task_res.run_id)
 
     path.mkdir(parents=True, exist_ok=True)
 
@@ -331,7 +510,7 @@ def load_data(input_stream: TextIO | None = None) -> dict[str, Any]:
     return tomllib.loads(data)
 
 
-def run_tasks(config: dict[str, Any], dir: Path | str = ".") -> Path:
+def run_tasks(config: dict[str, Any], dir: Path | str = ".", resume: Path | str | None = None) -> Path:
     RUN_PARAMS_KEY = "RunParameters"
     if RUN_PARAMS_KEY not in config:
         raise ValueError("Need to configure run with RunParameters table")
@@ -366,10 +545,19 @@ def run_tasks(config: dict[str, Any], dir: Path | str = ".") -> Path:
     if isinstance(dir, str):
         dir = Path(dir)
 
-    experiment_path = dir / run_params.task_set.name / benchmark_handler_key / str(int(time.time()))
-
-    experiment_path.mkdir(parents=True, exist_ok=True)
-    _ = (experiment_path / "params.json").write_text(input_params.model_dump_json(indent=2))
+    params_json = input_params.model_dump_json(indent=2)
+    if resume is not None:
+        # continue a partially completed experiment: only the missing task tries are run
+        experiment_path = Path(resume)
+        params_path = experiment_path / "params.json"
+        if not params_path.exists():
+            raise ValueError(f"Cannot resume from {experiment_path}: no experiment found (missing params.json)")
+        if json.loads(params_path.read_text()) != json.loads(params_json):
+            raise ValueError(f"Cannot resume from {experiment_path}: the agent parameters are different")
+    else:
+        experiment_path = dir / run_params.task_set.name / benchmark_handler_key / str(int(time.time()))
+        experiment_path.mkdir(parents=True, exist_ok=True)
+        _ = (experiment_path / "params.json").write_text(params_json)
     run_params.experiment_path = experiment_path
 
     # tasks are saved directly after being run
@@ -380,6 +568,9 @@ def run_tasks(config: dict[str, Any], dir: Path | str = ".") -> Path:
 def main() -> None:
     parser = argparse.ArgumentParser(prog="NotteBench", description="Notte Benchmark tool for agents")
     _ = parser.add_argument("input_file", nargs="?", type=argparse.FileType("r"), default=sys.stdin)
+    _ = parser.add_argument(
+        "--resume", type=Path, default=None, help="experiment directory to resume (only missing task runs are run)"
+    )
 
     args = parser.parse_args()
 
@@ -391,7 +582,7 @@ def main() -> None:
         # Data is from stdin
         data = load_data()
 
-    _ = run_tasks(data)
+    _ = run_tasks(data, resume=args.resume)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,96 @@
+from typing import Any
+
+import pytest
+from notte_browser.form_filling import FORM_FIELD_ATTRIBUTE, FormFiller, FormInventory, parse_field_selector
+
+
+class FakeLocator:
+    def __init__(self, selector: str) -> None:
+        self.selector: str = selector
+
+    @property
+    def first(self) -> "FakeLocator":
+        return self
+
+
+class FakePage:
+    def __init__(self, inventory: dict[str, Any]) -> None:
+        self.inventory: dict[str, Any] = inventory
+        self.evaluations: int = 0
+
+    async def evaluate(self, script: str, arg: Any = None) -> dict[str, Any]:
+        self.evaluations += 1
+        return self.inventory
+
+    def locator(self, selector: str) -> FakeLocator:
+        return FakeLocator(selector)
+
+
+def field(field_id: str, tag: str = "input", options: int = 0, **attributes: str) -> dict[str, Any]:
+    return {"id": field_id, "tag": tag, "attributes": attributes, "options": options}
+
+
+INVENTORY = {
+    "fields": [
+        field("1", type="search", name="q"),
+        field("2", autocomplete="given-name", name="fname"),
+        field("3", tag="select", options=0, name="country"),
+        field("4", id="field-7"),
+        field("5", type="EMAIL"),
+    ],
+    "labels": [
+        {"text": "Search", "fields": [0]},
+        {"text": "City / Town", "fields": [3]},
+    ],
+}
+
+
+def selector(field_id: str) -> str:
+    return f'[{FORM_FIELD_ATTRIBUTE}="{field_id}"]'
+
+
+def test_parse_field_selector():
+    first_name = parse_field_selector('[name*="first"][name*="name"]')
+    assert first_name is not None
+    assert first_name.matches(
+        FormInventory.model_validate({"fields": [field("1", name="first_name")], "labels": []}).fields[0]
+    )
+    assert parse_field_selector('xpath=//input[@name="email"]') is None
+    assert parse_field_selector("form > input") is None
+    assert all(
+        parse_field_selector(selector) is not None
+        for selectors in FormFiller.FIELD_SELECTORS.values()
+        for selector in selectors
+        if not selector.startswith("xpath=")
+    )
+
+
+@pytest.mark.asyncio
+async def test_find_field_uses_a_single_inventory():
+    page = FakePage(INVENTORY)
+    filler = FormFiller(page)  # pyright: ignore[reportArgumentType]
+
+    first_name = await filler.find_field("first_name")
+    city = await filler.find_field("city")
+    email = await filler.find_field("email")
+    # select fields without options cannot be filled
+    country = await filler.find_field("country")
+
+    assert isinstance(first_name, FakeLocator) and first_name.selector == selector("2")
+    assert isinstance(city, FakeLocator) and city.selector == selector("4")
+    assert isinstance(email, FakeLocator) and email.selector == selector("5")
+    assert country is None
+    assert page.evaluations == 1
+
+    # once a field is filled, the next lookup matches a new inventory (the form may have been re-rendered)
+    filler._inventory_stale = True  # pyright: ignore[reportPrivateUsage]
+    page.inventory = {
+        "fields": [field("3", tag="select", options=3, name="country"), field("7", name="zip")],
+        "labels": [],
+    }
+    country = await filler.find_field("country")
+    assert isinstance(country, FakeLocator) and country.selector == selector("3")
+    assert page.evaluations == 2
+    postal_code = await filler.find_field("postal_code")
+    assert isinstance(postal_code, FakeLocator) and postal_code.selector == selector("7")
+    assert page.evaluations == 2
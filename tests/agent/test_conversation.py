@@ -0,0 +1,36 @@
+from unittest.mock import patch
+
+from notte_agent.common.conversation import Conversation
+
+
+def fake_token_counter(model: str, messages: list[dict[str, str]]) -> int:
+    return len(messages[0]["content"])
+
+
+@patch("notte_agent.common.conversation.token_counter", fake_token_counter)
+def test_conversation_trims_oldest_messages_and_keeps_init_messages():
+    conv = Conversation(autosize=True, max_tokens=100, conservative_factor=1.0)
+    conv.add_system_message("s" * 10)
+    conv.add_user_message("t" * 10)
+    for i in range(10):
+        conv.add_assistant_message(f"{i}" * 20)
+    messages = conv.messages()
+    assert [msg["content"] for msg in messages[:2]] == ["s" * 10, "t" * 10]
+    # only the 4 most recent messages fit in the remaining 80 tokens
+    assert [msg["content"] for msg in messages[2:]] == [f"{i}" * 20 for i in range(6, 10)]
+    assert conv.total_tokens() == 100
+
+
+@patch("notte_agent.common.conversation.token_counter", fake_token_counter)
+def test_conversation_fork_does_not_modify_original():
+    conv = Conversation(autosize=True, max_tokens=60, conservative_factor=1.0)
+    conv.add_system_message("s" * 10)
+    conv.add_user_message("t" * 10)
+    conv.add_assistant_message("a" * 20)
+    messages, total = conv.messages(), conv.total_tokens()
+
+    fork = conv.fork()
+    fork.add_user_message("u" * 30)
+    assert [msg["content"] for msg in fork.messages()] == ["s" * 10, "t" * 10, "u" * 30]
+    assert conv.messages() == messages
+    assert conv.total_tokens() == total
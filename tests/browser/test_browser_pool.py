@@ -0,0 +1,178 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Callable
+
+import pytest
+from notte_browser.browser_pool import BrowserPool
+from notte_browser.playwright import PlaywrightManager
+from notte_browser.window import BrowserWindowOptions
+from notte_sdk.types import SessionStartRequest
+from typing_extensions import override
+
+
+class FakePage:
+    def __init__(self, context: "FakeContext") -> None:
+        self.context: FakeContext = context
+        self.handlers: dict[str, list[Callable[[Any], None]]] = {}
+
+    def on(self, event: str, handler: Callable[[Any], None]) -> None:
+        self.handlers.setdefault(event, []).append(handler)
+
+    def navigate(self, url: str) -> None:
+        for handler in self.handlers.get("framenavigated", []):
+            handler(SimpleNamespace(url=url))
+
+    async def close(self) -> None:
+        if self in self.context.pages:
+            self.context.pages.remove(self)
+
+
+class FakeCDPSession:
+    def __init__(self, context: "FakeContext") -> None:
+        self.context: FakeContext = context
+
+    async def send(self, method: str, params: dict[str, str]) -> None:
+        assert method == "Storage.clearDataForOrigin"
+        self.context.cleared_origins.append(params["origin"])
+
+    async def detach(self) -> None:
+        pass
+
+
+class FakeContext:
+    def __init__(self) -> None:
+        self.pages: list[FakePage] = []
+        self.page_handlers: list[Callable[[FakePage], None]] = []
+        self.cookies: list[str] = []
+        self.cleared_origins: list[str] = []
+        self.closed: bool = False
+
+    def on(self, event: str, handler: Callable[[FakePage], None]) -> None:
+        assert event == "page"
+        self.page_handlers.append(handler)
+
+    async def new_page(self) -> FakePage:
+        page = FakePage(self)
+        self.pages.append(page)
+        for handler in self.page_handlers:
+            handler(page)
+        return page
+
+    async def new_cdp_session(self, page: FakePage) -> FakeCDPSession:
+        return FakeCDPSession(self)
+
+    async def clear_cookies(self) -> None:
+        self.cookies.clear()
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self) -> None:
+        self.connected: bool = True
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def close(self) -> None:
+        self.connected = False
+
+
+class FakePlaywrightManager(PlaywrightManager):
+    launched: list[FakeBrowser] = []
+
+    @override
+    async def astart(self) -> None:
+        pass
+
+    @override
+    async def astop(self) -> None:
+        pass
+
+    @override
+    async def create_playwright_browser(self, options: BrowserWindowOptions) -> Any:
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+    @override
+    async def create_context(self, options: BrowserWindowOptions, browser: Any) -> Any:
+        return FakeContext()
+
+
+def make_options(**data: Any) -> BrowserWindowOptions:
+    return BrowserWindowOptions.from_request(SessionStartRequest(headless=True, **data))
+
+
+def test_pool_key_ignores_random_default_viewport():
+    assert BrowserPool.key(make_options()) == BrowserPool.key(make_options())
+    assert BrowserPool.key(make_options()) != BrowserPool.key(make_options(user_agent="test"))
+    assert BrowserPool.key(make_options(viewport_width=800, viewport_height=600)) != BrowserPool.key(make_options())
+
+
+@pytest.mark.asyncio
+async def test_pool_recycles_contexts_and_evicts_browsers():
+    manager = FakePlaywrightManager(launched=[])
+    pool = BrowserPool(size=1, max_uses_per_browser=3, manager=manager)
+    options = make_options()
+
+    browser, context = await pool.acquire(options)
+    page = await context.context.new_page()
+    page.navigate("https://example.com/login")
+    context.context.cookies.append("session")
+    await pool.release(browser, context)
+    await asyncio.sleep(0)
+
+    # the released context is reset and handed out again from the same browser
+    fake_context = context.context
+    assert fake_context.cleared_origins == ["https://example.com"]
+    assert fake_context.cookies == [] and not fake_context.closed
+    second_browser, second_context = await pool.acquire(options)
+    assert second_browser is browser and second_context is context
+    await pool.release(second_browser, second_context)
+
+    # third use retires the browser, which is closed on release and replaced
+    third_browser, third_context = await pool.acquire(options)
+    assert third_browser is browser and third_browser.retired
+    await pool.release(third_browser, third_context)
+    assert not browser.browser.is_connected() and fake_context.closed
+    fourth_browser, _ = await pool.acquire(options)
+    assert fourth_browser is not browser
+    assert len(manager.launched) == 2
+
+    # health check: disconnected browsers are evicted
+    fourth_browser.browser.connected = False  # pyright: ignore [reportAttributeAccessIssue]
+    fifth_browser, _ = await pool.acquire(options)
+    assert fifth_browser is not fourth_browser
+    await pool.astop()
+    assert len(pool) == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_bounds_browsers_across_options():
+    manager = FakePlaywrightManager(launched=[])
+    pool = BrowserPool(size=1, max_uses_per_browser=10, max_contexts_per_browser=1, max_browsers=2, manager=manager)
+    first, second, third = make_options(), make_options(user_agent="second"), make_options(user_agent="third")
+
+    for options in (first, second):
+        browser, context = await pool.acquire(options)
+        await pool.release(browser, context)
+        await asyncio.sleep(0)
+    assert len(pool) == 2
+    first_browser = manager.launched[0]
+
+    # a new set of options evicts the idle browser of the least recently used options
+    browser, context = await pool.acquire(third)
+    assert len(pool) == 2 and len(manager.launched) == 3
+    assert not first_browser.is_connected() and manager.launched[1].is_connected()
+    await pool.release(browser, context)
+
+    # a burst of busy sessions can exceed the bound, which is restored once they are released
+    acquired = [await pool.acquire(third) for _ in range(3)]
+    assert len(pool) > 2
+    for browser, context in acquired:
+        await pool.release(browser, context)
+    await asyncio.sleep(0)
+    assert len(pool) == 2
+    await pool.astop()
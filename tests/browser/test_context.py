@@ -258,3 +258,19 @@ def test_subgraph_without_existing_actions(
         ]
     )
     assert subgraph is None
+
+
+def test_interaction_node_index(
+    nested_graph: DomNode,
+    browser_snapshot: BrowserSnapshot,
+) -> None:
+    context = browser_snapshot.with_dom_node(nested_graph)
+    index = context.interaction_node_index()
+    assert list(index.keys()) == [inode.id for inode in nested_graph.interaction_nodes()]
+    # built once per snapshot
+    assert context.interaction_node_index() is index
+    node = context.interaction_node("B2")
+    assert node is not None and node.id == "B2"
+    assert context.interaction_node("Z9") is None
+    # a new dom node gets its own index
+    assert browser_snapshot.interaction_node_index().keys() == {"B2"}
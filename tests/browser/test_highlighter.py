@@ -0,0 +1,70 @@
+import io
+import random
+
+from notte_core.browser.highlighter import (
+    BoundingBox,
+    ColorAnalyzer,
+    LabelConfig,
+    Rectangle,
+    RectangleGrid,
+    ScreenshotHighlighter,
+)
+from PIL import Image, ImageDraw
+
+
+def test_rectangle_grid_overlaps_matches_linear_scan():
+    rng = random.Random(0)
+
+    def random_rect() -> Rectangle:
+        x, y = rng.uniform(-50, 1000), rng.uniform(-50, 1000)
+        return Rectangle(x, y, x + rng.uniform(1, 200), y + rng.uniform(1, 200))
+
+    grid = RectangleGrid(cell_size=64)
+    rects: list[Rectangle] = []
+    for _ in range(300):
+        rect = random_rect()
+        assert grid.overlaps(rect) == any(rect.overlaps(other) for other in rects)
+        grid.add(rect)
+        rects.append(rect)
+    assert len(grid) == 300
+    assert list(grid) == rects
+
+
+def test_color_analyzer_uniform_areas():
+    image = Image.new("RGB", (200, 100), "white")
+    draw = ImageDraw.Draw(image)
+    # left half: checkerboard, right half: uniform gray with a light gradient
+    for x in range(0, 100, 4):
+        for y in range(0, 100, 4):
+            if (x + y) % 8 == 0:
+                draw.rectangle([x, y, x + 3, y + 3], fill="black")
+    for x in range(100, 200):
+        draw.line([x, 0, x, 100], fill=(120 + (x - 100) // 20,) * 3)
+    analyzer = ColorAnalyzer(image)
+    config = LabelConfig()
+    assert not analyzer.is_area_uniform_color(Rectangle(10, 10, 60, 40), config)
+    assert analyzer.is_area_uniform_color(Rectangle(110, 10, 190, 90), config)
+    # clamped to the image bounds
+    assert analyzer.is_area_uniform_color(Rectangle(150, 50, 500, 500), config)
+
+
+def test_highlight_dense_page():
+    rng = random.Random(0)
+    buffer = io.BytesIO()
+    Image.new("RGB", (1280, 720), "white").save(buffer, format="PNG")
+    bboxes = [
+        BoundingBox(
+            x=rng.uniform(0, 1200),
+            y=rng.uniform(0, 700),
+            width=rng.uniform(20, 200),
+            height=rng.uniform(10, 50),
+            scroll_x=0,
+            scroll_y=0,
+            viewport_width=1280,
+            viewport_height=720,
+            notte_id=f"{rng.choice('LBIF')}{i}",
+        )
+        for i in range(300)
+    ]
+    highlighted = Image.open(io.BytesIO(ScreenshotHighlighter.forward(buffer.getvalue(), bboxes)))
+    assert highlighted.size == (1280, 720)
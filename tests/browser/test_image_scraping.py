@@ -0,0 +1,37 @@
+import pytest
+from notte_browser.scraping.images import ImageScrapingPipe, extract_images
+from notte_browser.session import NotteSession
+from notte_core.data.space import ImageCategory
+
+PIXEL = "data:image/gif;base64,R0lGODlhAQABAAAAACw="
+
+HTML = f"""
+<html><body>
+  <img src="{PIXEL}" width="400" height="300" alt="A cat">
+  <img src="{PIXEL}" width="16" height="16" alt="search icon">
+  <img data-src="https://example.com/lazy.png" width="400" height="300" alt="">
+  <svg width="300" height="200"><rect width="300" height="200" fill="red"></rect></svg>
+</body></html>
+"""
+
+
+@pytest.mark.asyncio
+async def test_image_scraping_extracts_all_images_at_once():
+    async with NotteSession(headless=True) as session:
+        await session.window.page.set_content(HTML)
+        snapshot = await session.window.snapshot()
+        image_nodes = snapshot.dom_node.image_nodes()
+
+        page_images = await extract_images(session.window.page, image_nodes)
+        assert [image.category for image in page_images.values()] == [
+            ImageCategory.CONTENT_IMAGE,
+            ImageCategory.ICON,
+            ImageCategory.DECORATIVE,
+            ImageCategory.SVG_CONTENT,
+        ]
+        assert list(page_images.values())[2].src == "https://example.com/lazy.png"
+
+        images = await ImageScrapingPipe().forward(session.window, snapshot)
+        assert images[0].category is ImageCategory.FAVICON
+        svg = images[-1]
+        assert svg.category is ImageCategory.SVG_CONTENT and svg.url is not None and svg.url.startswith("<svg")
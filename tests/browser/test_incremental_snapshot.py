@@ -0,0 +1,43 @@
+import pytest
+from notte_browser.dom.incremental import IncrementalParseDomTreePipe
+from notte_browser.dom.parsing import ParseDomTreePipe
+from notte_browser.session import NotteSession
+from notte_core.browser.dom_tree import DomNode
+
+HTML = """
+<html><body>
+  <div id="header"><button>Home</button><a href="/about">About</a></div>
+  <div id="menu"><button>Open</button></div>
+  <div id="footer"><button>Contact</button></div>
+</body></html>
+"""
+
+
+def ids_by_text(dom_node: DomNode) -> dict[str, str]:
+    return {node.text: node.id for node in dom_node.interaction_nodes()}
+
+
+@pytest.mark.asyncio
+async def test_incremental_snapshot_keeps_ids_stable():
+    async with NotteSession(headless=True, viewport_width=1280, viewport_height=720) as session:
+        page = session.window.page
+        await page.set_content(HTML)
+        pipe = IncrementalParseDomTreePipe()
+
+        first = ids_by_text(await pipe.forward(page))
+        assert first == ids_by_text(await ParseDomTreePipe.forward(page))
+
+        # nothing changed: the previous tree is reused as is
+        assert ids_by_text(await pipe.forward(page)) == first
+
+        # open a "dropdown" in the middle of the page
+        _ = await page.evaluate(
+            "() => { const b = document.createElement('button'); b.textContent = 'Option'; document.getElementById('menu').appendChild(b); }"
+        )
+        patched = ids_by_text(await pipe.forward(page))
+        assert {text: patched[text] for text in first} == first
+        assert "Option" in patched and patched["Option"] not in first.values()
+
+        # same set of interactive elements as a full parse
+        full = ids_by_text(await ParseDomTreePipe.forward(page))
+        assert set(patched.keys()) == set(full.keys())
@@ -0,0 +1,50 @@
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from notte_browser.session import NotteSession
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        body = f"<html><head><title>{self.path}</title></head><body><h1>Page {self.path}</h1></body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.end_headers()
+        _ = self.wfile.write(body.encode())
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_ascrape_many_streams_all_pages(server_url: str) -> None:
+    urls = [f"{server_url}/page-{i}" for i in range(6)]
+    async with NotteSession(headless=True) as session:
+        results = {url: result async for url, result in session.ascrape_many(urls, max_tabs=3, only_main_content=False)}
+        # scraping tabs are closed once done
+        assert len(session.window.tabs) == 1
+
+    assert set(results) == set(urls)
+    for i, url in enumerate(urls):
+        assert isinstance(results[url], str)
+        assert f"Page /page-{i}" in results[url]
+
+
+@pytest.mark.asyncio
+async def test_ascrape_many_yields_failures(server_url: str) -> None:
+    urls = [f"{server_url}/ok", "not a valid url"]
+    async with NotteSession(headless=True) as session:
+        results = dict([item async for item in session.ascrape_many(urls, raise_on_failure=False)])
+    assert isinstance(results[f"{server_url}/ok"], str)
+    assert isinstance(results["not a valid url"], Exception)
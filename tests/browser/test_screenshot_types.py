@@ -1,6 +1,11 @@
+import io
+from unittest.mock import patch
+
 import pytest
 from notte_browser.session import NotteSession
 from notte_core.actions import FillAction, GotoAction
+from notte_core.browser.highlighter import BoundingBox, ScreenshotHighlighter
+from notte_core.browser.observation import Screenshot
 from notte_core.common.config import ScreenshotType
 from notte_core.utils.webp_replay import WebpReplay
 from PIL import Image
@@ -54,3 +59,34 @@ async def test_different_screenshot_types_produce_different_screenshots() -> Non
                 assert screenshot_1 != screenshot_2, (
                     f"Screenshots for types '{screenshot_type_1}' and '{screenshot_type_2}' are identical"
                 )
+
+
+def make_screenshot() -> Screenshot:
+    buffer = io.BytesIO()
+    Image.new("RGB", (200, 100), color="white").save(buffer, "PNG")
+    bbox = BoundingBox(
+        x=10, y=10, width=50, height=20, scroll_x=0, scroll_y=0, viewport_width=200, viewport_height=100, notte_id="B1"
+    )
+    return Screenshot(raw=buffer.getvalue(), bboxes=[bbox], last_action_id="B1")
+
+
+@pytest.mark.asyncio
+async def test_rendered_screenshots_are_cached() -> None:
+    screenshot = make_screenshot()
+    with patch.object(ScreenshotHighlighter, "forward", wraps=ScreenshotHighlighter.forward) as forward:
+        full = screenshot.bytes("full")
+        assert screenshot.bytes("full") is full
+        assert await screenshot.abytes("full") is full
+        assert forward.call_count == 1
+        # other variants are cached separately
+        assert screenshot.bytes("full", text="hello") != full
+        assert await screenshot.abytes("last_action") is screenshot.bytes("last_action")
+        assert forward.call_count == 3
+        # entries are keyed by content: equal screenshots (e.g. rebuilt by the trajectory) share them
+        assert make_screenshot().bytes("full") is full
+        assert forward.call_count == 3
+        # while a copy with another last action gets its own overlay
+        moved = screenshot.model_copy(update={"last_action_id": "B2"})
+        assert moved.bytes("last_action") is moved.raw
+        assert forward.call_count == 3
+    assert screenshot.bytes("raw") is screenshot.raw
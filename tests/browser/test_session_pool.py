@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from notte_browser.playwright import BaseWindowManager
+from notte_browser.session import NotteSession
+from notte_browser.session_pool import SessionPool
+from notte_browser.window import BrowserWindowOptions
+from notte_core.errors.base import NotteTimeoutError
+from typing_extensions import override
+
+from tests.mock.mock_service import MockLLMService
+from tests.mock.mock_service import patch_llm_service as _patch_llm_service
+
+patch_llm_service = _patch_llm_service
+
+
+@pytest.fixture
+def mock_llm_service() -> MockLLMService:
+    return MockLLMService(mock_response="")
+
+
+class FakeWindow:
+    def __init__(self, manager: "FakeWindowManager") -> None:
+        self.manager: FakeWindowManager = manager
+
+    async def close(self) -> None:
+        self.manager.closed += 1
+
+
+class FakeWindowManager(BaseWindowManager):
+    def __init__(self) -> None:
+        self.opened: int = 0
+        self.closed: int = 0
+
+    @override
+    async def astart(self) -> None:
+        pass
+
+    @override
+    async def astop(self) -> None:
+        pass
+
+    @override
+    async def new_window(self, options: BrowserWindowOptions) -> FakeWindow:  # pyright: ignore [reportIncompatibleMethodOverride]
+        self.opened += 1
+        return FakeWindow(self)
+
+
+@pytest.mark.asyncio
+async def test_session_pool_limits_concurrency(patch_llm_service: MockLLMService):
+    manager = FakeWindowManager()
+    running, max_running = 0, 0
+
+    async def task(session: NotteSession, item: int) -> int:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if item == 3:
+            raise ValueError("failed")
+        return item * 2
+
+    async with SessionPool(max_concurrency=3, window_manager=manager, headless=True) as pool:
+        results = await pool.map(task, range(10))
+    assert results[:3] == [0, 2, 4] and isinstance(results[3], ValueError)
+    assert max_running == 3
+    assert manager.opened == manager.closed == 10
+
+
+@pytest.mark.asyncio
+async def test_session_pool_timeout_and_cancel(patch_llm_service: MockLLMService):
+    manager = FakeWindowManager()
+
+    async def hang(session: NotteSession) -> None:
+        await asyncio.sleep(10)
+
+    async with SessionPool(max_concurrency=2, timeout=0.05, window_manager=manager, headless=True) as pool:
+        with pytest.raises(NotteTimeoutError):
+            await pool.run(hang)
+        tasks = [pool.submit(hang, timeout=10) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        assert len(pool) == 4
+        await pool.cancel()
+        assert all(task.cancelled() for task in tasks)
+        assert len(pool) == 0
+    # sessions waiting for a slot never opened a window
+    assert manager.opened == manager.closed == 3
+
+
+@pytest.mark.asyncio
+async def test_session_pool_releases_window_on_session_error(
+    patch_llm_service: MockLLMService, monkeypatch: pytest.MonkeyPatch
+):
+    manager = FakeWindowManager()
+
+    def failing_session(*args: object, **kwargs: object) -> NotteSession:
+        raise RuntimeError("session init failed")
+
+    monkeypatch.setattr("notte_browser.session_pool.NotteSession", failing_session)
+
+    async def task(session: NotteSession) -> None:
+        pass
+
+    async with SessionPool(max_concurrency=1, window_manager=manager, headless=True) as pool:
+        with pytest.raises(RuntimeError):
+            await pool.run(task)
+    assert manager.opened == manager.closed == 1
@@ -0,0 +1,69 @@
+import time
+from typing import Any, Callable
+
+import pytest
+from notte_browser.session import NotteSession
+from notte_browser.settling import NetworkTracker, SettleStats
+
+
+class FakeRequest:
+    def __init__(self, resource_type: str) -> None:
+        self.resource_type: str = resource_type
+
+
+class FakePage:
+    def __init__(self) -> None:
+        self.handlers: dict[str, Callable[[Any], None]] = {}
+
+    def on(self, event: str, handler: Callable[[Any], None]) -> None:
+        self.handlers[event] = handler
+
+
+@pytest.mark.asyncio
+async def test_network_tracker_ignores_passive_resources():
+    page = FakePage()
+    tracker = NetworkTracker(page)  # pyright: ignore [reportArgumentType]
+    image, xhr = FakeRequest("image"), FakeRequest("xhr")
+    page.handlers["request"](image)
+    assert tracker.pending == 0
+    page.handlers["request"](xhr)
+    assert tracker.pending == 1
+    assert not await tracker.wait_idle(0.01)
+    page.handlers["requestfailed"](xhr)
+    assert tracker.pending == 0
+    assert await tracker.wait_idle(0.01)
+
+
+def test_settle_stats_summary():
+    stats = SettleStats()
+    stats.record("click", "quiet", 0.1, 0.5)
+    stats.record("click", "quiet", 0.3, 0.5)
+    stats.record("scroll_down", "fixed", 0.5, 0.5)
+    assert stats.summary() == {
+        "click[quiet]": {"count": 2, "total_ms": 400.0, "mean_ms": 200.0, "max_ms": 300.0, "bound_ms": 1000.0},
+        "scroll_down[fixed]": {"count": 1, "total_ms": 500.0, "mean_ms": 500.0, "max_ms": 500.0, "bound_ms": 500.0},
+    }
+    assert stats.total_s == pytest.approx(0.9)
+
+
+@pytest.mark.asyncio
+async def test_wait_until_quiet_returns_once_dom_stops_changing():
+    async with NotteSession(headless=True) as session:
+        page = session.window.page
+        await page.set_content("<html><body><div id='counter'>0</div></body></html>")
+        # mutate the DOM every 20ms for 300ms
+        _ = await page.evaluate("""() => {
+            const start = performance.now();
+            const timer = setInterval(() => {
+                document.getElementById('counter').textContent = String(performance.now());
+                if (performance.now() - start > 300) clearInterval(timer);
+            }, 20);
+        }""")
+        start = time.perf_counter()
+        assert await session.window.wait_until_quiet(timeout_ms=3000)
+        elapsed = time.perf_counter() - start
+        assert 0.3 <= elapsed < 2
+
+        # the DOM never stops changing: bounded by the timeout
+        _ = await page.evaluate("() => setInterval(() => { document.body.dataset.now = String(Date.now()); }, 10)")
+        assert not await session.window.wait_until_quiet(timeout_ms=300)
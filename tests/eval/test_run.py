@@ -0,0 +1,149 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, ClassVar
+
+import cloudpickle
+import pytest
+from notte_core.utils.webp_replay import ScreenshotReplay
+from notte_eval import run
+from notte_eval.data.load_data import BenchmarkTask
+from notte_eval.run import InRunParameters, Job, RunParameters, TaskErrorResult, TaskSet
+from notte_eval.task_types import AgentBenchmark, TaskResult
+from pydantic import BaseModel
+from typing_extensions import override
+
+
+class FakeRunTask(BenchmarkTask):
+    path: ClassVar[str] = "fake_run.jsonl"
+
+
+class FakeParams(BaseModel):
+    name: str
+
+
+class FakeBench(AgentBenchmark[FakeParams, str]):
+    @override
+    async def run_agent(self, task: BenchmarkTask) -> str:
+        if task.id == "crash":
+            # simulates a worker process killed while running the task (e.g. out of memory), once the queue feeder
+            # thread had time to send the result of the previous task
+            await asyncio.sleep(0.5)
+            os._exit(1)
+        return f"answer to {task.question}"
+
+    @override
+    async def process_output(self, task: BenchmarkTask, out: str) -> TaskResult:
+        return TaskResult(
+            success=True,
+            duration_in_s=1.0,
+            agent_answer=out,
+            task=task,
+            steps=[],
+            screenshots=ScreenshotReplay.from_base64([]),
+        )
+
+
+def make_task(task_id: str) -> FakeRunTask:
+    return FakeRunTask(question=f"question {task_id}", id=task_id, website_name="fake")
+
+
+@pytest.fixture
+def tasks(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> list[FakeRunTask]:
+    tasks = [make_task("first"), make_task("second")]
+    path = tmp_path / "tasks.jsonl"
+    _ = path.write_text("\n".join(task.model_dump_json() for task in tasks))
+    monkeypatch.setattr(FakeRunTask, "path", str(path))
+    return tasks
+
+
+def test_resume_skips_completed_tries_and_reruns_errored_ones(
+    tmp_path: Path, tasks: list[FakeRunTask], monkeypatch: pytest.MonkeyPatch
+):
+    experiment_path = tmp_path / "experiment"
+    first, second = tasks
+    completed = TaskResult(
+        success=True,
+        run_id=0,
+        duration_in_s=1.0,
+        agent_answer="done",
+        task=first,
+        steps=[],
+        screenshots=ScreenshotReplay.from_base64([]),
+    )
+    run.save_task(experiment_path, completed)
+    _ = TaskErrorResult(first, InRunParameters(run_id=1, experiment_path=experiment_path), {}, experiment_path).log()
+
+    assert run.is_completed(experiment_path, first, 0)
+    # errored tries are saved with `duration_in_s == -1`
+    assert not run.is_completed(experiment_path, first, 1)
+    assert not run.is_completed(experiment_path, second, 0)
+
+    scheduled: list[Job] = []
+
+    def fake_compute(agent_bench: Any, jobs: list[Job], run_parameters: RunParameters) -> list[Any]:
+        scheduled.extend(jobs)
+        return []
+
+    monkeypatch.setattr(run, "compute_tasks_in_processes", fake_compute)
+    run_parameters = RunParameters(
+        n_jobs=1, tries_per_task=2, task_set=TaskSet(name="FakeRun"), experiment_path=experiment_path
+    )
+    _ = run.compute_tasks(FakeBench(FakeParams(name="fake")), run_parameters)
+
+    assert [(task.id, params.run_id) for task, params in scheduled] == [("first", 1), ("second", 0), ("second", 1)]
+
+
+def test_resume_rejects_mismatched_params(tmp_path: Path, tasks: list[FakeRunTask], monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(run, "fetch_handler", lambda key: (FakeParams, FakeBench))
+    resumed: list[RunParameters] = []
+    monkeypatch.setattr(run, "compute_tasks", lambda agent_bench, run_params: resumed.append(run_params) or [])
+
+    def config(name: str) -> dict[str, Any]:
+        run_parameters = {"n_jobs": 1, "tries_per_task": 1, "task_set": {"name": "FakeRun"}, "evaluator": "None"}
+        return {"RunParameters": run_parameters, "Fake": {"name": name}}
+
+    experiment_path = tmp_path / "experiment"
+    experiment_path.mkdir()
+    with pytest.raises(ValueError, match="no experiment found"):
+        _ = run.run_tasks(config("fake"), resume=experiment_path)
+
+    _ = (experiment_path / "params.json").write_text(json.dumps({"name": "other"}))
+    with pytest.raises(ValueError, match="agent parameters are different"):
+        _ = run.run_tasks(config("fake"), resume=experiment_path)
+    assert resumed == []
+
+    _ = (experiment_path / "params.json").write_text(json.dumps({"name": "fake"}))
+    assert run.run_tasks(config("fake"), resume=experiment_path) == experiment_path
+    assert [params.experiment_path for params in resumed] == [experiment_path]
+
+
+def test_dead_worker_produces_error_results(tmp_path: Path):
+    experiment_path = tmp_path / "experiment"
+    jobs: list[Job] = [
+        (make_task(task_id), InRunParameters(run_id=0, experiment_path=experiment_path, capture_logging=False))
+        for task_id in ("first", "crash", "never_run")
+    ]
+    run_parameters = RunParameters(
+        n_jobs=1,
+        tries_per_task=1,
+        task_set=TaskSet(name="FakeRun"),
+        experiment_path=experiment_path,
+        execution_mode="async",
+        tasks_per_worker=1,
+    )
+
+    outputs = run.compute_tasks_in_workers(FakeBench(FakeParams(name="fake")), jobs, run_parameters)
+
+    assert len(outputs) == 3
+    first, crashed, never_run = outputs
+    assert isinstance(first, bytes)
+    _, _, result = cloudpickle.loads(first)
+    assert result.agent_answer == "answer to question first"
+    for output, (task, _) in zip((crashed, never_run), jobs[1:]):
+        assert isinstance(output, TaskErrorResult) and output.logged
+        assert "stopped unexpectedly" in str(output.exception)
+        # the failed tries are saved, and will be run again when resuming the experiment
+        assert (run.task_path(experiment_path, task, 0) / "results.json").exists()
+        assert not run.is_completed(experiment_path, task, 0)
@@ -0,0 +1,145 @@
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from litellm import ModelResponse
+from notte_core.common.tracer import LlmUsageDictTracer, LlmUsageFileTracer
+from notte_core.errors.llm import LLMParsingError
+from notte_core.llms.cache import InMemoryLlmCache, SqliteLlmCache, llm_cache_key
+from notte_core.llms.engine import LLMEngine
+from pydantic import BaseModel
+
+
+@pytest.fixture(autouse=True)
+def traces_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    # engines created without a tracer share the default file tracer: keep its traces out of the package
+    path = tmp_path / "llm_usage.jsonl"
+    monkeypatch.setattr(LlmUsageFileTracer, "file_path", path)
+    return path
+
+
+def make_response(content: str) -> ModelResponse:
+    return ModelResponse(choices=[{"message": {"role": "assistant", "content": content}}])
+
+
+def image_message(url: str) -> list[dict[str, object]]:
+    return [
+        {"role": "user", "content": [{"type": "text", "text": "hi"}, {"type": "image_url", "image_url": {"url": url}}]}
+    ]
+
+
+def test_cache_key_depends_on_request():
+    messages = [{"role": "user", "content": "Hello"}]
+    key = llm_cache_key("gpt-4o", messages, 0.0, None, 1)  # type: ignore[arg-type]
+    assert key == llm_cache_key("gpt-4o", messages, 0.0, None, 1)  # type: ignore[arg-type]
+    assert key != llm_cache_key("gpt-4o-mini", messages, 0.0, None, 1)  # type: ignore[arg-type]
+    assert key != llm_cache_key("gpt-4o", messages, 0.5, None, 1)  # type: ignore[arg-type]
+    assert key != llm_cache_key("gpt-4o", messages, 0.0, {"type": "json_object"}, 1)  # type: ignore[arg-type]
+    assert llm_cache_key("gpt-4o", image_message("data:a"), 0.0, None, 1) != llm_cache_key(  # type: ignore[arg-type]
+        "gpt-4o",
+        image_message("data:b"),  # type: ignore[arg-type]
+        0.0,
+        None,
+        1,
+    )
+
+
+def test_in_memory_cache_lru_eviction():
+    cache = InMemoryLlmCache(max_entries=2)
+    cache.set("a", make_response("a"))
+    cache.set("b", make_response("b"))
+    assert cache.get("a") is not None
+    cache.set("c", make_response("c"))
+    # "b" is the least recently used entry
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats.hits == 3
+    assert cache.stats.misses == 1
+    assert cache.stats.evictions == 1
+
+
+def test_in_memory_cache_ttl():
+    cache = InMemoryLlmCache(max_entries=10, ttl_seconds=10)
+    with patch("notte_core.llms.cache.time.time", return_value=0):
+        cache.set("a", make_response("a"))
+    with patch("notte_core.llms.cache.time.time", return_value=5):
+        assert cache.get("a") is not None
+    with patch("notte_core.llms.cache.time.time", return_value=11):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_sqlite_cache_persists(tmp_path: Path):
+    path = tmp_path / "cache.sqlite"
+    cache = SqliteLlmCache(path, max_entries=2)
+    cache.set("a", make_response("a"))
+    cache.set("b", make_response("b"))
+    cache.set("c", make_response("c"))
+    assert len(cache) == 2
+
+    reopened = SqliteLlmCache(path, max_entries=2)
+    assert reopened.get("a") is None
+    response = reopened.get("c")
+    assert response is not None
+    assert response.choices[0].message.content == "c"  # pyright: ignore [reportAttributeAccessIssue]
+
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path: Path):
+    cache = SqliteLlmCache(tmp_path / "cache.sqlite", max_entries=2)
+    with patch("notte_core.llms.cache.time.time", return_value=1):
+        cache.set("a", make_response("a"))
+    with patch("notte_core.llms.cache.time.time", return_value=2):
+        cache.set("b", make_response("b"))
+    with patch("notte_core.llms.cache.time.time", return_value=3):
+        assert cache.get("a") is not None
+    with patch("notte_core.llms.cache.time.time", return_value=4):
+        cache.set("c", make_response("c"))
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.stats.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_engine_uses_cache():
+    engine = LLMEngine(cache=InMemoryLlmCache(max_entries=10))
+    messages = [{"role": "user", "content": "Hello"}]
+    acompletion = AsyncMock(return_value=make_response("Hello there!"))
+    with patch("litellm.acompletion", acompletion):
+        first = await engine.completion(messages=messages, model="gpt-3.5-turbo")  # type: ignore[arg-type]
+        second = await engine.completion(messages=messages, model="gpt-3.5-turbo")  # type: ignore[arg-type]
+        _ = await engine.completion(messages=messages, model="gpt-4o")  # type: ignore[arg-type]
+    assert acompletion.await_count == 2
+    assert second.choices[0].message.content == first.choices[0].message.content  # pyright: ignore [reportAttributeAccessIssue]
+    assert engine.cache is not None and engine.cache.stats.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_engine_does_not_trace_cache_hits():
+    tracer = LlmUsageDictTracer()
+    engine = LLMEngine(cache=InMemoryLlmCache(max_entries=10), tracer=tracer)
+    messages = [{"role": "user", "content": "Hello"}]
+    with patch("litellm.acompletion", AsyncMock(return_value=make_response("Hello there!"))):
+        for _ in range(3):
+            _ = await engine.completion(messages=messages, model="gpt-3.5-turbo")  # type: ignore[arg-type]
+    assert len(tracer.usage) == 1
+
+
+class Answer(BaseModel):
+    value: int
+
+
+@pytest.mark.asyncio
+async def test_engine_evicts_unparsable_structured_responses():
+    cache = InMemoryLlmCache(max_entries=10)
+    engine = LLMEngine(cache=cache, tracer=LlmUsageDictTracer(), nb_retries_structured_output=0)
+    messages = [{"role": "user", "content": "Answer"}]
+    acompletion = AsyncMock(side_effect=[make_response('{"value": "nan"}'), make_response('{"value": 1}')])
+    with patch("litellm.acompletion", acompletion):
+        with pytest.raises(LLMParsingError):
+            _ = await engine.structured_completion(list(messages), Answer, model="gpt-4o")  # type: ignore[arg-type]
+        # the invalid response is not replayed from the cache
+        assert len(cache) == 0
+        assert await engine.structured_completion(list(messages), Answer, model="gpt-4o") == Answer(value=1)  # type: ignore[arg-type]
+        assert await engine.structured_completion(list(messages), Answer, model="gpt-4o") == Answer(value=1)  # type: ignore[arg-type]
+    assert acompletion.await_count == 2
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 import pytest
@@ -66,3 +67,28 @@ def test_materialize_prompt(temp_prompts_dir: Path) -> None:
     # TODO: Andrea check this
     # with pytest.raises(ValueError, match="Missing required variable"):
     #     prompt_lib.materialize("test-prompt", {"wrong_var": "value"})
+
+
+def test_prompts_are_compiled_once(temp_prompts_dir: Path) -> None:
+    prompt_lib: PromptLibrary = PromptLibrary(temp_prompts_dir)
+    assert prompt_lib.materialize("test-prompt", {"name": "John"}) == prompt_lib.materialize(
+        "test-prompt", {"name": "John"}
+    )
+    compiled = prompt_lib.get_compiled("test-prompt")
+    assert prompt_lib.get_compiled("test-prompt") is compiled
+
+    # edits on disk are ignored without reload
+    _ = (temp_prompts_dir / "test-prompt" / "user.md").write_text("Bye {{name}}!")
+    messages = prompt_lib.materialize("test-prompt", {"name": "John"})
+    assert next(msg for msg in messages if msg["role"] == "user")["content"] == "Hello John!"
+
+
+def test_prompts_reload(temp_prompts_dir: Path) -> None:
+    prompt_lib: PromptLibrary = PromptLibrary(temp_prompts_dir, reload=True)
+    _ = prompt_lib.materialize("test-prompt", {"name": "John"})
+    user_file = temp_prompts_dir / "test-prompt" / "user.md"
+    _ = user_file.write_text("Bye {{name}}!")
+    # make sure the modification time changes even on coarse-grained filesystems
+    os.utime(user_file, (user_file.stat().st_atime, user_file.stat().st_mtime + 10))
+    messages = prompt_lib.materialize("test-prompt", {"name": "John"})
+    assert next(msg for msg in messages if msg["role"] == "user")["content"] == "Bye John!"
@@ -0,0 +1,52 @@
+import json
+from pathlib import Path
+
+from notte_core.common.tracer import JsonlWriter, LlmUsageFileTracer, hash_images_in_messages
+
+
+def read_lines(path: Path) -> list[dict[str, object]]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_writer_flush_and_close(tmp_path: Path):
+    path = tmp_path / "traces.jsonl"
+    writer = JsonlWriter(path)
+    for i in range(250):
+        writer.write({"i": i})
+    writer.flush()
+    assert [record["i"] for record in read_lines(path)] == list(range(250))
+    writer.write({"i": 250})
+    writer.close()
+    assert len(read_lines(path)) == 251
+    # records written after close are dropped
+    writer.write({"i": 251})
+    assert len(read_lines(path)) == 251
+
+
+def test_writer_rotates_by_size(tmp_path: Path):
+    path = tmp_path / "traces.jsonl"
+    writer = JsonlWriter(path, max_bytes=100, backup_count=2)
+    for i in range(20):
+        writer.write({"record": f"{i:05d}", "padding": "x" * 20})
+        writer.flush()
+    writer.close()
+    assert path.stat().st_size <= 100
+    assert writer.backup_path(1).exists()
+    assert writer.backup_path(2).exists()
+    assert not writer.backup_path(3).exists()
+    assert read_lines(path)[-1]["record"] == "00019"
+
+
+def test_writer_prepares_records_with_hashed_images(tmp_path: Path):
+    path = tmp_path / "traces.jsonl"
+    writer = JsonlWriter(path)
+    image = {"type": "image_url", "image_url": {"url": "data:image/png;base64," + "A" * 10_000}}
+    messages = [{"role": "user", "content": [{"type": "text", "text": "hi"}, image]}]
+    writer.write({"messages": messages}, prepare=LlmUsageFileTracer.hash_images)
+    writer.close()
+    [record] = read_lines(path)
+    assert record["messages"] == hash_images_in_messages(messages)  # type: ignore[arg-type]
+    url = record["messages"][0]["content"][1]["image_url"]["url"]  # type: ignore[index]
+    assert url.startswith("sha256:") and len(url) == len("sha256:") + 64
+    # the original messages are left untouched
+    assert messages[0]["content"][1] is image
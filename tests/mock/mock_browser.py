@@ -202,6 +202,9 @@ class MockBrowserDriver(AsyncResource):
     async def long_wait(self) -> None:
         pass
 
+    async def settle(self, action_type: str, kind: str = "short", bound_ms: int | None = None) -> None:
+        pass
+
     async def close(self) -> None:
         pass
 
@@ -342,3 +342,27 @@ def test_unmask_pydantic_json_content() -> None:
     assert result.description == "Image here: ![alt](https://example.com/image.jpg)"
     assert result.image_url == "regular_url"
     assert result.link_url == "regular_link"
+
+
+class LinksModel(BaseModel):
+    urls: list[str]
+
+
+def test_unmask_pydantic_list_of_strings() -> None:
+    """Test unmasking placeholders in a list of strings."""
+    masked_doc = MaskedDocument(content="test", links={"link1": "https://example.com"}, images={})
+    result = MarkdownPruningPipe.unmask_pydantic(masked_doc, LinksModel(urls=["link1", "link2", "[text](link1)"]))
+    assert result.urls == ["https://example.com", "link2", "[text](https://example.com)"]
+
+
+def test_mask_many_links_roundtrip() -> None:
+    """Test masking a document with many repeated links and images."""
+    content = "\n".join(
+        f"- [Item {i}](https://example.com/items/{i % 500}) ![thumb](https://cdn.example.com/{i % 100}.png)"
+        for i in range(2000)
+    )
+    result = MarkdownPruningPipe.mask(content)
+    assert len(result.links) == 500
+    assert len(result.images) == 100
+    assert "- [Item 1999](link500) ![thumb](img100.png)" in result.content
+    assert MarkdownPruningPipe.unmask(result) == content
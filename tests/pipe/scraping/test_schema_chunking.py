@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from notte_browser.scraping.schema import merge_structured, merge_values, split_markdown
+from notte_core.data.space import StructuredData
+from pydantic import BaseModel
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def test_split_markdown_on_headings_first() -> None:
+    document = "\n".join(
+        f"# Section {i}\n\n" + "\n\n".join(f"paragraph {i}.{j} text" for j in range(3)) for i in range(4)
+    )
+    chunks = split_markdown(document, max_tokens=12, count_tokens=count_words)
+    assert len(chunks) == 4
+    assert all(chunk.startswith(f"# Section {i}") for i, chunk in enumerate(chunks))
+    assert all(count_words(chunk) <= 12 for chunk in chunks)
+
+
+def test_split_markdown_falls_back_to_finer_boundaries() -> None:
+    document = "# Title\n" + "\n".join(f"line {i}" for i in range(20)) + "\n" + " ".join(["word"] * 30)
+    chunks = split_markdown(document, max_tokens=8, count_tokens=count_words)
+    assert all(count_words(chunk) <= 8 for chunk in chunks)
+    assert " ".join(chunks).split() == document.split()
+    assert split_markdown("short document", max_tokens=8, count_tokens=count_words) == ["short document"]
+
+
+class Product(BaseModel):
+    name: str
+    url: str
+    price: float | None = None
+
+
+class Products(BaseModel):
+    category: str | None = None
+    products: list[Product]
+
+
+def test_merge_values_dedups_list_items_by_key() -> None:
+    first = {"category": "", "products": [{"name": "A", "url": "link1", "price": None}, {"name": "B", "url": "link2"}]}
+    second = {
+        "category": "Shoes",
+        "products": [{"name": "A", "url": "link1", "price": 10.0}, {"name": "C", "url": "link3"}],
+    }
+    assert merge_values(first, second) == {
+        "category": "Shoes",
+        "products": [
+            {"name": "A", "url": "link1", "price": 10.0},
+            {"name": "B", "url": "link2"},
+            {"name": "C", "url": "link3"},
+        ],
+    }
+
+
+def test_merge_structured_reports_failed_chunks() -> None:
+    results: list[StructuredData[BaseModel]] = [
+        StructuredData(success=True, data=Products(products=[Product(name="A", url="https://a.com")])),
+        StructuredData(success=False, error="No products in this part of the document", data=None),
+        StructuredData(
+            success=True, data=Products(category="Shoes", products=[Product(name="B", url="https://b.com")])
+        ),
+    ]
+    merged = merge_structured(results, Products)
+    assert not merged.success
+    assert merged.error == (
+        "Failed to extract data from 1 of 3 document chunks (chunk 2: No products in this part of the document)"
+    )
+    # the data extracted from the other chunks is kept
+    assert merged.data == Products(
+        category="Shoes", products=[Product(name="A", url="https://a.com"), Product(name="B", url="https://b.com")]
+    )
+
+    assert merge_structured([results[0], results[2]], Products).success
+    failures = [result for result in results if not result.success]
+    assert merge_structured(failures, Products).error == "No products in this part of the document"
+
+
+@pytest.mark.asyncio
+async def test_merge_structured_gathered_chunks_with_failures() -> None:
+    async def extract_chunk(index: int) -> StructuredData[BaseModel]:
+        await asyncio.sleep(0)
+        if index % 2 == 1:
+            return StructuredData(success=False, error=f"Cannot validate chunk {index}", data=None)
+        return StructuredData(success=True, data=Products(products=[Product(name=str(index), url=f"https://{index}")]))
+
+    results = await asyncio.gather(*[extract_chunk(index) for index in range(4)])
+    merged = merge_structured(results, Products)
+    assert not merged.success
+    assert merged.error is not None
+    assert "2 of 4 document chunks" in merged.error
+    assert "chunk 2: Cannot validate chunk 1" in merged.error and "chunk 4: Cannot validate chunk 3" in merged.error
+    assert merged.get() == Products(products=[Product(name="0", url="https://0"), Product(name="2", url="https://2")])
+
+
+class Review(BaseModel):
+    author: str
+    rating: int | None = None
+
+
+class Reviews(BaseModel):
+    reviews: list[Review]
+
+
+def test_merge_structured_dedups_by_schema_required_fields() -> None:
+    results: list[StructuredData[BaseModel]] = [
+        StructuredData(success=True, data=Reviews(reviews=[Review(author="Ann"), Review(author="Bob", rating=4)])),
+        StructuredData(success=True, data=Reviews(reviews=[Review(author="Ann", rating=5)])),
+    ]
+    merged = merge_structured(results, Reviews)
+    assert merged.data == Reviews(reviews=[Review(author="Ann", rating=5), Review(author="Bob", rating=4)])
@@ -1,11 +1,12 @@
 from collections import defaultdict
+from pathlib import Path
 
 import pytest
 from notte_agent.falco.agent import FalcoAgent
 from notte_core.actions import ClickAction, FillAction
 from notte_core.agent_types import AgentCompletion
 from notte_core.browser.observation import ExecutionResult, Observation, Screenshot
-from notte_core.trajectory import StepBundle, TrajectoryHoldee
+from notte_core.trajectory import StepBundle, Trajectory, TrajectoryHoldee, TrajectoryStore
 
 import notte
 
@@ -145,6 +146,91 @@ async def test_trajectory_callbacks():
         assert callback_calls["step"] == 2
 
 
+@pytest.mark.asyncio
+async def test_trajectory_indexed_accessors_on_views():
+    traj = Trajectory()
+    for i in range(3):
+        _ = await traj.start_step()
+        await traj.append(Observation.empty())
+        await traj.append(ExecutionResult(action=ClickAction(id=f"B{i}"), success=True, message="clicked"))
+        _ = await traj.stop_step()
+    view = traj.view()
+    assert view.last_observation is None and view.num_steps == 0 and len(view) == 0
+
+    _ = await view.start_step()
+    await view.append(AgentCompletion.initial(url="https://example.com"), force=True)
+    # the step in progress is not counted
+    assert view.num_steps == 0 and traj.num_steps == 3
+    _ = await view.stop_step()
+
+    assert view.num_steps == 1 and traj.num_steps == 4
+    assert list(view.step_starts) == [3]
+    assert view.last_result is None
+    assert traj.last_result is traj[-2]
+    assert traj.last_completion is view[0]
+    assert [screen.last_action_id for screen in traj.all_screenshots()] == ["B0", "B1", "B2"]
+    with pytest.raises(ValueError):
+        _ = view._get_by_step(0)  # pyright: ignore [reportPrivateUsage]
+    with pytest.raises(IndexError):
+        _ = view[1]
+
+
+@pytest.mark.asyncio
+async def test_trajectory_spills_old_observations_to_disk(tmp_path: Path):
+    store = TrajectoryStore(tmp_path)
+    traj = Trajectory(store=store, keep_in_memory=2)
+    view = traj.view()
+    for i in range(5):
+        _ = await traj.start_step()
+        await traj.append(Observation.empty())
+        await traj.append(AgentCompletion.initial(url=f"https://example.com/{i}"))
+        await traj.append(ExecutionResult(action=ClickAction(id=f"B{i}"), success=True, message="clicked"))
+        _ = await traj.stop_step()
+
+    spilled = [element.spilled for element in traj.inner_elements]
+    # only the 2 most recent observations are in memory, completions and results are never spilled
+    assert spilled == [True, False, False] * 3 + [False] * 6
+    # identical observations are stored once
+    assert len(store) == 1
+
+    observations = list(view.observations())
+    assert len(observations) == 5
+    assert observations[0].screenshot.raw == Observation.empty().screenshot.raw
+    assert [screen.last_action_id for screen in view.all_screenshots()] == [f"B{i}" for i in range(5)]
+    bundle = next(view.step_iterator())
+    assert bundle.observation is not None and bundle.execution_result is not None
+    assert traj.last_observation is traj.inner_elements[-3].inner
+    assert repr(view) == "Trajectory(steps=5, observations=5, executions=5, completions=5)"
+
+    store.close()
+    assert not store.path.exists()
+
+    # the latest observation is never spilled
+    with pytest.raises(ValueError):
+        _ = Trajectory(store=TrajectoryStore(tmp_path), keep_in_memory=0)
+
+
+@pytest.mark.asyncio
+async def test_trajectory_keeps_latest_observation_with_interleaved_screenshots(tmp_path: Path):
+    store = TrajectoryStore(tmp_path)
+    traj = Trajectory(store=store, keep_in_memory=1)
+    empty = Observation.empty()
+    await traj.append(empty)
+    for i in range(3):
+        await traj.append(Screenshot(raw=empty.screenshot.raw, last_action_id=f"B{i}"))
+
+    # screenshots only spill older screenshots: the latest observation stays the very same object
+    assert [element.spilled for element in traj.inner_elements] == [False, True, True, False]
+    assert traj.last_observation is empty
+    assert [screen.last_action_id for screen in traj.screenshots()] == ["B0", "B1", "B2"]
+
+    await traj.append(Observation.empty())
+    await traj.append(Observation.empty())
+    assert traj.inner_elements[0].spilled and not traj.inner_elements[-1].spilled
+    assert traj.last_observation is empty
+    store.close()
+
+
 @pytest.mark.asyncio
 async def test_trajectory_callback_from_session():
     with notte.Session(headless=True) as session:
@@ -202,3 +288,22 @@ async def test_agent_observes_page_correctly():
         assert isinstance(action, FillAction)
         assert action.id == "I1"
         assert not resp.success
+
+
+@pytest.mark.asyncio
+async def test_trajectory_view_shares_indexes(monkeypatch: pytest.MonkeyPatch):
+    traj = Trajectory()
+    for i in range(3):
+        _ = await traj.start_step()
+        await traj.append(Observation.empty())
+        await traj.append(ExecutionResult(action=ClickAction(id=f"B{i}"), success=True, message="clicked"))
+        _ = await traj.stop_step()
+
+    indexed: list[int] = []
+    monkeypatch.setattr(Trajectory, "_index_element", lambda self, index, element: indexed.append(index))  # pyright: ignore[reportUnknownLambdaType, reportUnknownArgumentType]
+    full_view = traj._view(start=0)  # pyright: ignore [reportPrivateUsage]
+    nested_view = full_view._view(start=2)  # pyright: ignore [reportPrivateUsage]
+    assert indexed == []
+    assert len(full_view) == 6 and len(nested_view) == 4
+    assert full_view.num_steps == 3 and nested_view.num_steps == 2
+    assert nested_view.main_trajectory is traj
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+from typing import Any
+
+import pytest
+from notte_core.common import telemetry
+from notte_core.common.telemetry import EventSender, summarize_value, track_usage
+
+
+@pytest.fixture
+def captured(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, dict[str, Any]]]:
+    events: list[tuple[str, dict[str, Any]]] = []
+    monkeypatch.setattr(telemetry, "DISABLE_TELEMETRY", False)
+    monkeypatch.setattr(telemetry, "capture_event", lambda name, properties: events.append((name, properties)))
+    return events
+
+
+class Session:
+    @track_usage("test.observe")
+    async def aobserve(self, url: str, password: str = "secret") -> str:  # pragma: allowlist secret
+        await asyncio.sleep(0)
+        return url
+
+    @track_usage("test.fail")
+    def fail(self) -> None:
+        raise ValueError("boom")
+
+
+def test_summarize_value():
+    assert summarize_value(3) == 3
+    assert summarize_value("a" * 150) == "a" * 100 + "..."
+    assert summarize_value([1, 2, 3]) == "list[3]"
+    assert summarize_value(Session()) == "Session"
+
+
+@pytest.mark.asyncio
+async def test_track_usage_captures_async_calls_on_completion(captured: list[tuple[str, dict[str, Any]]]):
+    coroutine = Session().aobserve("https://example.com", password="hunter2")  # pragma: allowlist secret
+    assert captured == []
+    assert await coroutine == "https://example.com"
+    assert captured == [
+        (
+            "test.observe",
+            {"input": {"args": ["Session", "https://example.com"], "kwargs": {}}, "sample_rate": 1.0},
+        )
+    ]
+
+
+def test_track_usage_captures_errors(captured: list[tuple[str, dict[str, Any]]]):
+    with pytest.raises(ValueError):
+        Session().fail()
+    assert captured[0][1]["error"] == "boom"
+
+
+def test_event_sender_drops_events_when_full(monkeypatch: pytest.MonkeyPatch):
+    started, release = threading.Event(), threading.Event()
+    sent: list[str] = []
+
+    def send_event(event_name: str, properties: dict[str, Any]) -> None:
+        started.set()
+        _ = release.wait(timeout=5)
+        sent.append(event_name)
+
+    monkeypatch.setattr(telemetry, "send_event", send_event)
+    sender = EventSender(max_queue_size=2)
+    sender.send("a", {})
+    assert started.wait(timeout=5)
+    # the sender thread is blocked on "a": only two more events fit in the queue
+    for name in "bcd":
+        sender.send(name, {})
+    assert sender.dropped == 1
+    release.set()
+    sender.flush()
+    assert sent == ["a", "b", "c"]
+    sender.close()
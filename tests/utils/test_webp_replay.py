@@ -0,0 +1,66 @@
+import io
+from collections.abc import Iterator
+
+import pytest
+from notte_core.utils.webp_replay import ScreenshotReplay, build_webp_replay
+from PIL import Image
+
+
+def make_screenshot(color: str, size: tuple[int, int] = (200, 100)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_build_webp_replay(max_workers: int):
+    screenshots = [make_screenshot("red"), make_screenshot("blue", (400, 300)), make_screenshot("red")]
+    replay = build_webp_replay(
+        screenshots,
+        scale_factor=0.5,
+        quality=90,
+        frametime_in_ms=500,
+        step_text=["a", "b", "c"],
+        max_workers=max_workers,
+    )
+    image = Image.open(io.BytesIO(replay))
+    # start frame + one frame per screenshot, resized to the most common size
+    assert image.n_frames == 4  # pyright: ignore [reportAttributeAccessIssue]
+    assert image.size == (100, 50)
+    colors: list[tuple[int, int, int]] = []
+    for i in range(4):
+        image.seek(i)
+        colors.append(image.convert("RGB").getpixel((2, 2)))  # pyright: ignore [reportArgumentType]
+        assert image.info["duration"] == 500
+    assert colors[0] == (255, 255, 255)
+    assert colors[1][0] > 200 and colors[1][2] < 50
+    assert colors[2][2] > 200 and colors[2][0] < 50
+
+
+def test_build_webp_replay_validates_step_text():
+    assert build_webp_replay([]) == b""
+    with pytest.raises(ValueError):
+        _ = build_webp_replay([make_screenshot("red")], step_text=["a", "b"])
+
+
+def test_build_webp_replay_from_generator():
+    consumed: list[int] = []
+
+    def screenshots() -> Iterator[bytes]:
+        for i, color in enumerate(["red", "blue", "green"]):
+            consumed.append(i)
+            yield make_screenshot(color)
+
+    replay = build_webp_replay(screenshots(), size=(100, 50), step_text=["a", "b", "c"], max_workers=2)
+    image = Image.open(io.BytesIO(replay))
+    assert image.n_frames == 4  # pyright: ignore [reportAttributeAccessIssue]
+    assert image.size == (100, 50)
+    assert consumed == [0, 1, 2]
+    assert build_webp_replay(iter([]), size=(100, 50)) == b""
+    with pytest.raises(ValueError):
+        _ = build_webp_replay(screenshots(), size=(100, 50), step_text=["a"])
+
+
+def test_screenshot_replay_get():
+    replay = ScreenshotReplay.from_bytes([make_screenshot("red"), make_screenshot("blue")]).get()
+    assert Image.open(io.BytesIO(replay.replay)).n_frames == 3  # pyright: ignore [reportAttributeAccessIssue]